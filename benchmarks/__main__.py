@@ -0,0 +1,64 @@
+"""
+Benchmark suite for the pricing hot paths.
+
+Usage:
+    python -m benchmarks run [--filter NAME] [--output results.json] [--compare baseline.json] [--threshold 0.1]
+    python -m benchmarks compare baseline.json current.json [--threshold 0.1]
+
+Comparing exits with status 1 when any benchmark is slower than the baseline by more than the threshold.
+"""
+import argparse
+import sys
+from typing import Dict, List, Optional
+
+from benchmarks.results import find_regressions, load_results, save_results
+from benchmarks.suite import run_benchmarks
+
+
+def print_timings(benchmarks: Dict[str, Dict[str, float]]) -> None:
+    print(f"{'benchmark':<40} | {'µs per op':>12}")
+    for name, timing in benchmarks.items():
+        print(f"{name:<40} | {timing['seconds_per_op'] * 1_000_000:>12.3f}")
+
+
+def compare(baseline: Dict[str, Dict[str, float]], current: Dict[str, Dict[str, float]], threshold: float) -> int:
+    regressions = find_regressions(baseline, current, threshold)
+    for regression in regressions:
+        print(
+            f"REGRESSION {regression.name}: {regression.baseline_seconds * 1_000_000:.3f} µs -> "
+            f"{regression.current_seconds * 1_000_000:.3f} µs ({regression.slowdown:+.1%})"
+        )
+    if not regressions:
+        print(f"No benchmark is more than {threshold:.0%} slower than the baseline")
+    return 1 if regressions else 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__.split("\n\n")[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    run_parser = commands.add_parser("run", help="Run the benchmarks")
+    run_parser.add_argument("--filter", help="Only run benchmarks whose name contains this text")
+    run_parser.add_argument("--repeats", type=int, default=5)
+    run_parser.add_argument("--min-seconds", type=float, default=0.2, help="Minimum duration of each repeat")
+    run_parser.add_argument("--output", help="Write the results to this JSON file")
+    run_parser.add_argument("--compare", help="Compare the results with this baseline JSON file")
+    run_parser.add_argument("--threshold", type=float, default=0.1, help="Allowed slowdown, 0.1 is 10%%")
+    compare_parser = commands.add_parser("compare", help="Compare two JSON results files")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=0.1, help="Allowed slowdown, 0.1 is 10%%")
+    args = parser.parse_args(argv)
+
+    if args.command == "compare":
+        return compare(load_results(args.baseline), load_results(args.current), args.threshold)
+    benchmarks = run_benchmarks(args.filter, args.repeats, args.min_seconds)
+    print_timings(benchmarks)
+    if args.output:
+        save_results(args.output, benchmarks)
+    if args.compare:
+        return compare(load_results(args.compare), benchmarks, args.threshold)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,74 @@
+"""
+Compares writing priced baskets as receipts and as a columnar export, in time per basket and bytes per basket,
+and the time to re-read the export's totals through a memory map.
+
+Run with: python -m benchmarks.bench_basket_export [number of baskets]
+"""
+import io
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List, Tuple
+
+from benchmarks.workloads import small_baskets
+from supermarket_pricing.basket_export import BasketExportReader, BasketExportWriter
+from supermarket_pricing.receipt_printer import receipt_rows
+from supermarket_pricing.shopping_cart import ShoppingCart
+
+
+def priced_carts(compact_lines: bool) -> List[ShoppingCart]:
+    carts = []
+    for basket in small_baskets(1000):
+        cart = ShoppingCart(compact_lines=compact_lines)
+        for product_name, quantity in basket:
+            cart.add_product(product_name, quantity)
+        cart.total  # Price the offers up front, so only the writing is timed
+        carts.append(cart)
+    return carts
+
+
+def write_receipts(carts: List[ShoppingCart], number_of_baskets: int) -> Tuple[float, int]:
+    receipts = io.StringIO()
+    start = time.perf_counter()
+    for basket_number in range(number_of_baskets):
+        receipts.write("".join(receipt_rows(carts[basket_number % len(carts)])))
+    return time.perf_counter() - start, len(receipts.getvalue().encode("utf-8"))
+
+
+def write_export(carts: List[ShoppingCart], number_of_baskets: int, path: Path) -> Tuple[float, int]:
+    path.unlink(missing_ok=True)
+    start = time.perf_counter()
+    with BasketExportWriter(path) as export:
+        for basket_number in range(number_of_baskets):
+            export.write_cart(str(basket_number), carts[basket_number % len(carts)])
+    return time.perf_counter() - start, path.stat().st_size
+
+
+def main() -> None:
+    number_of_baskets = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    carts = priced_carts(compact_lines=False)
+    print(f"{number_of_baskets} baskets")
+    print(f"{'output':<24} | {'us/basket':>9} | {'bytes/basket':>12}")
+
+    def report(output: str, seconds: float, size: int) -> None:
+        print(f"{output:<24} | {seconds / number_of_baskets * 1e6:>9.2f} | {size / number_of_baskets:>12.0f}")
+
+    report("receipts", *write_receipts(carts, number_of_baskets))
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "baskets.export"
+        report("export", *write_export(carts, number_of_baskets, path))
+        report("export, compact lines", *write_export(priced_carts(compact_lines=True), number_of_baskets, path))
+
+        start = time.perf_counter()
+        with BasketExportReader(path) as reader:
+            total_pence = 0
+            for chunk in reader.chunks():
+                total_pence += sum(chunk.baskets["total"])
+                del chunk
+        read_seconds = time.perf_counter() - start
+    print(f"Summed {total_pence} pence of totals from the export in {read_seconds * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
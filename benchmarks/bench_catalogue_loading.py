@@ -0,0 +1,85 @@
+"""
+Compares the time for a fresh process to be ready to price from a JSON catalogue and from a memory mapped
+catalogue image, for a generated catalogue.
+
+Run with: python -m benchmarks.bench_catalogue_loading [number of products]
+"""
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from supermarket_pricing.catalogue_loader import load_catalogue, save_catalogue
+from supermarket_pricing.mapped_catalogue import MappedCatalogue, write_catalogue_image
+from supermarket_pricing.offers import Offer, ThreeForTwo, TwoForPrice
+from supermarket_pricing.product import Price, Product, ProductByKg
+from supermarket_pricing.shopping_cart import ShoppingCart
+
+PRICES = ("0.25", "0.5", "0.99", "1.2", "2.1", "3.75", "12.99")
+SEED = 5
+
+
+def generate_catalogue(number_of_products: int) -> Dict[str, Product]:
+    return {
+        f"product {product_number}": (ProductByKg if product_number % 10 == 0 else Product)(
+            f"product {product_number}", Price(PRICES[product_number % len(PRICES)])
+        )
+        for product_number in range(number_of_products)
+    }
+
+
+def generate_offers(product_catalogue: Dict[str, Product]) -> List[Offer]:
+    products = [product for product in product_catalogue.values() if not product.is_by_kg]
+    return [
+        ThreeForTwo(product) if number % 2 else TwoForPrice(product, Price(product.price * 2 - Price("0.1")))
+        for number, product in enumerate(products[::50])
+    ]
+
+
+def price_basket(cart: ShoppingCart, product_names: List[str]) -> None:
+    for product_name in product_names:
+        cart.add_product(product_name, "3")
+    cart.total
+
+
+def main() -> None:
+    number_of_products = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    product_catalogue = generate_catalogue(number_of_products)
+    offers = tuple(generate_offers(product_catalogue))
+    rng = random.Random(SEED)
+    basket = [name for name in rng.sample(list(product_catalogue), 20) if not product_catalogue[name].is_by_kg]
+    with tempfile.TemporaryDirectory() as directory:
+        json_path = Path(directory) / "catalogue.json"
+        image_path = Path(directory) / "catalogue.img"
+        save_catalogue(json_path, product_catalogue, offers)
+        write_catalogue_image(image_path, product_catalogue, offers)
+        print(f"{number_of_products} products, {len(offers)} offers")
+        print(f"{'format':<6} | {'size KiB':>9} | {'ready ms':>9} | {'first basket ms':>15}")
+
+        start = time.perf_counter()
+        loaded_catalogue, loaded_offers = load_catalogue(json_path)
+        cart = ShoppingCart(loaded_catalogue, loaded_offers)
+        ready = time.perf_counter()
+        price_basket(cart, basket)
+        priced = time.perf_counter()
+        print(
+            f"{'json':<6} | {json_path.stat().st_size / 1024:>9.0f} | {(ready - start) * 1000:>9.2f} | "
+            f"{(priced - ready) * 1000:>15.2f}"
+        )
+
+        start = time.perf_counter()
+        with MappedCatalogue(image_path) as mapped_catalogue:
+            cart = ShoppingCart(mapped_catalogue, mapped_catalogue.offers)
+            ready = time.perf_counter()
+            price_basket(cart, basket)
+            priced = time.perf_counter()
+        print(
+            f"{'image':<6} | {image_path.stat().st_size / 1024:>9.0f} | {(ready - start) * 1000:>9.2f} | "
+            f"{(priced - ready) * 1000:>15.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
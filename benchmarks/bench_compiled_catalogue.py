@@ -0,0 +1,62 @@
+"""
+Compares load time and memory of a dictionary of Products and a CompiledCatalogue for a generated catalogue.
+
+Run with: python -m benchmarks.bench_compiled_catalogue [number of products]
+"""
+import sys
+import time
+import tracemalloc
+from typing import Callable, List, Tuple
+
+from supermarket_pricing.compiled_catalogue import CompiledCatalogue
+from supermarket_pricing.product import Price, Product, ProductByKg
+
+PRICES = ("0.25", "0.5", "0.99", "1.2", "2.1", "3.75", "12.99")
+
+
+def generate_rows(number_of_products: int) -> List[Tuple[str, str, str]]:
+    return [
+        (
+            f"product {product_number}",
+            PRICES[product_number % len(PRICES)],
+            "kg" if product_number % 10 == 0 else "unit",
+        )
+        for product_number in range(number_of_products)
+    ]
+
+
+def load_product_dictionary(rows: List[Tuple[str, str, str]]) -> object:
+    return {
+        name: (ProductByKg if pricing_unit == "kg" else Product)(name, Price(price))
+        for name, price, pricing_unit in rows
+    }
+
+
+def measure(
+    load: Callable[[List[Tuple[str, str, str]]], object], rows: List[Tuple[str, str, str]]
+) -> Tuple[float, int]:
+    start = time.perf_counter()
+    load(rows)
+    seconds = time.perf_counter() - start
+    tracemalloc.start()
+    catalogue = load(rows)
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del catalogue
+    return seconds, memory
+
+
+def main() -> None:
+    number_of_products = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    rows = generate_rows(number_of_products)
+    print(f"{'catalogue':>20} | {'load ms':>8} | {'MiB':>7} | {'bytes/product':>13}")
+    for name, load in (
+        ("dict of Products", load_product_dictionary),
+        ("CompiledCatalogue", CompiledCatalogue.from_rows),
+    ):
+        seconds, memory = measure(load, rows)
+        print(f"{name:>20} | {seconds * 1000:>8.1f} | {memory / 2**20:>7.1f} | {memory / number_of_products:>13.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Measures the time to import a module in a fresh interpreter with python -X importtime, and which of the package's
+modules it imports, so a cold start, such as of the CLI or a worker process, does not quietly get slower.
+
+Exits with status 1 if the import takes longer than --max-ms, or imports a module which should only be loaded
+on demand: the allocation search, multiprocessing, the catalogue file formats, or the default catalogue itself.
+
+Run with: python -m benchmarks.bench_import_time [module] [--runs 5] [--max-ms MILLISECONDS]
+"""
+import argparse
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional
+
+REPOSITORY_ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_MODULE = "supermarket_pricing.shopping_cart"
+ON_DEMAND_MODULES = (
+    "supermarket_pricing.allocation",
+    "supermarket_pricing.catalogue_loader",
+    "supermarket_pricing.offer_specs",
+    "supermarket_pricing.mapped_catalogue",
+    "supermarket_pricing.basket_export",
+    "multiprocessing.pool",
+)
+DEFAULT_CATALOGUE_BUILT = "the default catalogue"
+
+
+class ImportTime(NamedTuple):
+    self_us: int
+    cumulative_us: int
+
+
+def measure_import(module: str) -> Dict[str, ImportTime]:
+    """
+    Import a module in a fresh interpreter.
+
+    Args:
+        module (str): The module to import.
+
+    Returns:
+        dict: The time of every module imported, by name, in microseconds. If the import built the default
+            catalogue, it is included as DEFAULT_CATALOGUE_BUILT.
+    """
+    check_catalogue = (
+        "import sys; catalogue = sys.modules.get('supermarket_pricing.catalogue'); "
+        "print('OFFERS' in vars(catalogue) if catalogue else False)"
+    )
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}; {check_catalogue}"],
+        cwd=REPOSITORY_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    import_times = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line.removeprefix("import time:").split("|")
+        import_times[name.strip()] = ImportTime(int(self_us), int(cumulative_us))
+    if completed.stdout.strip() == "True":
+        import_times[DEFAULT_CATALOGUE_BUILT] = ImportTime(0, 0)
+    return import_times
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.bench_import_time", description=__doc__.split("\n\n")[0]
+    )
+    parser.add_argument("module", nargs="?", default=DEFAULT_MODULE, help=f"Defaults to {DEFAULT_MODULE}")
+    parser.add_argument("--runs", type=int, default=5, help="Imports to time, keeping the fastest (default 5)")
+    parser.add_argument("--max-ms", type=float, help="Fail if the fastest import takes longer than this")
+    args = parser.parse_args(argv)
+
+    runs = [measure_import(args.module) for _ in range(args.runs)]
+    fastest = min(runs, key=lambda import_times: import_times[args.module].cumulative_us)
+    print(f"{'module':<44} | {'self ms':>8} | {'cumulative ms':>13}")
+    for name, import_time in sorted(fastest.items(), key=lambda item: -item[1].cumulative_us):
+        if name.startswith("supermarket_pricing"):
+            print(f"{name:<44} | {import_time.self_us / 1000:>8.2f} | {import_time.cumulative_us / 1000:>13.2f}")
+
+    failed = False
+    if loaded_on_import := [name for name in (*ON_DEMAND_MODULES, DEFAULT_CATALOGUE_BUILT) if name in fastest]:
+        print(f"REGRESSION {args.module} loads {', '.join(loaded_on_import)} on import")
+        failed = True
+    import_ms = fastest[args.module].cumulative_us / 1000
+    if args.max_ms is not None and import_ms > args.max_ms:
+        print(f"REGRESSION {args.module} takes {import_ms:.2f} ms to import, more than {args.max_ms:.2f} ms")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
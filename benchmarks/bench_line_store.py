@@ -0,0 +1,36 @@
+"""
+Compares the memory per line of a ShoppingCart storing lines in a list and in a CompactLineStore.
+
+Run with: python -m benchmarks.bench_line_store [number of lines]
+"""
+import sys
+import tracemalloc
+
+from supermarket_pricing.catalogue import PRODUCT_CATALOGUE
+from supermarket_pricing.shopping_cart import ShoppingCart
+
+WEIGHTS = ("0.2", "0.55", "1.2777", "2.5")
+
+
+def measure_memory_per_line(number_of_lines: int, compact_lines: bool) -> float:
+    product_names = list(PRODUCT_CATALOGUE)
+    cart = ShoppingCart(compact_lines=compact_lines)
+    tracemalloc.start()
+    for line_number in range(number_of_lines):
+        product_name = product_names[line_number % len(product_names)]
+        quantity = WEIGHTS[line_number % len(WEIGHTS)] if product_name in ("onions", "oranges") else "2"
+        cart.add_product(product_name, quantity)
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return memory / number_of_lines
+
+
+def main() -> None:
+    number_of_lines = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    print(f"{'lines':>8} | {'bytes/line':>10}")
+    print(f"{'list':>8} | {measure_memory_per_line(number_of_lines, compact_lines=False):>10.0f}")
+    print(f"{'compact':>8} | {measure_memory_per_line(number_of_lines, compact_lines=True):>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Measures the cost of the Price and Weight arithmetic and formatting on the add_product and receipt paths:
+the time of each operation, and the peak memory of the temporary objects it allocates,
+which are freed by the time it returns.
+
+Run with: python -m benchmarks.bench_numeric [repeats]
+"""
+import sys
+import timeit
+import tracemalloc
+from typing import Callable, List, Tuple
+
+from supermarket_pricing.product import Price, Weight
+from supermarket_pricing.receipt_printer import receipt_rows
+from supermarket_pricing.shopping_cart import ShoppingCart
+
+Operation = Callable[[], object]
+
+
+def receipt_cart() -> ShoppingCart:
+    cart = ShoppingCart()
+    for _ in range(25):
+        cart.add_product("beans", "2")
+        cart.add_product("onions", "1.2777")
+        cart.add_product("coke")
+        cart.add_product("arbor ale", "3")
+    return cart
+
+
+def operations() -> List[Tuple[str, Operation, int]]:
+    """
+    Returns:
+        list: The name of each operation, a function running it a number of times, and that number of times.
+    """
+    cart = ShoppingCart()
+    rows_cart = receipt_cart()
+    rows_per_receipt = sum(1 for _ in receipt_rows(rows_cart))
+    price, other_price, weight = Price("1.23"), Price("0.5"), Weight("1.2777")
+
+    def add_by_unit() -> None:
+        cart.clear()
+        cart.add_product("beans", "2")
+
+    def add_by_kg() -> None:
+        cart.clear()
+        cart.add_product("onions", "1.2777")
+
+    return [
+        ("add_product by unit", add_by_unit, 1),
+        ("add_product by kg", add_by_kg, 1),
+        ("receipt row", lambda: list(receipt_rows(rows_cart)), rows_per_receipt),
+        ("Price + Price", lambda: price + other_price, 1),
+        ("Price + int", lambda: price + 1, 1),
+        ("str(Price)", lambda: str(price), 1),
+        ("str(Weight)", lambda: str(weight), 1),
+    ]
+
+
+def temporary_bytes(operation: Operation) -> int:
+    """
+    The peak memory allocated while running an operation once, above the memory in use before it.
+    """
+    operation()  # So caches are warm and only the memory of the operation itself is traced
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    operation()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak - before
+
+
+def main() -> None:
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    print(f"{'operation':<20} | {'ns/op':>8} | {'temporary bytes/op':>18}")
+    for name, operation, operations_per_call in operations():
+        seconds = min(timeit.repeat(operation, number=repeats, repeat=5))
+        nanoseconds = seconds / repeats / operations_per_call * 1e9
+        print(f"{name:<20} | {nanoseconds:>8.0f} | {temporary_bytes(operation) / operations_per_call:>18.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Compares serial and parallel basket pricing throughput for a generated stream of baskets.
+
+Run with: python -m benchmarks.bench_parallel_batch [number of baskets]
+"""
+import os
+import random
+import sys
+import time
+from typing import Dict, List
+
+from supermarket_pricing.batch import price_baskets, price_baskets_parallel
+from supermarket_pricing.catalogue import PRODUCT_CATALOGUE
+
+BASKET_SIZE = 20
+SEED = 11
+
+
+def generate_baskets(number_of_baskets: int) -> List[Dict[str, str]]:
+    rng = random.Random(SEED)
+    product_names = list(PRODUCT_CATALOGUE)
+    baskets = []
+    for _ in range(number_of_baskets):
+        basket = {}
+        for product_name in rng.sample(product_names, k=rng.randint(1, len(product_names))):
+            basket[product_name] = str(rng.randint(1, BASKET_SIZE))
+        baskets.append(basket)
+    return baskets
+
+
+def main() -> None:
+    number_of_baskets = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    baskets = generate_baskets(number_of_baskets)
+
+    start = time.perf_counter()
+    serial_totals = [priced_basket.total for priced_basket in price_baskets(baskets)]
+    serial_seconds = time.perf_counter() - start
+    print(f"{'processes':>9} | {'baskets/s':>10} | {'speed-up':>8}")
+    print(f"{'serial':>9} | {number_of_baskets / serial_seconds:>10.0f} | {1:>8.2f}")
+
+    processes = 1
+    while processes <= (os.cpu_count() or 1):
+        start = time.perf_counter()
+        parallel_totals = [
+            priced_basket.total for priced_basket in price_baskets_parallel(baskets, processes=processes)
+        ]
+        seconds = time.perf_counter() - start
+        assert parallel_totals == serial_totals, "Parallel totals differ from serial totals"
+        print(f"{processes:>9} | {number_of_baskets / seconds:>10.0f} | {serial_seconds / seconds:>8.2f}")
+        processes *= 2
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Measures the rows per second of pricing a generated scan log from the command line,
+and checks memory stays flat as the log grows.
+
+Run with: python -m benchmarks.bench_scan_log [number of rows]
+"""
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.workloads import BY_KG
+from supermarket_pricing.catalogue import PRODUCT_CATALOGUE
+
+SEED = 3
+
+
+def write_scan_log(path: Path, number_of_rows: int) -> None:
+    rng = random.Random(SEED)
+    product_names = list(PRODUCT_CATALOGUE)
+    basket_id = 0
+    rows_left_in_basket = 0
+    with open(path, "w") as file:
+        file.write("basket_id,product,quantity\n")
+        for _ in range(number_of_rows):
+            if rows_left_in_basket == 0:
+                basket_id += 1
+                rows_left_in_basket = rng.randint(1, 30)
+            rows_left_in_basket -= 1
+            product_name = rng.choice(product_names)
+            quantity = f"{rng.randint(1, 3000) / 1000}" if product_name in BY_KG else str(rng.randint(1, 4))
+            file.write(f"{basket_id},{product_name},{quantity}\n")
+
+
+def run_cli(scan_log: Path, output: Path, receipts: bool) -> float:
+    """
+    Price the scan log in a fresh process, returning the seconds taken.
+    """
+    command = [sys.executable, "-m", "supermarket_pricing", str(scan_log), "--output", str(output)]
+    start = time.perf_counter()
+    subprocess.run(command + (["--receipts"] if receipts else []), check=True)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    number_of_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    print(f"{'rows':>10} | {'output':>8} | {'rows/s':>8} | {'peak MiB':>8}")
+    with tempfile.TemporaryDirectory() as directory:
+        for rows in (number_of_rows // 10, number_of_rows):
+            scan_log = Path(directory) / "scans.csv"
+            write_scan_log(scan_log, rows)
+            for receipts in (False, True):
+                seconds = run_cli(scan_log, Path(directory) / "output.txt", receipts)
+                # The peak of every run so far, so it only grows if a larger log needs more memory
+                peak_mib = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024
+                output = "receipts" if receipts else "totals"
+                print(f"{rows:>10} | {output:>8} | {rows / seconds:>8.0f} | {peak_mib:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
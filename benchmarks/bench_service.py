@@ -0,0 +1,91 @@
+"""
+Measures request latency and throughput of pricing baskets requested concurrently on an asyncio event loop,
+comparing a fresh ShoppingCart per request on the event loop with the coalescing PricingService.
+
+Run with: python -m benchmarks.bench_service [requests per second] [seconds]
+"""
+import asyncio
+import statistics
+import sys
+from typing import Awaitable, Callable, List, Tuple
+
+from benchmarks.workloads import small_baskets
+from supermarket_pricing.batch import Basket, PricedBasket
+from supermarket_pricing.service import PricingService
+from supermarket_pricing.shopping_cart import ShoppingCart
+
+PriceBasket = Callable[[Basket], Awaitable[PricedBasket]]
+
+
+async def price_with_fresh_cart(basket: Basket) -> PricedBasket:
+    cart = ShoppingCart()
+    for product_name, quantity in basket:
+        cart.add_product(product_name, quantity)
+    return PricedBasket(cart.sub_total, cart.savings, cart.total, tuple(cart.applied_offers))
+
+
+async def run_load(
+    price_basket: PriceBasket, baskets: List[Basket], rate: int, seconds: float
+) -> Tuple[List[float], float, float]:
+    """
+    Send requests at a fixed rate, as independent clients would, whether or not earlier requests have finished.
+    Returns the latency of every request from when it was due to be sent, the seconds taken to answer them all,
+    and the longest the event loop was blocked for, measured by a task which wakes every millisecond.
+    """
+    loop = asyncio.get_running_loop()
+    latencies: List[float] = []
+    longest_block = 0.0
+    finished = False
+
+    async def heartbeat() -> None:
+        nonlocal longest_block
+        while not finished:
+            before = loop.time()
+            await asyncio.sleep(0.001)
+            longest_block = max(longest_block, loop.time() - before - 0.001)
+
+    async def request(basket: Basket, due: float) -> None:
+        await price_basket(basket)
+        latencies.append(loop.time() - due)
+
+    heartbeat_task = asyncio.create_task(heartbeat())
+    start = loop.time()
+    requests = []
+    for request_number in range(int(rate * seconds)):
+        due = start + request_number / rate
+        if (delay := due - loop.time()) > 0:
+            await asyncio.sleep(delay)
+        requests.append(asyncio.create_task(request(baskets[request_number % len(baskets)], due)))
+    await asyncio.gather(*requests)
+    finished = True
+    await heartbeat_task
+    return latencies, loop.time() - start, longest_block
+
+
+def report(name: str, latencies: List[float], seconds: float, longest_block: float) -> None:
+    percentiles = statistics.quantiles(latencies, n=100)
+    print(
+        f"{name:<26} | {percentiles[49] * 1000:>8.2f} | {percentiles[98] * 1000:>8.2f} | "
+        f"{len(latencies) / seconds:>10.0f} | {longest_block * 1000:>16.2f}"
+    )
+
+
+async def main() -> None:
+    rate = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 2
+    # Mostly small baskets, with an occasional very large order
+    baskets: List[Basket] = list(small_baskets(999))
+    baskets.insert(500, [line for basket in small_baskets(300) for line in basket])
+    print(f"{rate} requests/s for {seconds:g} s")
+    print(f"{'front end':<26} | {'p50 ms':>8} | {'p99 ms':>8} | {'requests/s':>10} | {'loop blocked ms':>16}")
+    report("fresh cart per request", *await run_load(price_with_fresh_cart, baskets, rate, seconds))
+    for batch_window in (0, 0.001, 0.005):
+        async with PricingService(batch_window=batch_window) as service:
+            report(
+                f"service, {batch_window * 1000:g} ms window",
+                *await run_load(service.price_basket, baskets, rate, seconds),
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,29 @@
+"""
+Times ThreeFromSetForPrice.check_and_apply for growing quantities of ales.
+
+Run with: python -m benchmarks.bench_three_from_set
+"""
+import timeit
+from decimal import Decimal
+
+from supermarket_pricing.catalogue import OFFERS
+
+QUANTITIES = (1, 10, 100, 1_000, 10_000, 100_000, 1_000_000)
+REPEATS = 1_000
+
+
+def main() -> None:
+    ales_offer = OFFERS[2]
+    print(f"{'quantity':>10} | {'µs per check':>12}")
+    for quantity in QUANTITIES:
+        product_quantities = {
+            "arbor ale": Decimal(quantity),
+            "kaleidoscope": Decimal(quantity),
+            "butcombe": Decimal(quantity),
+        }
+        seconds = timeit.timeit(lambda: ales_offer.check_and_apply(product_quantities), number=REPEATS)
+        print(f"{quantity:>10} | {seconds / REPEATS * 1_000_000:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
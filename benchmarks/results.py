@@ -0,0 +1,60 @@
+"""
+JSON results format of the benchmark suite, and comparison of two results to find regressions.
+
+Results are stored as:
+    {
+        "format": 1,
+        "python": "3.10.13",
+        "benchmarks": {"<name>": {"seconds_per_op": 1.2e-06, "calls": 262144, "repeats": 5}, ...}
+    }
+"""
+import json
+import platform
+from collections import namedtuple
+from typing import Dict, List
+
+RESULTS_FORMAT = 1
+
+Regression = namedtuple("Regression", "name baseline_seconds current_seconds slowdown")
+
+
+def save_results(path: str, benchmarks: Dict[str, Dict[str, float]]) -> None:
+    with open(path, "w") as results_file:
+        json.dump(
+            {"format": RESULTS_FORMAT, "python": platform.python_version(), "benchmarks": benchmarks},
+            results_file,
+            indent=2,
+            sort_keys=True,
+        )
+
+
+def load_results(path: str) -> Dict[str, Dict[str, float]]:
+    with open(path) as results_file:
+        results = json.load(results_file)
+    if results.get("format") != RESULTS_FORMAT:
+        raise ValueError(f"Unsupported benchmark results format in {path}")
+    return results["benchmarks"]
+
+
+def find_regressions(
+    baseline: Dict[str, Dict[str, float]], current: Dict[str, Dict[str, float]], threshold: float
+) -> List[Regression]:
+    """
+    Find the benchmarks which are slower than the baseline by more than the threshold.
+    Benchmarks missing from either result are ignored.
+
+    Args:
+        baseline (dict): The baseline timings by benchmark name.
+        current (dict): The current timings by benchmark name.
+        threshold (float): The allowed slowdown, 0.1 allows the current run to be 10% slower.
+
+    Returns:
+        list: The regressions, slowest first.
+    """
+    regressions = []
+    for name in baseline.keys() & current.keys():
+        baseline_seconds = baseline[name]["seconds_per_op"]
+        current_seconds = current[name]["seconds_per_op"]
+        if (slowdown := current_seconds / baseline_seconds - 1) > threshold:
+            regressions.append(Regression(name, baseline_seconds, current_seconds, slowdown))
+    return sorted(regressions, key=lambda regression: regression.slowdown, reverse=True)
@@ -0,0 +1,322 @@
+"""
+Benchmarks of the pricing hot paths. Each benchmark is a setup function, registered with @benchmark,
+which builds its workload and returns the operation to time.
+"""
+import io
+import time
+from decimal import Decimal
+from typing import Callable, Dict, Optional
+
+from benchmarks.workloads import (
+    ALES,
+    ale_dense_lines,
+    huge_single_quantity,
+    many_offers_catalogue,
+    overlapping_sets_offers,
+    small_baskets,
+)
+from supermarket_pricing.allocation import allocate_offers
+from supermarket_pricing.catalogue import OFFERS
+from supermarket_pricing.offer_specs import compile_offer, offer_spec
+from supermarket_pricing.offers import ThreeForTwo, TwoForPrice
+from supermarket_pricing.pricing_cache import PricingCache
+from supermarket_pricing.receipt_printer import print_receipt
+from supermarket_pricing.savings_tables import SavingsTables
+from supermarket_pricing.shopping_cart import ShoppingCart
+
+Operation = Callable[[], object]
+
+BENCHMARKS: Dict[str, Callable[[], Operation]] = {}
+
+
+def benchmark(name: str) -> Callable[[Callable[[], Operation]], Callable[[], Operation]]:
+    """
+    Register a benchmark setup function under a name.
+    """
+
+    def register(setup: Callable[[], Operation]) -> Callable[[], Operation]:
+        BENCHMARKS[name] = setup
+        return setup
+
+    return register
+
+
+def time_operation(operation: Operation, repeats: int = 5, min_seconds: float = 0.2) -> Dict[str, float]:
+    """
+    Time an operation, calibrating the number of calls per repeat so each repeat takes at least min_seconds,
+    and keeping the fastest repeat, which is the least disturbed by the rest of the machine.
+
+    Returns:
+        dict: The seconds per call of the fastest repeat, the calls per repeat and the number of repeats.
+    """
+    calls = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(calls):
+            operation()
+        if (seconds := time.perf_counter() - start) >= min_seconds:
+            break
+        calls *= 2 if seconds <= 0 else max(2, min(10, int(min_seconds / seconds) + 1))
+    fastest = seconds
+    for _ in range(repeats - 1):
+        start = time.perf_counter()
+        for _ in range(calls):
+            operation()
+        fastest = min(fastest, time.perf_counter() - start)
+    return {"seconds_per_op": fastest / calls, "calls": calls, "repeats": repeats}
+
+
+def run_benchmarks(
+    name_filter: Optional[str] = None, repeats: int = 5, min_seconds: float = 0.2
+) -> Dict[str, Dict[str, float]]:
+    """
+    Run every registered benchmark whose name contains name_filter.
+
+    Returns:
+        dict: The timings of each benchmark by name.
+    """
+    return {
+        name: time_operation(setup(), repeats, min_seconds)
+        for name, setup in BENCHMARKS.items()
+        if name_filter is None or name_filter in name
+    }
+
+
+@benchmark("shopping_cart.add_product.unit")
+def add_product_by_unit() -> Operation:
+    cart = ShoppingCart()
+
+    def add_100_products() -> None:
+        cart.clear()
+        for _ in range(100):
+            cart.add_product("beans", "2")
+
+    return add_100_products
+
+
+@benchmark("shopping_cart.add_product.kg")
+def add_product_by_kg() -> Operation:
+    cart = ShoppingCart()
+
+    def add_100_products() -> None:
+        cart.clear()
+        for _ in range(100):
+            cart.add_product("onions", "1.2777")
+
+    return add_100_products
+
+
+@benchmark("shopping_cart.add_products.basket")
+def add_products_basket() -> Operation:
+    lines = [("beans", "2")] * 40 + [("onions", "1.2777")] * 30 + [("coke", "1"), ("butcombe", "3")] * 15
+    cart = ShoppingCart()
+
+    def add_100_products() -> None:
+        cart.clear()
+        cart.add_products(lines)
+
+    return add_100_products
+
+
+@benchmark("shopping_cart.void_line.large_cart")
+def void_line_in_large_cart() -> Operation:
+    cart = ShoppingCart()
+    for _ in range(5_000):
+        cart.add_product("beans")
+        cart.add_product("coke", "2")
+
+    def correct_mis_scan() -> None:
+        cart.add_product("onions", "1.2777")
+        cart.total
+        cart.void_line()
+        cart.total
+
+    return correct_mis_scan
+
+
+@benchmark("shopping_cart.remove_product.large_cart")
+def remove_product_from_large_cart() -> Operation:
+    cart = ShoppingCart()
+    for _ in range(5_000):
+        cart.add_product("beans")
+        cart.add_product("coke", "2")
+
+    def correct_quantity() -> None:
+        cart.add_product("beans", "3")
+        cart.total
+        cart.remove_product("beans", "2")
+        cart.remove_product("beans")
+        cart.total
+
+    return correct_quantity
+
+
+@benchmark("shopping_cart.remove_product.first_line")
+def remove_product_from_first_line_of_large_cart() -> Operation:
+    cart = ShoppingCart()
+    cart.add_product("butcombe", "1000000000")
+    for _ in range(5_000):
+        cart.add_product("beans")
+        cart.add_product("coke", "2")
+
+    def correct_quantity() -> None:
+        cart.remove_product("butcombe")  # Its only line is the first of the cart
+        cart.total
+
+    return correct_quantity
+
+
+@benchmark("shopping_cart.total.small_baskets")
+def total_of_small_baskets() -> Operation:
+    baskets = small_baskets()
+
+    def price_small_baskets() -> None:
+        for basket in baskets:
+            cart = ShoppingCart()
+            for product_name, quantity in basket:
+                cart.add_product(product_name, quantity)
+            cart.savings
+            cart.total
+
+    return price_small_baskets
+
+
+@benchmark("shopping_cart.total.rescan_ale_dense")
+def total_after_each_scan_of_ale_dense_cart() -> Operation:
+    lines = ale_dense_lines()
+
+    def rescan_ale_dense_cart() -> None:
+        cart = ShoppingCart()
+        for product_name, quantity in lines:
+            cart.add_product(product_name, quantity)
+            cart.total
+
+    return rescan_ale_dense_cart
+
+
+@benchmark("shopping_cart.total.many_offers")
+def total_with_many_offers() -> Operation:
+    product_catalogue, offers = many_offers_catalogue()
+    basket = small_baskets(1)[0] + [("product 7", "3")]
+
+    def price_with_many_offers() -> None:
+        cart = ShoppingCart(product_catalogue, offers)
+        for product_name, quantity in basket:
+            cart.add_product(product_name, quantity)
+        cart.total
+
+    return price_with_many_offers
+
+
+def total_of_repeated_overlapping_baskets(pricing_cache: Optional[PricingCache]) -> Operation:
+    offers = overlapping_sets_offers()
+    baskets = [[(product_name, "2") for product_name in ALES + ("beans",)], [("butcombe", "3"), ("kaleidoscope", "4")]]
+
+    def price_repeated_baskets() -> None:
+        for basket in baskets * 5:
+            cart = ShoppingCart(offers_catalogue=offers, optimal_offers=True, pricing_cache=pricing_cache)
+            for product_name, quantity in basket:
+                cart.add_product(product_name, quantity)
+            cart.total
+
+    return price_repeated_baskets
+
+
+@benchmark("shopping_cart.total.repeated")
+def total_of_repeated_baskets() -> Operation:
+    return total_of_repeated_overlapping_baskets(None)
+
+
+@benchmark("shopping_cart.total.repeated_cached")
+def total_of_repeated_baskets_with_cache() -> Operation:
+    return total_of_repeated_overlapping_baskets(PricingCache())
+
+
+@benchmark("offers.three_for_two")
+def three_for_two() -> Operation:
+    product_quantities = {"beans": Decimal(7)}
+    return lambda: OFFERS[0].check_and_apply(product_quantities)
+
+
+@benchmark("offers.two_for_price")
+def two_for_price() -> Operation:
+    product_quantities = {"coke": Decimal(5)}
+    return lambda: OFFERS[1].check_and_apply(product_quantities)
+
+
+@benchmark("offers.three_for_two.table")
+def three_for_two_from_table() -> Operation:
+    offer = ThreeForTwo(OFFERS[0].eligible_product, SavingsTables())
+    product_quantities = {"beans": Decimal(7)}
+    return lambda: offer.check_and_apply(product_quantities)
+
+
+@benchmark("offers.two_for_price.table")
+def two_for_price_from_table() -> Operation:
+    offer = TwoForPrice(OFFERS[1].eligible_product, OFFERS[1].offer_price, SavingsTables())
+    product_quantities = {"coke": Decimal(5)}
+    return lambda: offer.check_and_apply(product_quantities)
+
+
+@benchmark("offers.three_from_set_for_price")
+def three_from_set_for_price() -> Operation:
+    product_quantities = {"arbor ale": Decimal(2), "kaleidoscope": Decimal(3), "butcombe": Decimal(1)}
+    return lambda: OFFERS[2].check_and_apply(product_quantities)
+
+
+@benchmark("offers.compiled.three_for_two")
+def compiled_three_for_two() -> Operation:
+    offer = compile_offer(offer_spec(OFFERS[0]))
+    product_quantities = {"beans": Decimal(7)}
+    return lambda: offer.check_and_apply(product_quantities)
+
+
+@benchmark("offers.compiled.two_for_price")
+def compiled_two_for_price() -> Operation:
+    offer = compile_offer(offer_spec(OFFERS[1]))
+    product_quantities = {"coke": Decimal(5)}
+    return lambda: offer.check_and_apply(product_quantities)
+
+
+@benchmark("offers.compiled.three_from_set_for_price")
+def compiled_three_from_set_for_price() -> Operation:
+    offer = compile_offer(offer_spec(OFFERS[2]))
+    product_quantities = {"arbor ale": Decimal(2), "kaleidoscope": Decimal(3), "butcombe": Decimal(1)}
+    return lambda: offer.check_and_apply(product_quantities)
+
+
+@benchmark("offers.huge_quantities")
+def offers_with_huge_quantities() -> Operation:
+    product_quantities = {product_name: Decimal(quantity) for product_name, quantity in huge_single_quantity().items()}
+    return lambda: [offer.check_and_apply(product_quantities) for offer in OFFERS]
+
+
+def allocate_overlapping_sets(quantity: int) -> Operation:
+    offers = overlapping_sets_offers()
+    product_quantities = {product_name: Decimal(quantity) for product_name in ("arbor ale", "kaleidoscope", "butcombe")}
+    product_quantities["beans"] = Decimal(quantity)
+    return lambda: allocate_offers(product_quantities, offers)
+
+
+@benchmark("allocation.overlapping_sets.6")
+def allocate_6_of_each_in_overlapping_sets() -> Operation:
+    return allocate_overlapping_sets(6)
+
+
+@benchmark("allocation.overlapping_sets.10")
+def allocate_10_of_each_in_overlapping_sets() -> Operation:
+    return allocate_overlapping_sets(10)
+
+
+@benchmark("receipt_printer.print_receipt")
+def print_receipt_of_small_basket() -> Operation:
+    cart = ShoppingCart()
+    for product_name, quantity in small_baskets(1, max_lines=20)[0] + [("beans", "3")]:
+        cart.add_product(product_name, quantity)
+    output = io.StringIO()
+
+    def print_to_buffer() -> None:
+        output.seek(0)
+        print_receipt(cart, output)
+
+    return print_to_buffer
@@ -0,0 +1,86 @@
+"""
+Repeatable generated workloads for the benchmark suite. Every workload is built from a fixed seed.
+"""
+import random
+from decimal import Decimal
+from typing import Dict, List, Tuple
+
+from supermarket_pricing.catalogue import OFFERS, PRODUCT_CATALOGUE
+from supermarket_pricing.offers import (
+    Offer,
+    ThreeForTwo,
+    ThreeFromSetForPrice,
+    TwoForPrice,
+)
+from supermarket_pricing.product import Price, Product
+
+SEED = 2024
+ALES = ("arbor ale", "kaleidoscope", "butcombe")
+BY_KG = ("onions", "oranges")
+
+
+def small_baskets(number_of_baskets: int = 100, max_lines: int = 8) -> List[List[Tuple[str, str]]]:
+    """
+    Baskets of a few lines each, mixing products priced by unit and by kg.
+    """
+    rng = random.Random(SEED)
+    product_names = list(PRODUCT_CATALOGUE)
+    baskets = []
+    for _ in range(number_of_baskets):
+        basket = []
+        for _ in range(rng.randint(1, max_lines)):
+            product_name = rng.choice(product_names)
+            quantity = f"{rng.randint(1, 3000) / 1000}" if product_name in BY_KG else str(rng.randint(1, 4))
+            basket.append((product_name, quantity))
+        baskets.append(basket)
+    return baskets
+
+
+def ale_dense_lines(number_of_lines: int = 300) -> List[Tuple[str, str]]:
+    """
+    Lines of a cart made up almost entirely of ales, which are all in the ales set offer.
+    """
+    rng = random.Random(SEED)
+    return [(rng.choice(ALES), "1") if rng.random() < 0.9 else ("beans", "1") for _ in range(number_of_lines)]
+
+
+def huge_single_quantity(quantity: int = 1_000_000) -> Dict[str, str]:
+    """
+    A basket with a huge quantity of each ale and of beans.
+    """
+    return {product_name: str(quantity) for product_name in ALES + ("beans", "coke")}
+
+
+def many_offers_catalogue(number_of_offers: int = 10_000) -> Tuple[Dict[str, Product], Tuple[Offer, ...]]:
+    """
+    A catalogue with a product per offer, as well as the default products and offers,
+    for checking that carts only pay for the offers touching their products.
+    """
+    rng = random.Random(SEED)
+    product_catalogue: Dict[str, Product] = dict(PRODUCT_CATALOGUE)
+    offers: List[Offer] = list(OFFERS)
+    for offer_number in range(number_of_offers):
+        product = Product(f"product {offer_number}", Price(Decimal(rng.randint(10, 999)).scaleb(-2)))
+        product_catalogue[product.name] = product
+        if offer_number % 3 == 0:
+            offers.append(ThreeForTwo(product))
+        elif offer_number % 3 == 1:
+            offers.append(TwoForPrice(product, Price(product.price * 2 - Price("0.05"))))
+        else:
+            offers.append(
+                ThreeFromSetForPrice((product, PRODUCT_CATALOGUE["beans"]), Price(product.price * 3), "mixed")
+            )
+    return product_catalogue, tuple(offers)
+
+
+def overlapping_sets_offers(number_of_sets: int = 5) -> Tuple[Offer, ...]:
+    """
+    The default offers with extra sets over the ales, each overlapping the ales set and the sets before it.
+    """
+    ales = tuple(PRODUCT_CATALOGUE[product_name] for product_name in ALES)
+    offers: List[Offer] = list(OFFERS)
+    for set_number in range(number_of_sets - 1):
+        products = ales[: 2 + set_number % 2] + (PRODUCT_CATALOGUE["beans"],) * (set_number % 2)
+        offers.append(ThreeFromSetForPrice(products, Price(Decimal(550 - 10 * set_number).scaleb(-2)), "ales"))
+    offers.append(TwoForPrice(PRODUCT_CATALOGUE["kaleidoscope"], Price("4.20")))
+    return tuple(offers)
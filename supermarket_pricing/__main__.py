@@ -0,0 +1,5 @@
+import sys
+
+from supermarket_pricing.cli import main
+
+sys.exit(main())
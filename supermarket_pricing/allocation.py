@@ -0,0 +1,502 @@
+"""
+Allocation of cart units between overlapping offers, so a unit is only discounted by one offer.
+
+Offers which share products are grouped into components. An offer alone in its component can not double count,
+so it is evaluated against the full cart quantities as usual. Within a component, offers with a group_price save
+the full price of the units in each of their groups less the group price, so the allocation of units between them
+which maximizes the total savings is found by dynamic programming over the products in turn, cheapest first.
+The state is the number of units each multi-product offer has towards its next group, and the units of a product
+which offers take in whole groups are chosen by a knapsack over numbers of groups. Beyond a few groups' worth of
+units of a product, extra units can only go to the use of the product which saves the most per unit, so they are
+set aside and the work depends on the offers and their group sizes rather than the quantities in the cart.
+
+Multi-product offers discount the cheapest units available to them, as they do alone, so one which leaves a unit
+of its products unused can not take any dearer units. The state also keeps the price of the first unit of each
+multi-product offer's products left unused, so an unrelated offer can not change how a set is discounted.
+
+Offers without a group_price are either given all the units of their products or none, whichever saves more.
+The number of transitions the search tries is bounded, beyond which the component is allocated greedily: the
+offer whose groups of the units left, cheapest first, save the most takes them, for as long as that saves anything.
+"""
+from collections import namedtuple
+from decimal import Decimal
+from fractions import Fraction
+from itertools import product as cartesian_product
+from math import lcm
+from typing import Dict, FrozenSet, Iterator, List, Optional, Sequence, Tuple
+
+from supermarket_pricing.offers import Offer
+from supermarket_pricing.product import Price
+
+Allocation = Dict[str, int]  # Units given to an offer, by product name
+Residues = Tuple[int, ...]  # Units each multi-product offer has towards its next group
+# The price of the first unit of each multi-product offer's products left unused, None if none is,
+# and -1 once every product left is dearer
+Blocks = Tuple[Optional[int], ...]
+State = Tuple[Residues, Blocks]
+Choice = Tuple[State, Residues, bool]  # The previous state, units given to multi-product offers, whether exact
+_Knapsack = namedtuple("_Knapsack", "savings choices exact_savings exact_choices")
+
+DEFAULT_MAX_STEPS = 2_000
+
+
+def allocate_offers(
+    product_quantities: Dict[str, Decimal], offers: Sequence[Offer], max_steps: int = DEFAULT_MAX_STEPS
+) -> List[Price]:
+    """
+    Calculate the savings of each offer when units are assigned to offers to maximize the total savings,
+    without discounting any unit twice.
+
+    Args:
+        product_quantities (dict): A dictionary of product names to quantities.
+        offers (sequence): The offers which can apply.
+        max_steps (int) [optional, default=2,000]: The number of transitions the search may try per component,
+            beyond which the component is allocated greedily, offer by offer, to bound the latency.
+
+    Returns:
+        list: The savings of each offer, Price(0) for offers which do not apply.
+    """
+    savings = [Price(0)] * len(offers)
+    for component in _overlapping_components(offers):
+        component_offers = [offers[position] for position in component]
+        if len(component) == 1 or not _has_whole_quantities(product_quantities, component_offers):
+            component_savings = [offer.check_and_apply(product_quantities) for offer in component_offers]
+        else:
+            component_savings = _allocate_component(product_quantities, component_offers, max_steps)
+        for position, saving in zip(component, component_savings):
+            savings[position] = saving
+    return savings
+
+
+def _overlapping_components(offers: Sequence[Offer]) -> List[List[int]]:
+    """
+    Group offer positions into components of offers connected by shared products, in order of first offer.
+    """
+    parents = list(range(len(offers)))
+
+    def find(position: int) -> int:
+        while parents[position] != position:
+            parents[position] = parents[parents[position]]
+            position = parents[position]
+        return position
+
+    first_offer_for_product: Dict[str, int] = {}
+    for position, offer in enumerate(offers):
+        for product_name in offer.eligible_product_names:
+            if (other_position := first_offer_for_product.setdefault(product_name, position)) != position:
+                parents[find(position)] = find(other_position)
+    components: Dict[int, List[int]] = {}
+    for position in range(len(offers)):
+        components.setdefault(find(position), []).append(position)
+    return list(components.values())
+
+
+def _has_whole_quantities(product_quantities: Dict[str, Decimal], offers: Sequence[Offer]) -> bool:
+    """
+    Units can only be allocated for products with whole quantities, not weights.
+    """
+    return all(
+        product_quantities.get(product_name, 0) % 1 == 0
+        for offer in offers
+        for product_name in offer.eligible_product_names
+    )
+
+
+def _allocate_component(product_quantities: Dict[str, Decimal], offers: Sequence[Offer], max_steps: int) -> List[Price]:
+    """
+    The savings of each offer of a component, in the best of: no offer without a group_price taking any units,
+    or one of them taking all the units of its products, with the offers with a group_price sharing the rest.
+    """
+    quantities = {
+        product_name: int(product_quantities.get(product_name, 0))
+        for offer in offers
+        for product_name in offer.eligible_product_names
+    }
+    grouped = [position for position, offer in enumerate(offers) if _has_group_price(offer)]
+    ungrouped = [position for position, offer in enumerate(offers) if not _has_group_price(offer)]
+    best_savings: List[Price] = []
+    for exclusive_position in (None, *ungrouped):
+        remaining = dict(quantities)
+        savings = [Price(0)] * len(offers)
+        if exclusive_position is not None:
+            savings[exclusive_position] = offers[exclusive_position].check_and_apply(product_quantities)
+            remaining.update(dict.fromkeys(offers[exclusive_position].eligible_product_names, 0))
+        allocations = _GroupAllocator(remaining, [offers[position] for position in grouped], max_steps).allocate()
+        for position, allocation in zip(grouped, allocations):
+            savings[position] = _saving(offers[position], allocation)
+        if not best_savings or sum(savings) > sum(best_savings):
+            best_savings = savings
+    return best_savings
+
+
+def _has_group_price(offer: Offer) -> bool:
+    return offer.group_price is not None and bool(offer.eligible_products)
+
+
+def _saving(offer: Offer, allocation: Allocation) -> Price:
+    if not any(allocation.values()):
+        return Price(0)
+    return offer.check_and_apply({product_name: Decimal(units) for product_name, units in allocation.items()})
+
+
+class _GroupAllocator:
+    """
+    Find the allocation of units between offers with a group_price which maximizes the total savings
+    """
+
+    def __init__(self, quantities: Dict[str, int], offers: Sequence[Offer], max_steps: int) -> None:
+        self.quantities = quantities
+        self.offers = offers
+        self.max_steps = max_steps
+        self.steps = 0
+        prices = {product.name: product.price for offer in offers for product in offer.eligible_products}
+        group_prices = {
+            position: offer.group_price for position, offer in enumerate(offers) if offer.group_price is not None
+        }
+        # Prices in units of the smallest decimal place of any of them, so the search adds integers, not Decimals
+        exponents = [price.as_tuple().exponent for price in (*prices.values(), *group_prices.values())]
+        places = max(0, *(-exponent for exponent in exponents))  # type: ignore[operator]
+        self.prices = {product_name: int(price.scaleb(places)) for product_name, price in prices.items()}
+        self.group_prices = {position: int(price.scaleb(places)) for position, price in group_prices.items()}
+        self.product_names = sorted(
+            dict.fromkeys(product.name for offer in offers for product in offer.eligible_products),
+            key=self.prices.__getitem__,
+        )  # Cheapest first, as offers discount the cheapest units
+        self.positions = self.__undominated_positions()
+        self.multi_product_positions = [
+            position for position in self.positions if len(offers[position].eligible_product_names) > 1
+        ]
+        self.last_product_names = [
+            max(offers[position].eligible_product_names, key=self.product_names.index)
+            for position in self.multi_product_positions
+        ]
+        self.offers_by_product = {
+            product_name: self.__continuing_and_closing_offers(product_name) for product_name in self.product_names
+        }
+        self.capped_quantities = {
+            product_name: self.__capped_quantity(product_name) for product_name in self.product_names
+        }
+        self.knapsacks: Dict[Tuple[str, FrozenSet[int]], _Knapsack] = {}
+        self.surpluses: Dict[Tuple[str, FrozenSet[int]], Tuple[int, bool]] = {}
+
+    def allocate(self) -> List[Allocation]:
+        """
+        Returns:
+            list: The units given to each offer in the best allocation found.
+        """
+        try:
+            return self.__best_allocations()
+        except _TooManySteps:
+            return self.__greedy_allocations()
+
+    def __undominated_positions(self) -> List[int]:
+        """
+        The positions of the offers worth allocating units to, leaving out an offer when another on the same products
+        with the same group size has a group price no higher, as it can take the units for at least the same saving.
+        """
+        cheapest: Dict[Tuple[frozenset, int], int] = {}
+        for position, offer in enumerate(self.offers):
+            key = (offer.eligible_product_names, offer.group_size)
+            if key not in cheapest or self.group_prices[position] < self.group_prices[cheapest[key]]:
+                cheapest[key] = position
+        return sorted(cheapest.values())
+
+    def __best_allocations(self) -> List[Allocation]:
+        """
+        Go through the products in turn, keeping the best savings so far for each state, then follow the best choices
+        back from the best final state.
+        """
+        no_residues = (0,) * len(self.multi_product_positions)
+        no_blocks = (None,) * len(self.multi_product_positions)
+        best_savings: Dict[State, int] = {(no_residues, no_blocks): 0}
+        choices: List[Dict[State, Choice]] = []
+        for product_name in self.product_names:
+            best_savings, product_choices = self.__allocate_product(product_name, best_savings)
+            choices.append(product_choices)
+        return self.__follow_choices(choices, max(best_savings, key=best_savings.__getitem__))
+
+    def __allocate_product(
+        self, product_name: str, best_savings: Dict[State, int]
+    ) -> Tuple[Dict[State, int], Dict[State, Choice]]:
+        """
+        The best savings for each state once the product's units are given out, and the choice which led to it.
+        """
+        next_best_savings: Dict[State, int] = {}
+        product_choices: Dict[State, Choice] = {}
+        for state, savings in best_savings.items():
+            for next_state, added, exact, added_savings in self.__transitions(product_name, state):
+                next_savings = savings + added_savings
+                if next_state not in next_best_savings or next_savings > next_best_savings[next_state]:
+                    next_best_savings[next_state] = next_savings
+                    product_choices[next_state] = (state, added, exact)
+        return next_best_savings, product_choices
+
+    def __transitions(self, product_name: str, state: State) -> Iterator[Tuple[State, Residues, bool, int]]:
+        """
+        The states the product's units can lead to from a state, with the units given to each multi-product offer the
+        product is in, whether the units left are taken in whole groups exactly, and the savings added. An offer's
+        last product must complete its group, so only the units of its other products are choices, and an offer which
+        has left a cheaper unit of its products unused can not take any of the product.
+        """
+        residues, blocks = state
+        price = self.prices[product_name]
+        excluded = self.__excluded_positions(blocks, price)
+        continuing, closing = self.offers_by_product[product_name]
+        if any(residues[index] and self.multi_product_positions[index] in excluded for index, _, _ in closing):
+            return
+        closing_added = tuple(-residues[index] % group_size for index, group_size, _ in closing)
+        closing_savings = sum(
+            units * price - group_price for units, (_, _, group_price) in zip(closing_added, closing) if units
+        )
+        capped_quantity = self.capped_quantities[product_name]
+        knapsack = self.__knapsack(product_name, capped_quantity, excluded)
+        surplus_savings, surplus_unused = self.__surplus(product_name, capped_quantity, excluded)
+        containing = [index for index, _, _ in continuing + closing]
+        for continuing_added in cartesian_product(
+            *(
+                range(1 if self.multi_product_positions[index] in excluded else group_size)
+                for index, group_size, _ in continuing
+            )
+        ):
+            if (units_left := capped_quantity - sum(closing_added) - sum(continuing_added)) < 0:
+                continue
+            self.steps += 1
+            if self.steps > self.max_steps:
+                raise _TooManySteps
+            next_residues, added_savings = self.__add_units(residues, price, continuing, continuing_added, closing)
+            added_savings += closing_savings + surplus_savings
+            added = continuing_added + closing_added
+            exact_savings = knapsack.exact_savings[units_left]
+            if exact_savings is not None:
+                next_blocks = self.__next_blocks(price, blocks, containing if surplus_unused else ())
+                yield (next_residues, next_blocks), added, True, added_savings + exact_savings
+            if exact_savings is None or knapsack.savings[units_left] > exact_savings:
+                next_blocks = self.__next_blocks(price, blocks, containing)
+                yield (next_residues, next_blocks), added, False, added_savings + knapsack.savings[units_left]
+
+    def __add_units(
+        self,
+        residues: Residues,
+        price: int,
+        continuing: List[Tuple[int, int, int]],
+        continuing_added: Residues,
+        closing: List[Tuple[int, int, int]],
+    ) -> Tuple[Residues, int]:
+        """
+        The units each multi-product offer has towards its next group once the product's units are added,
+        and the savings of the units less the group price of each group they complete.
+        """
+        next_residues = list(residues)
+        savings = sum(continuing_added) * price
+        for index, _, _ in closing:
+            next_residues[index] = 0
+        for (index, group_size, group_price), units in zip(continuing, continuing_added):
+            if (residue := residues[index] + units) >= group_size:  # Completes a group
+                residue -= group_size
+                savings -= group_price
+            next_residues[index] = residue
+        return tuple(next_residues), savings
+
+    def __excluded_positions(self, blocks: Blocks, price: int) -> FrozenSet[int]:
+        """
+        The multi-product offers which have left a unit of their products cheaper than the price unused.
+        """
+        return frozenset(
+            position
+            for position, block in zip(self.multi_product_positions, blocks)
+            if block is not None and block < price
+        )
+
+    @staticmethod
+    def __next_blocks(price: int, blocks: Blocks, newly_blocked: Sequence[int]) -> Blocks:
+        """
+        The blocks once a product's units are given out, blocking the multi-product offers at the indices given at its
+        price, those it is in when a unit is left unused. Blocks at lower prices become -1, as every product left is
+        at least as dear.
+        """
+        next_blocks = [-1 if block is not None and block < price else block for block in blocks]
+        for index in newly_blocked:
+            if next_blocks[index] is None:
+                next_blocks[index] = price
+        return tuple(next_blocks)
+
+    def __continuing_and_closing_offers(
+        self, product_name: str
+    ) -> Tuple[List[Tuple[int, int, int]], List[Tuple[int, int, int]]]:
+        """
+        The index, group size and group price of each multi-product offer the product is in,
+        split into those with products after it and those for which it is the last product.
+        """
+        continuing: List[Tuple[int, int, int]] = []
+        closing: List[Tuple[int, int, int]] = []
+        for index, position in enumerate(self.multi_product_positions):
+            if product_name in self.offers[position].eligible_product_names:
+                offer = (index, self.offers[position].group_size, self.group_prices[position])
+                (closing if self.last_product_names[index] == product_name else continuing).append(offer)
+        return continuing, closing
+
+    def __follow_choices(self, choices: List[Dict[State, Choice]], state: State) -> List[Allocation]:
+        """
+        The allocations given by the best choices, from the last product back to the first.
+        """
+        allocations: List[Allocation] = [{} for _ in self.offers]
+        for product_name, product_choices in reversed(list(zip(self.product_names, choices))):
+            state, added, exact = product_choices[state]
+            excluded = self.__excluded_positions(state[1], self.prices[product_name])
+            units_by_position = dict.fromkeys(self.positions, 0)
+            continuing, closing = self.offers_by_product[product_name]
+            for (index, _, _), units in zip(continuing + closing, added):
+                units_by_position[self.multi_product_positions[index]] += units
+            capped_quantity = self.capped_quantities[product_name]
+            knapsack = self.__knapsack(product_name, capped_quantity, excluded)
+            knapsack_choices = knapsack.exact_choices if exact else knapsack.choices
+            units_left = capped_quantity - sum(added)
+            while units_left:
+                if (group_position := knapsack_choices[units_left]) is None:
+                    units_left -= 1  # Left unused
+                    continue
+                units_by_position[group_position] += self.offers[group_position].group_size
+                units_left -= self.offers[group_position].group_size
+            if (best_position := self.__best_use(product_name, excluded)) is not None:
+                units_by_position[best_position] += self.quantities[product_name] - capped_quantity
+            for position, units in units_by_position.items():
+                if units:
+                    allocations[position][product_name] = units
+        return allocations
+
+    def __offers_containing(self, product_name: str) -> List[int]:
+        return [position for position in self.positions if product_name in self.offers[position].eligible_product_names]
+
+    def __saving_per_unit(self, position: int, product_name: str) -> Fraction:
+        offer = self.offers[position]
+        return Fraction(self.prices[product_name]) - Fraction(self.group_prices[position]) / offer.group_size
+
+    def __best_use(self, product_name: str, excluded: FrozenSet[int]) -> Optional[int]:
+        """
+        The offer which can take the product and saves the most per unit of it,
+        None if no offer saves anything per unit.
+        """
+        best_position, best_saving = None, Fraction(0)
+        for position in self.__offers_containing(product_name):
+            if position not in excluded and (saving := self.__saving_per_unit(position, product_name)) > best_saving:
+                best_position, best_saving = position, saving
+        return best_position
+
+    def __surplus(self, product_name: str, capped_quantity: int, excluded: FrozenSet[int]) -> Tuple[int, bool]:
+        """
+        The savings of the units set aside above the capped quantity in their best use,
+        and whether they are left unused, as no offer which can take them saves anything.
+        """
+        if (key := (product_name, excluded)) in self.surpluses:
+            return self.surpluses[key]
+        surplus = self.quantities[product_name] - capped_quantity
+        if (best_position := self.__best_use(product_name, excluded)) is None:
+            self.surpluses[key] = (0, surplus > 0)
+        else:
+            group_size = self.offers[best_position].group_size
+            surplus_savings = (
+                surplus * self.prices[product_name] - surplus // group_size * self.group_prices[best_position]
+            )
+            self.surpluses[key] = (surplus_savings, False)
+        return self.surpluses[key]
+
+    def __capped_quantity(self, product_name: str) -> int:
+        """
+        The quantity of the product to search over. With n uses of a product, each offer it is in and leaving it
+        unused, and L the least common multiple of their group sizes, there is a best allocation where every use
+        but the one saving the most per unit has fewer than L units, since moving L units between uses keeps whole
+        groups. So above n * L units, whole multiples of L can be set aside for that best use.
+        """
+        quantity = self.quantities[product_name]
+        containing = self.__offers_containing(product_name)
+        common_group_size = lcm(*(self.offers[position].group_size for position in containing))
+        bound = (len(containing) + 1) * common_group_size
+        if quantity <= bound:
+            return quantity
+        return quantity - (quantity - bound + common_group_size - 1) // common_group_size * common_group_size
+
+    def __knapsack(self, product_name: str, quantity: int, excluded: FrozenSet[int]) -> "_Knapsack":
+        """
+        The best savings from whole groups of only this product for the offers which can take it, for each number of
+        units up to the quantity, and the offer which last takes a group in each, None where the last unit is left
+        unused. Also the best savings using exactly that number of units, None where no groups add up to it.
+        """
+        if (key := (product_name, excluded)) in self.knapsacks:
+            return self.knapsacks[key]
+        groups = [
+            (self.offers[position].group_size, group_saving, position)
+            for position in self.__offers_containing(product_name)
+            if position not in excluded
+            and (
+                group_saving := self.offers[position].group_size * self.prices[product_name]
+                - self.group_prices[position]
+            )
+            >= 0
+        ]
+        savings = [0] * (quantity + 1)
+        choices: List[Optional[int]] = [None] * (quantity + 1)
+        exact_savings: List[Optional[int]] = [0] + [None] * quantity
+        exact_choices: List[Optional[int]] = [None] * (quantity + 1)
+        for units in range(1, quantity + 1):
+            savings[units] = savings[units - 1]
+            for group_size, group_saving, position in groups:
+                if group_size > units:
+                    continue
+                if savings[units - group_size] + group_saving > savings[units]:
+                    savings[units] = savings[units - group_size] + group_saving
+                    choices[units] = position
+                if (previous := exact_savings[units - group_size]) is None:
+                    continue
+                if (current := exact_savings[units]) is None or previous + group_saving > current:
+                    exact_savings[units] = previous + group_saving
+                    exact_choices[units] = position
+        knapsack = self.knapsacks[key] = _Knapsack(savings, choices, exact_savings, exact_choices)
+        return knapsack
+
+    def __greedy_allocations(self) -> List[Allocation]:
+        """
+        Repeatedly give the offer whose groups of the units left save the most those groups, while they save
+        anything. The first offer chosen takes its groups of the whole cart, so the result is never worse
+        than any single offer alone.
+        """
+        remaining = dict(self.quantities)
+        allocations: List[Allocation] = [{} for _ in self.offers]
+        unallocated = set(self.positions)
+        while unallocated:
+            best_saving, best_position, best_allocation = 0, -1, {}
+            for position in sorted(unallocated):
+                saving, allocation = self.__cheapest_groups(position, remaining)
+                if saving > best_saving:
+                    best_saving, best_position, best_allocation = saving, position, allocation
+            if best_position < 0:
+                break
+            allocations[best_position] = best_allocation
+            for product_name, units in best_allocation.items():
+                remaining[product_name] -= units
+            unallocated.remove(best_position)
+        return allocations
+
+    def __cheapest_groups(self, position: int, remaining: Dict[str, int]) -> Tuple[int, Allocation]:
+        """
+        The groups one offer alone makes of the remaining units, discounting the cheapest units as the offers do,
+        and their savings.
+        """
+        offer = self.offers[position]
+        groups = (
+            sum(remaining.get(product_name, 0) for product_name in offer.eligible_product_names) // offer.group_size
+        )
+        units_left = groups * offer.group_size
+        saving = -groups * self.group_prices[position]
+        allocation: Allocation = {}
+        for price, product_name in sorted(
+            (self.prices[product_name], product_name) for product_name in offer.eligible_product_names
+        ):
+            if units := min(remaining.get(product_name, 0), units_left):
+                allocation[product_name] = units
+                saving += units * price
+                units_left -= units
+        return saving, allocation
+
+
+class _TooManySteps(Exception):
+    pass
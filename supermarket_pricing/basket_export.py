@@ -0,0 +1,300 @@
+"""
+Export of priced baskets in a columnar binary layout, for analytics tools to read without parsing receipts.
+
+An export file is a sequence of chunks, so a file can be appended to by later runs. Each chunk is laid out as:
+    header: magic, format version, the number of baskets, lines, offers and strings, 4 bytes of padding,
+        and the chunk length in bytes, 40 bytes in all
+    basket columns: basket_id, sub_total, savings, total
+    line columns: basket, product, quantity, is_by_kg, price
+    offer columns: basket, description, saving
+    strings: the offsets of each string, then the UTF-8 strings one after another
+
+Every column is a little-endian array padded to a multiple of 8 bytes, and as the header and so every chunk are too,
+every column starts 8 byte aligned and can be read from a memory map in place.
+basket is the row of the line's or offer's basket in the chunk, and basket_id, product and description are indexes
+into the chunk's strings, each distinct string being stored once. Amounts are in pence, and quantities are in millionths
+of a unit or kg, which keeps every digit a receipt displays.
+"""
+import mmap
+import os
+import struct
+import sys
+from array import array
+from itertools import repeat
+from typing import (
+    BinaryIO,
+    Dict,
+    Iterator,
+    List,
+    Literal,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from supermarket_pricing.catalogue_loader import PathOrStr
+from supermarket_pricing.exceptions import InvalidExportException
+from supermarket_pricing.line_store import AddedProduct, CompactLineStore
+from supermarket_pricing.product import to_pence
+from supermarket_pricing.shopping_cart import ShoppingCart
+
+MAGIC = b"SPBASKET"
+FORMAT_VERSION = 2  # Version 1 had a 36 byte header, so its columns were not 8 byte aligned
+HEADER = struct.Struct("<8sIIIII4xQ")  # magic, version, baskets, lines, offers, strings, padding, chunk length
+QUANTITY_SCALE = 6  # Quantities are stored in millionths
+UNITS_SCALE = 10**QUANTITY_SCALE
+
+ColumnType = Literal["B", "I", "q"]  # Array typecodes: unsigned 8 and 32 bit, and signed 64 bit integers
+ColumnLayout = Tuple[Tuple[str, ColumnType], ...]
+
+BASKET_COLUMNS: ColumnLayout = (("basket_id", "I"), ("sub_total", "q"), ("savings", "q"), ("total", "q"))
+LINE_COLUMNS: ColumnLayout = (("basket", "I"), ("product", "I"), ("quantity", "q"), ("is_by_kg", "B"), ("price", "q"))
+OFFER_COLUMNS: ColumnLayout = (("basket", "I"), ("description", "I"), ("saving", "q"))
+
+Columns = Dict[str, memoryview]
+
+
+class ExportChunk(NamedTuple):
+    """
+    The columns of a chunk of an export file, as views of the memory map, and its strings
+    """
+
+    baskets: Columns
+    lines: Columns
+    offers: Columns
+    strings: List[str]
+
+
+class BasketExportWriter:
+    """
+    Writes priced carts to an export file, buffering the columns of a chunk of baskets in typed arrays
+    and writing each chunk in one go. Only the product names, offer descriptions and basket ids which are new
+    to a chunk are encoded, so no string is built per line.
+    """
+
+    def __init__(self, file: Union[PathOrStr, BinaryIO], baskets_per_chunk: int = 65_536) -> None:
+        """
+        Args:
+            file (str | PathLike | BinaryIO): The path of the export file, which is appended to,
+                or a binary stream to write to, which is not closed.
+            baskets_per_chunk (int) [optional, default=65,536]: The number of baskets buffered before they are written.
+        """
+        if baskets_per_chunk < 1:
+            raise ValueError("baskets_per_chunk must be at least 1")
+        self.baskets_per_chunk = baskets_per_chunk
+        self.chunks_written = 0
+        if isinstance(file, (str, os.PathLike)):
+            self.__file: BinaryIO = open(file, "ab", buffering=1 << 20)
+            self.__owns_file = True
+        else:
+            self.__file = file
+            self.__owns_file = False
+        self.__start_chunk()
+
+    def write_cart(self, basket_id: str, cart: ShoppingCart) -> None:
+        """
+        Add a priced cart to the export, writing the chunk once it is full.
+
+        Args:
+            basket_id (str): The id of the basket.
+            cart (ShoppingCart): The cart holding the basket.
+        """
+        basket = len(self.__baskets["basket_id"])
+        self.__baskets["basket_id"].append(self.__string(basket_id))
+        self.__baskets["sub_total"].append(to_pence(cart.sub_total))
+        self.__baskets["savings"].append(to_pence(cart.savings))
+        self.__baskets["total"].append(to_pence(cart.total))
+        if isinstance(cart.products_in_cart, CompactLineStore):
+            self.__write_compact_lines(basket, cart.products_in_cart)
+        else:
+            self.__write_lines(basket, cart.products_in_cart)
+        offers = self.__offers
+        for applied_offer in cart.applied_offers:
+            offers["basket"].append(basket)
+            offers["description"].append(self.__string(applied_offer.description))
+            offers["saving"].append(to_pence(applied_offer.offer_amount))
+        if basket + 1 >= self.baskets_per_chunk:
+            self.flush()
+
+    def flush(self) -> None:
+        """
+        Write the baskets buffered so far as a chunk, if there are any.
+        """
+        if not (basket_count := len(self.__baskets["basket_id"])):
+            return
+        encoded_strings = [string.encode("utf-8") for string in self.__strings]
+        string_offsets = array("I", [0])
+        for encoded_string in encoded_strings:
+            string_offsets.append(string_offsets[-1] + len(encoded_string))
+        sections: List[Union[array, bytes]] = [
+            *self.__baskets.values(),
+            *self.__lines.values(),
+            *self.__offers.values(),
+            string_offsets,
+            b"".join(encoded_strings),
+        ]
+        if sys.byteorder == "big":
+            for section in sections:
+                if isinstance(section, array):
+                    section.byteswap()
+        chunk_length = HEADER.size + sum(_padded_length(_byte_length(section)) for section in sections)
+        self.__file.write(
+            HEADER.pack(
+                MAGIC,
+                FORMAT_VERSION,
+                basket_count,
+                len(self.__lines["basket"]),
+                len(self.__offers["basket"]),
+                len(self.__strings),
+                chunk_length,
+            )
+        )
+        for section in sections:
+            self.__file.write(section)
+            self.__file.write(bytes(_padded_length(_byte_length(section)) - _byte_length(section)))
+        self.chunks_written += 1
+        self.__start_chunk()
+
+    def close(self) -> None:
+        """
+        Write any buffered baskets, and close the file if the writer opened it.
+        """
+        self.flush()
+        if self.__owns_file:
+            self.__file.close()
+        else:
+            self.__file.flush()
+
+    def __enter__(self) -> "BasketExportWriter":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def __write_lines(self, basket: int, products_in_cart: List[AddedProduct]) -> None:
+        basket_column, product_column, quantity_column, is_by_kg_column, price_column = self.__lines.values()
+        for line in products_in_cart:
+            basket_column.append(basket)
+            product_column.append(self.__string(line.name))
+            quantity_column.append(int(line.quantity.scaleb(QUANTITY_SCALE)))
+            is_by_kg_column.append(1 if line.price_per_kg else 0)
+            price_column.append(to_pence(line.price))
+
+    def __write_compact_lines(self, basket: int, line_store: CompactLineStore) -> None:
+        """
+        Copy the lines of a CompactLineStore from its arrays, which already hold prices in pence
+        and weights in milligrams, so no line is turned into an AddedProduct.
+        """
+        basket_column, product_column, quantity_column, is_by_kg_column, price_column = self.__lines.values()
+        product_strings = [self.__string(product.name) for product in line_store.products]
+        product_is_by_kg = [1 if product.is_by_kg else 0 for product in line_store.products]
+        for product_id, quantity in zip(line_store.product_ids, line_store.quantities):
+            product_column.append(product_strings[product_id])
+            is_by_kg = product_is_by_kg[product_id]
+            quantity_column.append(quantity if is_by_kg else quantity * UNITS_SCALE)
+            is_by_kg_column.append(is_by_kg)
+        basket_column.extend(repeat(basket, len(line_store)))
+        price_column.extend(line_store.prices)
+
+    def __start_chunk(self) -> None:
+        self.__baskets = {name: array(typecode) for name, typecode in BASKET_COLUMNS}
+        self.__lines = {name: array(typecode) for name, typecode in LINE_COLUMNS}
+        self.__offers = {name: array(typecode) for name, typecode in OFFER_COLUMNS}
+        self.__strings: Dict[str, int] = {}  # Index of each string in the chunk, in the order first written
+
+    def __string(self, string: str) -> int:
+        if (index := self.__strings.get(string)) is None:
+            index = self.__strings[string] = len(self.__strings)
+        return index
+
+
+class BasketExportReader:
+    """
+    Reads an export file through a memory map, giving the columns of each chunk as views of the map, without copying.
+    The views must be released before the reader is closed.
+    """
+
+    def __init__(self, path: PathOrStr) -> None:
+        """
+        Args:
+            path (str | PathLike): The path of a file written by BasketExportWriter.
+        """
+        self.path = path
+        with open(path, "rb") as file:
+            self.__size = os.fstat(file.fileno()).st_size
+            self.__image: Optional[mmap.mmap] = (
+                mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) if self.__size else None
+            )
+
+    def chunks(self) -> Iterator[ExportChunk]:
+        """
+        Yields:
+            ExportChunk: The columns and strings of each chunk, in the order they were written.
+
+        Raises:
+            InvalidExportException: If the file is not an export file, or ends part way through a chunk.
+        """
+        offset = 0
+        while offset < self.__size:
+            chunk_length, chunk = self.__read_chunk(offset)
+            yield chunk
+            offset += chunk_length
+
+    def close(self) -> None:
+        """
+        Unmap the file.
+        """
+        if self.__image is not None:
+            self.__image.close()
+
+    def __enter__(self) -> "BasketExportReader":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def __read_chunk(self, offset: int) -> Tuple[int, ExportChunk]:
+        assert self.__image is not None
+        if self.__size - offset < HEADER.size:
+            raise InvalidExportException(f"Invalid export {self.path}: truncated chunk at byte {offset}")
+        magic, version, basket_count, line_count, offer_count, string_count, chunk_length = HEADER.unpack_from(
+            self.__image, offset
+        )
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise InvalidExportException(
+                f"Invalid export {self.path}: not a version {FORMAT_VERSION} chunk at {offset}"
+            )
+        if offset + chunk_length > self.__size:
+            raise InvalidExportException(f"Invalid export {self.path}: truncated chunk at byte {offset}")
+        view = memoryview(self.__image)
+        position = offset + HEADER.size
+
+        def column(typecode: ColumnType, length: int) -> memoryview:
+            nonlocal position
+            start = position
+            end = start + length * array(typecode).itemsize
+            position = start + _padded_length(end - start)
+            return view[start:end].cast(typecode)
+
+        baskets = {name: column(typecode, basket_count) for name, typecode in BASKET_COLUMNS}
+        lines = {name: column(typecode, line_count) for name, typecode in LINE_COLUMNS}
+        offers = {name: column(typecode, offer_count) for name, typecode in OFFER_COLUMNS}
+        string_offsets = column("I", string_count + 1)
+        strings = []
+        for string_start, string_end in zip(string_offsets, string_offsets[1:]):
+            start = position + string_start
+            end = position + string_end
+            strings.append(str(view[start:end], "utf-8"))
+        return chunk_length, ExportChunk(baskets, lines, offers, strings)
+
+
+def _byte_length(section: Union[array, bytes]) -> int:
+    return len(section) * section.itemsize if isinstance(section, array) else len(section)
+
+
+def _padded_length(length: int) -> int:
+    """
+    The length of a section padded to a multiple of 8 bytes.
+    """
+    return (length + 7) // 8 * 8
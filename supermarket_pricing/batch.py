@@ -0,0 +1,159 @@
+import os
+from collections import deque, namedtuple
+from decimal import Decimal
+from itertools import islice
+from typing import (
+    TYPE_CHECKING,
+    Deque,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from supermarket_pricing.compiled_catalogue import CatalogueProduct
+from supermarket_pricing.offers import Offer
+from supermarket_pricing.pricing_cache import PricingCache
+from supermarket_pricing.shopping_cart import ShoppingCart
+
+if TYPE_CHECKING:
+    from multiprocessing.pool import AsyncResult
+
+PricedBasket = namedtuple("PricedBasket", "sub_total savings total applied_offers")
+
+Quantity = Union[str, int, Decimal]
+Basket = Union[Mapping[str, Quantity], Iterable[Tuple[str, Quantity]]]
+
+
+class BasketPricer:
+    """
+    Prices baskets one after another with a single reused ShoppingCart,
+    so the product and offers catalogues are set up once rather than once per basket
+    """
+
+    def __init__(
+        self,
+        product_catalogue: Optional[Mapping[str, CatalogueProduct]] = None,
+        offers_catalogue: Optional[Tuple[Offer, ...]] = None,
+        pricing_cache: Optional[PricingCache] = None,
+    ) -> None:
+        """
+        Args:
+            product_catalogue (dict) [optional, default=None]: A dictionary of product names to Products
+                that are available to buy. Defaults to the default catalogue.
+            offers_catalogue (tuple) [optional, default=None]: A tuple of Offers that can be applied.
+                Defaults to the default offers.
+            pricing_cache (PricingCache) [optional, default=None]: A cache of offer results for repeated baskets.
+        """
+        self.cart = ShoppingCart(product_catalogue, offers_catalogue, pricing_cache=pricing_cache)
+
+    def price(self, basket: Basket) -> PricedBasket:
+        """
+        Price a single basket.
+
+        Args:
+            basket (Basket): A mapping of product names to quantities, or an iterable of (product name, quantity) lines.
+                Quantities are given as strings, integers or Decimals, as for ShoppingCart.add_product.
+
+        Returns:
+            PricedBasket: The sub total, savings, total and applied offers of the basket.
+
+        Raises:
+            InvalidProductException: If a product is not found in the catalog.
+            ProductQuantityException: If there is an issue with a quantity.
+        """
+        cart = self.cart
+        cart.clear()
+        for product_name, quantity in basket.items() if isinstance(basket, Mapping) else basket:
+            cart.add_product(product_name, str(quantity))
+        return PricedBasket(cart.sub_total, cart.savings, cart.total, tuple(cart.applied_offers))
+
+
+def price_baskets(
+    baskets: Iterable[Basket],
+    product_catalogue: Optional[Mapping[str, CatalogueProduct]] = None,
+    offers_catalogue: Optional[Tuple[Offer, ...]] = None,
+    pricing_cache: Optional[PricingCache] = None,
+) -> Iterator[PricedBasket]:
+    """
+    Price a stream of baskets lazily, so memory stays flat however many baskets there are.
+
+    Args:
+        baskets (iterable): Baskets, as mappings of product names to quantities or iterables of lines.
+        product_catalogue (dict) [optional, default=None]: A dictionary of product names to Products
+            that are available to buy. Defaults to the default catalogue.
+        offers_catalogue (tuple) [optional, default=None]: A tuple of Offers that can be applied.
+            Defaults to the default offers.
+        pricing_cache (PricingCache) [optional, default=None]: A cache of offer results for repeated baskets.
+
+    Yields:
+        PricedBasket: The sub total, savings, total and applied offers of each basket, in input order.
+    """
+    basket_pricer = BasketPricer(product_catalogue, offers_catalogue, pricing_cache)
+    for basket in baskets:
+        yield basket_pricer.price(basket)
+
+
+_worker_basket_pricer: Optional[BasketPricer] = None  # Set once in each worker process of price_baskets_parallel
+
+
+def _init_worker(
+    product_catalogue: Optional[Mapping[str, CatalogueProduct]], offers_catalogue: Optional[Tuple[Offer, ...]]
+) -> None:
+    """
+    Give a worker process its own BasketPricer, so the catalogues are sent once per worker rather than once per task.
+    Workers given no catalogues build the default catalogue themselves, rather than having it sent.
+    """
+    global _worker_basket_pricer
+    _worker_basket_pricer = BasketPricer(product_catalogue, offers_catalogue)
+
+
+def _price_chunk(baskets: List[Basket]) -> List[PricedBasket]:
+    """
+    Price a chunk of baskets in a worker process.
+    """
+    assert _worker_basket_pricer is not None, "Worker process has not been initialized"
+    return [_worker_basket_pricer.price(basket) for basket in baskets]
+
+
+def price_baskets_parallel(
+    baskets: Iterable[Basket],
+    product_catalogue: Optional[Mapping[str, CatalogueProduct]] = None,
+    offers_catalogue: Optional[Tuple[Offer, ...]] = None,
+    processes: Optional[int] = None,
+    chunksize: int = 1000,
+) -> Iterator[PricedBasket]:
+    """
+    Price a stream of baskets on a pool of worker processes, each with its own copy of the catalogues.
+    Baskets are sent to the workers in chunks, with at most two chunks per worker in flight,
+    so memory stays flat however many baskets there are.
+
+    Args:
+        baskets (iterable): Baskets, as mappings of product names to quantities or lists of lines, which can be pickled.
+        product_catalogue (dict) [optional, default=None]: A dictionary of product names to Products
+            that are available to buy. Defaults to the default catalogue.
+        offers_catalogue (tuple) [optional, default=None]: A tuple of Offers that can be applied.
+            Defaults to the default offers.
+        processes (int) [optional, default=os.cpu_count()]: The number of worker processes.
+        chunksize (int) [optional, default=1000]: The number of baskets sent to a worker at a time.
+
+    Yields:
+        PricedBasket: The sub total, savings, total and applied offers of each basket, in input order.
+    """
+    from multiprocessing import (
+        Pool,  # Only imported when baskets are priced in parallel, as it is slow to import
+    )
+
+    processes = processes or os.cpu_count() or 1
+    basket_iterator = iter(baskets)
+    with Pool(processes, initializer=_init_worker, initargs=(product_catalogue, offers_catalogue)) as pool:
+        pending_chunks: Deque["AsyncResult"] = deque()
+        while chunk := list(islice(basket_iterator, chunksize)):
+            pending_chunks.append(pool.apply_async(_price_chunk, (chunk,)))
+            if len(pending_chunks) >= 2 * processes:
+                yield from pending_chunks.popleft().get()
+        while pending_chunks:
+            yield from pending_chunks.popleft().get()
@@ -1,5 +1,15 @@
-from typing import Dict, Tuple
+"""
+The default product catalogue and offers, used by carts which are not given catalogues.
 
+PRODUCT_CATALOGUE and OFFERS are built the first time either is used rather than when the module is imported,
+so importing the cart does not pay for products and offers which a loaded catalogue replaces.
+Once built they are the same objects on every use, and the index of OFFERS is kept with them,
+so every cart using the default offers shares one index.
+"""
+from threading import Lock
+from typing import TYPE_CHECKING, Any, Dict, Tuple
+
+from supermarket_pricing.offer_index import OfferIndex
 from supermarket_pricing.offers import (
     Offer,
     ThreeForTwo,
@@ -8,23 +18,51 @@ from supermarket_pricing.offers import (
 )
 from supermarket_pricing.product import Price, Product, ProductByKg
 
-PRODUCT_CATALOGUE: Dict[str, Product] = {
-    "beans": Product("beans", Price("0.5")),
-    "coke": Product("coke", Price("0.7")),
-    "onions": ProductByKg("onions", Price("0.29")),
-    "oranges": ProductByKg("oranges", Price("1.99")),
-    "arbor ale": Product("arbor ale", Price("2.2")),
-    "kaleidoscope": Product("kaleidoscope", Price("2.5")),
-    "butcombe": Product("butcombe", Price("2.1")),
-}
-
-
-OFFERS: Tuple[Offer, ...] = (
-    ThreeForTwo(PRODUCT_CATALOGUE["beans"]),
-    TwoForPrice(PRODUCT_CATALOGUE["coke"], Price("1")),
-    ThreeFromSetForPrice(
-        (PRODUCT_CATALOGUE["arbor ale"], PRODUCT_CATALOGUE["kaleidoscope"], PRODUCT_CATALOGUE["butcombe"]),
-        Price("6"),
-        "ales",
-    ),
-)
+if TYPE_CHECKING:
+    PRODUCT_CATALOGUE: Dict[str, Product]
+    OFFERS: Tuple[Offer, ...]
+
+_build_lock = Lock()
+
+
+def build_default_catalogue() -> Tuple[Dict[str, Product], Tuple[Offer, ...]]:
+    """
+    Build a new copy of the default catalogue.
+
+    Returns:
+        tuple: A dictionary of product names to Products, and a tuple of Offers on those Products.
+    """
+    product_catalogue = {
+        "beans": Product("beans", Price("0.5")),
+        "coke": Product("coke", Price("0.7")),
+        "onions": ProductByKg("onions", Price("0.29")),
+        "oranges": ProductByKg("oranges", Price("1.99")),
+        "arbor ale": Product("arbor ale", Price("2.2")),
+        "kaleidoscope": Product("kaleidoscope", Price("2.5")),
+        "butcombe": Product("butcombe", Price("2.1")),
+    }
+    offers: Tuple[Offer, ...] = (
+        ThreeForTwo(product_catalogue["beans"]),
+        TwoForPrice(product_catalogue["coke"], Price("1")),
+        ThreeFromSetForPrice(
+            (product_catalogue["arbor ale"], product_catalogue["kaleidoscope"], product_catalogue["butcombe"]),
+            Price("6"),
+            "ales",
+        ),
+    )
+    return product_catalogue, offers
+
+
+def __getattr__(name: str) -> Any:
+    """
+    Build PRODUCT_CATALOGUE and OFFERS on first use, storing them as module globals so later uses are plain lookups.
+    """
+    if name not in ("PRODUCT_CATALOGUE", "OFFERS"):
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    with _build_lock:
+        if "OFFERS" not in globals():  # Not built by another thread meanwhile
+            product_catalogue, offers = build_default_catalogue()
+            globals().update(
+                PRODUCT_CATALOGUE=product_catalogue, OFFERS=offers, _offer_index=OfferIndex.for_offers(offers)
+            )
+    return globals()[name]
@@ -0,0 +1,290 @@
+"""
+Loading product and offers catalogues from JSON, in the format:
+
+    {
+        "products": [
+            {"name": "beans", "price": "0.5"},
+            {"name": "onions", "price": "0.29", "pricing_unit": "kg"}
+        ],
+        "offers": [
+            {"type": "three_for_two", "product": "beans"},
+            {"type": "two_for_price", "product": "coke", "price": "1"},
+            {
+                "type": "three_from_set_for_price",
+                "products": ["arbor ale", "kaleidoscope", "butcombe"],
+                "price": "6",
+                "category": "ales"
+            },
+            {"type": "n_for_m", "product": "beans", "buy": 3, "pay_for": 2},
+            {"type": "n_for_price", "product": "coke", "buy": 2, "price": "1"},
+            {"type": "buy_x_get_y_free", "product": "butcombe", "buy": 2, "free": 1},
+            {"type": "mix_and_match", "products": ["arbor ale", "butcombe"], "buy": 2, "price": "4", "category": "ales"}
+        ]
+    }
+
+The n_for_m, n_for_price, buy_x_get_y_free and mix_and_match offers are OfferSpecs, compiled into CompiledOffers.
+Prices are written as strings, so they are read into Decimals exactly as written.
+"""
+import json
+import os
+from decimal import Decimal, InvalidOperation
+from typing import Any, Callable, Dict, List, Mapping, NamedTuple, Tuple, Union
+
+from supermarket_pricing.exceptions import (
+    InvalidCatalogueException,
+    InvalidProductPriceException,
+)
+from supermarket_pricing.offer_specs import (
+    BuyXGetYFree,
+    CompiledOffer,
+    MixAndMatch,
+    NForM,
+    NForPrice,
+    compile_offer,
+)
+from supermarket_pricing.offers import (
+    Offer,
+    ThreeForTwo,
+    ThreeFromSetForPrice,
+    TwoForPrice,
+)
+from supermarket_pricing.product import Price, PricingUnits, Product, ProductByKg
+
+PathOrStr = Union[str, "os.PathLike[str]"]
+
+
+class Catalogue(NamedTuple):
+    """
+    A product catalogue and the offers which apply to it, as passed to ShoppingCart
+    """
+
+    product_catalogue: Dict[str, Product]
+    offers: Tuple[Offer, ...]
+
+
+def load_catalogue(path: PathOrStr) -> Catalogue:
+    """
+    Load a catalogue from a JSON file.
+
+    Args:
+        path (str | PathLike): The path of the JSON file.
+
+    Returns:
+        Catalogue: The product catalogue and offers.
+
+    Raises:
+        InvalidCatalogueException: If the file is not a valid catalogue.
+    """
+    with open(path, encoding="utf-8") as file:
+        try:
+            data = json.load(file, parse_float=Decimal)
+        except json.JSONDecodeError as error:
+            raise InvalidCatalogueException(f"Invalid catalogue {path}: {error}")
+    return parse_catalogue(data)
+
+
+def save_catalogue(path: PathOrStr, product_catalogue: Mapping[str, Product], offers: Tuple[Offer, ...]) -> None:
+    """
+    Save a catalogue to a JSON file which load_catalogue can read.
+
+    Args:
+        path (str | PathLike): The path of the JSON file.
+        product_catalogue (dict): A dictionary of product names to Products.
+        offers (tuple): A tuple of Offers for the products.
+    """
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(catalogue_to_dict(product_catalogue, offers), file, indent=2)
+        file.write("\n")
+
+
+def parse_catalogue(data: Any) -> Catalogue:
+    """
+    Build a catalogue from decoded JSON.
+
+    Args:
+        data (dict): The decoded JSON, with "products" and "offers" lists.
+
+    Returns:
+        Catalogue: The product catalogue and offers.
+
+    Raises:
+        InvalidCatalogueException: If the data is not a valid catalogue.
+    """
+    if not isinstance(data, dict) or not isinstance(data.get("products"), list):
+        raise InvalidCatalogueException("Invalid catalogue: expected an object with a list of products")
+    product_catalogue: Dict[str, Product] = {}
+    for product_data in data["products"]:
+        product = product_from_dict(product_data)
+        if product.name in product_catalogue:
+            raise InvalidCatalogueException(f"Invalid catalogue: product {product.name} is listed more than once")
+        product_catalogue[product.name] = product
+    offers = tuple(offer_from_dict(offer_data, product_catalogue) for offer_data in data.get("offers", []))
+    return Catalogue(product_catalogue, offers)
+
+
+def catalogue_to_dict(product_catalogue: Mapping[str, Product], offers: Tuple[Offer, ...]) -> Dict[str, List[Any]]:
+    """
+    Args:
+        product_catalogue (dict): A dictionary of product names to Products.
+        offers (tuple): A tuple of Offers for the products.
+
+    Returns:
+        dict: The catalogue in the JSON format read by parse_catalogue.
+    """
+    return {
+        "products": [
+            {"name": product.name, "price": str(Decimal(product.price)), "pricing_unit": product.pricing_unit.value}
+            for product in product_catalogue.values()
+        ],
+        "offers": [offer_to_dict(offer) for offer in offers],
+    }
+
+
+def product_from_dict(product_data: Any) -> Product:
+    """
+    Args:
+        product_data (dict): A product's name, price and optional pricing_unit, "unit" by default.
+
+    Returns:
+        Product: A Product, or a ProductByKg if priced by kg.
+
+    Raises:
+        InvalidCatalogueException: If the product is missing a field or has an invalid value,
+            including a price with more than 2 decimal places.
+    """
+    try:
+        name = product_data["name"]
+        price = _parse_price(product_data["price"])
+        pricing_unit = PricingUnits(product_data.get("pricing_unit", PricingUnits.UNIT.value))
+    except (KeyError, TypeError, ValueError) as error:
+        raise InvalidCatalogueException(f"Invalid product {product_data}: {error!r}")
+    if not isinstance(name, str) or not name:
+        raise InvalidCatalogueException(f"Invalid product {product_data}: name must be a non-empty string")
+    try:
+        return ProductByKg(name, price) if pricing_unit == PricingUnits.KG else Product(name, price)
+    except InvalidProductPriceException as error:
+        raise InvalidCatalogueException(f"Invalid product {product_data}: {error}")
+
+
+OfferBuilder = Callable[[Dict[str, Any], Callable[[str], Product]], Offer]
+
+OFFER_BUILDERS: Dict[str, OfferBuilder] = {
+    "three_for_two": lambda offer_data, product: ThreeForTwo(product(offer_data["product"])),
+    "two_for_price": lambda offer_data, product: TwoForPrice(
+        product(offer_data["product"]), _parse_price(offer_data["price"])
+    ),
+    "three_from_set_for_price": lambda offer_data, product: ThreeFromSetForPrice(
+        tuple(product(product_name) for product_name in offer_data["products"]),
+        _parse_price(offer_data["price"]),
+        offer_data["category"],
+    ),
+    "n_for_m": lambda offer_data, product: compile_offer(
+        NForM(product(offer_data["product"]), offer_data["buy"], offer_data["pay_for"])
+    ),
+    "n_for_price": lambda offer_data, product: compile_offer(
+        NForPrice(product(offer_data["product"]), offer_data["buy"], _parse_price(offer_data["price"]))
+    ),
+    "buy_x_get_y_free": lambda offer_data, product: compile_offer(
+        BuyXGetYFree(product(offer_data["product"]), offer_data["buy"], offer_data["free"])
+    ),
+    "mix_and_match": lambda offer_data, product: compile_offer(
+        MixAndMatch(
+            tuple(product(product_name) for product_name in offer_data["products"]),
+            offer_data["buy"],
+            _parse_price(offer_data["price"]),
+            offer_data["category"],
+        )
+    ),
+}
+
+
+def offer_from_dict(offer_data: Any, product_catalogue: Mapping[str, Product]) -> Offer:
+    """
+    Args:
+        offer_data (dict): An offer's type, and the fields for that type of offer.
+        product_catalogue (dict): A dictionary of product names to the Products the offer can refer to.
+
+    Returns:
+        Offer: The offer.
+
+    Raises:
+        InvalidCatalogueException: If the offer has an unknown type, a missing field, an invalid value,
+            or refers to a product which is not in the product catalogue.
+    """
+
+    def product(product_name: str) -> Product:
+        if (found_product := product_catalogue.get(product_name)) is None:
+            raise InvalidCatalogueException(f"Invalid offer {offer_data}: unknown product {product_name}")
+        return found_product
+
+    try:
+        offer_builder = OFFER_BUILDERS[offer_data["type"]]
+        return offer_builder(offer_data, product)
+    except (KeyError, TypeError, ValueError) as error:
+        raise InvalidCatalogueException(f"Invalid offer {offer_data}: {error!r}")
+
+
+def offer_to_dict(offer: Offer) -> Dict[str, Any]:
+    """
+    Args:
+        offer (Offer): An offer of one of the types in OFFER_BUILDERS.
+
+    Returns:
+        dict: The offer in the JSON format read by offer_from_dict.
+
+    Raises:
+        InvalidCatalogueException: If the type of offer can not be saved.
+    """
+    if isinstance(offer, CompiledOffer):
+        return _offer_spec_to_dict(offer)
+    if isinstance(offer, ThreeForTwo):
+        return {"type": "three_for_two", "product": offer.eligible_product.name}
+    if isinstance(offer, TwoForPrice):
+        return {
+            "type": "two_for_price",
+            "product": offer.eligible_product.name,
+            "price": str(Decimal(offer.offer_price)),
+        }
+    if isinstance(offer, ThreeFromSetForPrice):
+        return {
+            "type": "three_from_set_for_price",
+            "products": [product.name for product in offer.eligible_products],
+            "price": str(Decimal(offer.offer_price)),
+            "category": offer.offer_category,
+        }
+    raise InvalidCatalogueException(f"Offers of type {type(offer).__name__} can not be saved")
+
+
+def _offer_spec_to_dict(offer: CompiledOffer) -> Dict[str, Any]:
+    """
+    The JSON of a compiled offer, from its spec.
+    """
+    spec = offer.spec
+    if isinstance(spec, NForM):
+        return {"type": "n_for_m", "product": spec.product.name, "buy": spec.buy, "pay_for": spec.pay_for}
+    if isinstance(spec, NForPrice):
+        return {"type": "n_for_price", "product": spec.product.name, "buy": spec.buy, "price": str(Decimal(spec.price))}
+    if isinstance(spec, BuyXGetYFree):
+        return {"type": "buy_x_get_y_free", "product": spec.product.name, "buy": spec.buy, "free": spec.free}
+    return {
+        "type": "mix_and_match",
+        "products": [product.name for product in spec.products],
+        "buy": spec.buy,
+        "price": str(Decimal(spec.price)),
+        "category": spec.category,
+    }
+
+
+def _parse_price(price: Any) -> Price:
+    """
+    Read a price written as a string or number, keeping its exact decimal value.
+    """
+    if isinstance(price, bool) or not isinstance(price, (str, int, Decimal)):
+        raise ValueError(f"Invalid price {price!r}: must be a string or number")
+    try:
+        parsed_price = Price(price)
+    except InvalidOperation:
+        raise ValueError(f"Invalid price {price!r}: must be a valid number")
+    if not parsed_price.is_finite():  # NaN and Infinity parse, but can not be priced
+        raise ValueError(f"Invalid price {price!r}: must be a finite number")
+    return parsed_price
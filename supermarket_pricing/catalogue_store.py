@@ -0,0 +1,135 @@
+from threading import Lock
+from typing import Any, Mapping, NamedTuple, Optional, Tuple
+
+from supermarket_pricing import catalogue
+from supermarket_pricing.catalogue_loader import PathOrStr
+from supermarket_pricing.compiled_catalogue import CatalogueProduct
+from supermarket_pricing.mapped_catalogue import MappedCatalogue
+from supermarket_pricing.offer_index import OfferIndex
+from supermarket_pricing.offers import Offer
+from supermarket_pricing.shopping_cart import ShoppingCart
+
+
+class CatalogueSnapshot(NamedTuple):
+    """
+    A version of the product and offers catalogues, which must not be modified once published.
+    It holds the index of its offers, so carts created from it share one index for as long as it is in use.
+    """
+
+    version: int
+    product_catalogue: Mapping[str, CatalogueProduct]
+    offers: Tuple[Offer, ...]
+    offer_index: OfferIndex
+
+
+class CatalogueStore:
+    """
+    Holds the current CatalogueSnapshot, which can be replaced while carts are being priced, such as for a price change.
+    Publishing a snapshot only swaps a reference: carts keep the snapshot they were created with, without copying it,
+    until they are re-priced against the current snapshot.
+    """
+
+    def __init__(
+        self,
+        product_catalogue: Optional[Mapping[str, CatalogueProduct]] = None,
+        offers: Optional[Tuple[Offer, ...]] = None,
+    ) -> None:
+        """
+        Args:
+            product_catalogue (dict) [optional, default=None]: The first version of the product catalogue.
+                Defaults to the default catalogue.
+            offers (tuple) [optional, default=None]: The first version of the offers,
+                built from the Products in product_catalogue. Defaults to the default offers.
+        """
+        if product_catalogue is None:
+            product_catalogue = catalogue.PRODUCT_CATALOGUE
+        if offers is None:
+            offers = catalogue.OFFERS
+        self.__publish_lock = Lock()
+        self.__current = CatalogueSnapshot(1, product_catalogue, offers, OfferIndex.for_offers(offers))
+
+    @property
+    def current(self) -> CatalogueSnapshot:
+        """
+        Returns:
+            CatalogueSnapshot: The latest published snapshot.
+        """
+        return self.__current
+
+    def publish(
+        self, product_catalogue: Mapping[str, CatalogueProduct], offers: Tuple[Offer, ...]
+    ) -> CatalogueSnapshot:
+        """
+        Make new catalogues the current snapshot. Carts being priced are not paused, and keep their snapshot.
+
+        Args:
+            product_catalogue (dict): The new product catalogue.
+            offers (tuple): The new offers, built from the Products in product_catalogue.
+
+        Returns:
+            CatalogueSnapshot: The new snapshot.
+        """
+        with self.__publish_lock:
+            self.__current = CatalogueSnapshot(
+                self.__current.version + 1, product_catalogue, offers, OfferIndex.for_offers(offers)
+            )
+            return self.__current
+
+    def publish_image(self, path: PathOrStr) -> CatalogueSnapshot:
+        """
+        Make the catalogue image at a path the current snapshot, mapping it rather than loading it.
+        Earlier images stay mapped while carts still use them.
+
+        Args:
+            path (str | PathLike): The path of an image written by write_catalogue_image.
+
+        Returns:
+            CatalogueSnapshot: The new snapshot.
+
+        Raises:
+            InvalidCatalogueException: If the file is not a catalogue image.
+        """
+        mapped_catalogue = MappedCatalogue(path)
+        return self.publish(mapped_catalogue, mapped_catalogue.offers)
+
+    def new_cart(self, **cart_options: Any) -> ShoppingCart:
+        """
+        Create a cart pinned to the current snapshot.
+
+        Args:
+            cart_options: Options passed on to ShoppingCart, such as compact_lines or pricing_cache.
+
+        Returns:
+            ShoppingCart: An empty cart.
+        """
+        snapshot = self.__current
+        return ShoppingCart(snapshot.product_catalogue, snapshot.offers, **cart_options)
+
+    def is_current(self, cart: ShoppingCart) -> bool:
+        """
+        Args:
+            cart (ShoppingCart): A cart.
+
+        Returns:
+            bool: True if the cart is priced with the current snapshot.
+        """
+        snapshot = self.__current
+        return cart.product_catalogue is snapshot.product_catalogue and cart.offers_catalogue is snapshot.offers
+
+    def reprice(self, cart: ShoppingCart) -> CatalogueSnapshot:
+        """
+        Move a cart to the current snapshot, re-pricing only what has changed.
+
+        Args:
+            cart (ShoppingCart): A cart.
+
+        Returns:
+            CatalogueSnapshot: The snapshot the cart is now priced with.
+
+        Raises:
+            InvalidProductException: If a product in the cart is not in the current product catalogue.
+            ProductQuantityException: If a product in the cart has changed between priced by unit and by kg.
+        """
+        snapshot = self.__current
+        cart.reprice(snapshot.product_catalogue, snapshot.offers)
+        return snapshot
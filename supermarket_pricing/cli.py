@@ -0,0 +1,252 @@
+"""
+Price a scan log from the command line, writing basket totals or receipts as each basket closes.
+
+Usage:
+    python -m supermarket_pricing [INPUT] [--input-format csv|jsonl] [--output OUTPUT] [--receipts]
+        [--catalogue catalogue.json | --catalogue-image catalogue.img] [--export baskets.export]
+
+The scan log has one scan per line, as basket_id,product,quantity CSV rows (a header row is optional),
+or JSON lines {"basket_id": ..., "product": ..., "quantity": ...}. The rows of a basket must be consecutive.
+Baskets which can not be priced are reported on stderr and skipped, and the exit status is then 1.
+With --export, every priced basket is also appended to a columnar export file for analytics, see basket_export.
+"""
+import argparse
+import csv
+import json
+import sys
+from collections import namedtuple
+from contextlib import nullcontext
+from itertools import groupby
+from operator import itemgetter
+from typing import (
+    TYPE_CHECKING,
+    ContextManager,
+    Iterable,
+    Iterator,
+    List,
+    Literal,
+    Mapping,
+    Optional,
+    TextIO,
+    Tuple,
+)
+
+from supermarket_pricing import catalogue
+from supermarket_pricing.compiled_catalogue import CatalogueProduct, CompiledCatalogue
+from supermarket_pricing.exceptions import (
+    CatalogueException,
+    ProductException,
+    ShoppingCartException,
+)
+from supermarket_pricing.offers import Offer
+from supermarket_pricing.receipt_printer import receipt_rows
+from supermarket_pricing.shopping_cart import ShoppingCart
+
+if TYPE_CHECKING:
+    from supermarket_pricing.basket_export import BasketExportWriter
+
+ScanRow = namedtuple("ScanRow", "basket_id product quantity")
+BasketLines = Tuple[str, List[Tuple[str, str]]]
+
+CSV_HEADER = list(ScanRow._fields)
+TOTALS_HEADER = "basket_id,sub_total,savings,total\n"
+
+
+def read_csv_scans(file: TextIO) -> Iterator[ScanRow]:
+    """
+    Read scans from basket_id,product,quantity CSV rows, skipping a header row and blank lines.
+
+    Args:
+        file (TextIO): The text stream to read.
+
+    Yields:
+        ScanRow: Each scan, in the order of the file.
+
+    Raises:
+        ValueError: If a row does not have three fields.
+    """
+    for line_number, row in enumerate(csv.reader(file), 1):
+        if not row or (line_number == 1 and row == CSV_HEADER):
+            continue
+        if len(row) != 3:
+            raise ValueError(f"Line {line_number}: expected basket_id,product,quantity but got {row}")
+        yield ScanRow._make(row)
+
+
+def read_jsonl_scans(file: TextIO) -> Iterator[ScanRow]:
+    """
+    Read scans from JSON lines with basket_id, product and quantity fields, skipping blank lines.
+
+    Args:
+        file (TextIO): The text stream to read.
+
+    Yields:
+        ScanRow: Each scan, in the order of the file.
+
+    Raises:
+        ValueError: If a line is not valid JSON or is missing a field.
+    """
+    for line_number, line in enumerate(file, 1):
+        if not line.strip():
+            continue
+        try:
+            scan = json.loads(line)
+            yield ScanRow(str(scan["basket_id"]), scan["product"], str(scan["quantity"]))
+        except (ValueError, KeyError, TypeError) as error:
+            raise ValueError(f"Line {line_number}: invalid scan {line.strip()}: {error!r}")
+
+
+def group_baskets(scans: Iterable[ScanRow]) -> Iterator[BasketLines]:
+    """
+    Group consecutive scans with the same basket id into baskets, holding only one basket at a time.
+
+    Args:
+        scans (iterable): The scans, with the scans of each basket consecutive.
+
+    Yields:
+        tuple: The basket id and the (product, quantity) lines of each basket, as soon as the basket closes.
+    """
+    for basket_id, basket_scans in groupby(scans, key=itemgetter(0)):
+        yield basket_id, [(scan.product, scan.quantity) for scan in basket_scans]
+
+
+def price_scan_log(
+    baskets: Iterable[BasketLines],
+    output: TextIO,
+    errors: TextIO,
+    product_catalogue: Optional[Mapping[str, CatalogueProduct]] = None,
+    offers_catalogue: Optional[Tuple[Offer, ...]] = None,
+    receipts: bool = False,
+    baskets_per_write: int = 256,
+    export: Optional["BasketExportWriter"] = None,
+) -> int:
+    """
+    Price baskets with one reused cart, writing each basket's totals as a CSV row, or its receipt,
+    joined into a single write per batch of baskets.
+
+    Args:
+        baskets (iterable): The basket id and lines of each basket, which can be a generator.
+        output (TextIO): The text stream to write totals or receipts to.
+        errors (TextIO): The text stream to report baskets which can not be priced to.
+        product_catalogue (dict) [optional, default=None]: A dictionary of product names to Products
+            that are available to buy. Defaults to the default catalogue.
+        offers_catalogue (tuple) [optional, default=None]: A tuple of Offers that can be applied.
+            Defaults to the default offers.
+        receipts (bool) [optional, default=False]: Write receipts rather than totals.
+        baskets_per_write (int) [optional, default=256]: The number of baskets written in each write.
+        export (BasketExportWriter) [optional, default=None]: An export to add every priced basket to.
+
+    Returns:
+        int: The number of baskets which could not be priced.
+
+    Raises:
+        ValueError: If the scan log can not be read, after writing the baskets priced before it.
+    """
+    cart = ShoppingCart(product_catalogue, offers_catalogue)
+    pending_output: List[str] = [] if receipts else [TOTALS_HEADER]
+    failed_baskets = 0
+    try:
+        for basket_number, (basket_id, lines) in enumerate(baskets, 1):
+            cart.clear()
+            try:
+                for product_name, quantity in lines:
+                    cart.add_product(product_name, quantity)
+            except ShoppingCartException as error:
+                errors.write(f"Basket {basket_id}: {error}\n")
+                failed_baskets += 1
+                continue
+            if export is not None:
+                export.write_cart(basket_id, cart)
+            if receipts:
+                pending_output.append(f"Basket {basket_id}\n")
+                pending_output.extend(receipt_rows(cart))
+                pending_output.append("\n")
+            else:
+                pending_output.append(f"{basket_id},{cart.sub_total:.2f},{cart.savings:.2f},{cart.total:.2f}\n")
+            if basket_number % baskets_per_write == 0:
+                output.write("".join(pending_output))
+                pending_output.clear()
+    finally:  # Keep the output of the baskets priced, and exported, before a scan which can not be read
+        output.write("".join(pending_output))
+    return failed_baskets
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m supermarket_pricing", description=__doc__.split("\n\n")[0])
+    parser.add_argument("input", nargs="?", default="-", help="The scan log, - for stdin (default)")
+    parser.add_argument(
+        "--input-format", choices=["csv", "jsonl"], help="Defaults to jsonl for .jsonl files and csv otherwise"
+    )
+    parser.add_argument("--output", default="-", help="File to write to, - for stdout (default)")
+    parser.add_argument("--receipts", action="store_true", help="Write receipts rather than CSV totals")
+    parser.add_argument("--export", help="Columnar export file to append every priced basket to")
+    catalogue_options = parser.add_mutually_exclusive_group()
+    catalogue_options.add_argument("--catalogue", help="JSON catalogue of products and offers")
+    catalogue_options.add_argument("--catalogue-image", help="Catalogue image written by write_catalogue_image")
+    args = parser.parse_args(argv)
+
+    try:
+        product_catalogue, offers_catalogue = _load_catalogues(args)
+    except (OSError, CatalogueException, ProductException) as error:
+        print(f"Can not load catalogue: {error}", file=sys.stderr)
+        return 2
+
+    input_format = args.input_format or ("jsonl" if args.input.endswith(".jsonl") else "csv")
+    read_scans = read_jsonl_scans if input_format == "jsonl" else read_csv_scans
+    with (
+        _open(args.input, "r", sys.stdin) as input_file,
+        _open(args.output, "w", sys.stdout) as output_file,
+        _open_export(args.export) as export,
+    ):
+        try:
+            failed_baskets = price_scan_log(
+                group_baskets(read_scans(input_file)),
+                output_file,
+                sys.stderr,
+                product_catalogue,
+                offers_catalogue,
+                receipts=args.receipts,
+                export=export,
+            )
+        except ValueError as error:
+            print(f"Invalid scan log: {error}", file=sys.stderr)
+            return 2
+    return 1 if failed_baskets else 0
+
+
+def _load_catalogues(args: argparse.Namespace) -> Tuple[Mapping[str, CatalogueProduct], Tuple[Offer, ...]]:
+    """
+    Load the catalogue chosen on the command line, only importing the loader it needs.
+    """
+    if args.catalogue_image:
+        from supermarket_pricing.mapped_catalogue import MappedCatalogue
+
+        mapped_catalogue = MappedCatalogue(args.catalogue_image)
+        return mapped_catalogue, mapped_catalogue.offers
+    if args.catalogue:
+        from supermarket_pricing.catalogue_loader import load_catalogue
+
+        products, offers_catalogue = load_catalogue(args.catalogue)
+    else:
+        products, offers_catalogue = catalogue.PRODUCT_CATALOGUE, catalogue.OFFERS
+    return CompiledCatalogue.from_products(products.values()), offers_catalogue  # Cheaper to look up every scan
+
+
+def _open_export(path: Optional[str]) -> ContextManager[Optional["BasketExportWriter"]]:
+    """
+    Open an export to append priced baskets to, importing the export format only when there is one.
+    """
+    if path is None:
+        return nullcontext()
+    from supermarket_pricing.basket_export import BasketExportWriter
+
+    return BasketExportWriter(path)
+
+
+def _open(path: str, mode: Literal["r", "w"], standard_stream: TextIO) -> ContextManager[TextIO]:
+    """
+    Open a file with a large buffer, or use a standard stream, without closing it, for -.
+    """
+    if path == "-":
+        return nullcontext(standard_stream)
+    return open(path, mode, buffering=1 << 20, newline="")
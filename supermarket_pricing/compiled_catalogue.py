@@ -0,0 +1,132 @@
+import sys
+from decimal import Decimal, InvalidOperation
+from typing import Dict, Iterable, Iterator, Mapping, NamedTuple, Optional, Tuple, Union
+
+from supermarket_pricing.exceptions import InvalidProductPriceException
+from supermarket_pricing.product import (
+    PRICE_PLACES,
+    ROUND_DOWN_CONTEXT,
+    Price,
+    PricingUnits,
+    Product,
+)
+
+
+class CompiledProduct(NamedTuple):
+    """
+    Immutable, compact record of a product in a CompiledCatalogue,
+    with the checks ShoppingCart needs for every product added resolved up front
+    """
+
+    product_id: int
+    name: str
+    price: Price
+    pricing_unit: PricingUnits
+    is_by_kg: bool
+
+
+CatalogueProduct = Union[Product, CompiledProduct]
+
+
+class CompiledCatalogue(Mapping[str, CompiledProduct]):
+    """
+    Frozen product catalogue, mapping product names to CompiledProducts, which can be used in place of
+    a dictionary of Products. Product names are interned, equal prices share one Price,
+    and every product has an integer id for its position in the catalogue.
+    """
+
+    __slots__ = ("products", "__products_by_name")
+
+    def __init__(self, products: Iterable[Tuple[str, Decimal, PricingUnits]]) -> None:
+        """
+        Args:
+            products (iterable): The name, price and pricing unit of every product.
+
+        Raises:
+            InvalidProductPriceException: If a price is not a valid finite number or has more than 2 decimal places.
+        """
+        interned_prices: Dict[Decimal, Price] = {}
+        compiled_products = []
+        for product_id, (name, price, pricing_unit) in enumerate(products):
+            # Signalling NaNs can not be hashed, so non-finite prices go straight to be rejected
+            if not price.is_finite() or (compiled_price := interned_prices.get(price)) is None:
+                compiled_price = interned_prices[price] = self.__compile_price(price)
+            compiled_products.append(
+                CompiledProduct._make(
+                    (product_id, sys.intern(name), compiled_price, pricing_unit, pricing_unit == PricingUnits.KG)
+                )
+            )
+        self.products: Tuple[CompiledProduct, ...] = tuple(compiled_products)
+        self.__products_by_name = {product.name: product for product in self.products}
+
+    @classmethod
+    def from_products(cls, products: Iterable[Product]) -> "CompiledCatalogue":
+        """
+        Compile a catalogue from Products, such as the values of a dictionary catalogue.
+
+        Args:
+            products (iterable): The Products available to buy.
+
+        Returns:
+            CompiledCatalogue: The compiled catalogue.
+        """
+        return cls((product.name, product.price, product.pricing_unit) for product in products)
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Tuple[str, str, str]]) -> "CompiledCatalogue":
+        """
+        Compile a catalogue from rows of text, such as the rows of a CSV file.
+
+        Args:
+            rows (iterable): The name, price in pounds, and pricing unit ("unit" or "kg") of every product.
+
+        Returns:
+            CompiledCatalogue: The compiled catalogue.
+
+        Raises:
+            InvalidProductPriceException: If a price is not a valid finite number or has more than 2 decimal places.
+            ValueError: If a pricing unit is not "unit" or "kg".
+        """
+        parsed_prices: Dict[str, Decimal] = {}  # Parse each distinct price and unit once, as most products share them
+        parsed_pricing_units = {pricing_unit.value: pricing_unit for pricing_unit in PricingUnits}
+        try:
+            return cls(
+                (
+                    name,
+                    parsed_prices.get(price) or parsed_prices.setdefault(price, Decimal(price)),
+                    parsed_pricing_units.get(pricing_unit) or PricingUnits(pricing_unit),
+                )
+                for name, price, pricing_unit in rows
+            )
+        except InvalidOperation:
+            raise InvalidProductPriceException("Invalid product price: must be a valid number")
+
+    def get(  # type: ignore[override]
+        self, product_name: str, default: Optional[CompiledProduct] = None
+    ) -> Optional[CompiledProduct]:
+        return self.__products_by_name.get(product_name, default)
+
+    def __getitem__(self, product_name: str) -> CompiledProduct:
+        return self.__products_by_name[product_name]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.__products_by_name)
+
+    def __len__(self) -> int:
+        return len(self.products)
+
+    @staticmethod
+    def __compile_price(price: Decimal) -> Price:
+        """
+        Validate a price and round it to two decimal places.
+
+        Raises:
+            InvalidProductPriceException: If the price is not finite or has more than 2 decimal places.
+        """
+        if not price.is_finite():
+            raise InvalidProductPriceException(f"Invalid product price {price}: must be a finite number")
+        if int(price.as_tuple().exponent) < -2:  # A finite price's exponent is an int
+            raise InvalidProductPriceException(
+                f"Invalid product price {price}: must not have more than 2 decimal places"
+            )
+        return Price(price.quantize(PRICE_PLACES, None, ROUND_DOWN_CONTEXT))
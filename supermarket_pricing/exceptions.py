@@ -1,3 +1,7 @@
+from collections import namedtuple
+from typing import List
+
+
 class ShoppingCartException(Exception):
     pass
 
@@ -10,9 +14,52 @@ class InvalidProductException(ShoppingCartException):
     pass
 
 
+class LineNotFoundException(ShoppingCartException):
+    pass
+
+
+LineError = namedtuple("LineError", "line_number product_name quantity error")
+
+
+class InvalidLinesException(ShoppingCartException):
+    """
+    Raised when adding many lines at once and some are invalid, listing every invalid line rather than the first
+    """
+
+    def __init__(self, line_errors: List[LineError]) -> None:
+        """
+        Args:
+            line_errors (list): A LineError for each invalid line, with its 1-based line number and the exception
+                add_product would have raised for it.
+        """
+        self.line_errors = line_errors
+        super().__init__(
+            "; ".join(
+                f"line {line_error.line_number} ({line_error.product_name}): {line_error.error}"
+                for line_error in line_errors
+            )
+        )
+
+
 class ProductException(Exception):
     pass
 
 
 class InvalidProductPriceException(ProductException):
     pass
+
+
+class CatalogueException(Exception):
+    pass
+
+
+class InvalidCatalogueException(CatalogueException):
+    pass
+
+
+class ExportException(Exception):
+    pass
+
+
+class InvalidExportException(ExportException):
+    pass
@@ -0,0 +1,161 @@
+"""
+Opt-in timing instrumentation for the pricing hot paths.
+
+While enabled, call counts and cumulative wall time are recorded for ShoppingCart.add_product,
+quantity parsing, price rounding, and Offer.check_and_apply for each offer by its short_description.
+Instrumentation works by wrapping those methods on their classes while enabled and restoring the originals
+when disabled, so there is no overhead at all when it is off. Times are inclusive: the time of add_product
+includes the parsing and rounding it does.
+"""
+import time
+from dataclasses import dataclass
+from functools import wraps
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from supermarket_pricing.offers import Offer
+from supermarket_pricing.shopping_cart import ShoppingCart
+
+StageKey = Tuple[str, str]  # Stage name, and offer short_description for offer stages or "" otherwise
+
+
+@dataclass
+class StageTiming:
+    """
+    Call count and cumulative wall time of a stage
+    """
+
+    calls: int = 0
+    seconds: float = 0.0
+
+
+class Instrumentation:
+    """
+    Records timings of the pricing stages while enabled, and exports them as a summary table or
+    in Prometheus text format. Can be used as a context manager. Only one instance can be enabled at a time.
+    """
+
+    __enabled: Optional["Instrumentation"] = None
+
+    def __init__(self) -> None:
+        self.timings: Dict[StageKey, StageTiming] = {}
+        self.__originals: Dict[Tuple[type, str], Any] = {}
+
+    def enable(self) -> None:
+        """
+        Start recording timings.
+
+        Raises:
+            RuntimeError: If instrumentation is already enabled.
+        """
+        if Instrumentation.__enabled is not None:
+            raise RuntimeError("Instrumentation is already enabled")
+        Instrumentation.__enabled = self
+        self.__wrap(ShoppingCart, "add_product", lambda method: self.__timed(("add_product", ""), method))
+        self.__wrap(
+            ShoppingCart, "_ShoppingCart__parse_quantity", lambda method: self.__timed(("parse_quantity", ""), method)
+        )
+        self.__wrap(
+            ShoppingCart,
+            "_ShoppingCart__round_down_price",
+            lambda method: self.__timed(("round_down_price", ""), method),
+        )
+        self.__wrap(Offer, "check_and_apply", self.__timed_offer)
+
+    def disable(self) -> None:
+        """
+        Stop recording timings, restoring the uninstrumented methods. The recorded timings are kept.
+        """
+        for (owner, attribute_name), original in self.__originals.items():
+            setattr(owner, attribute_name, original)
+        self.__originals.clear()
+        if Instrumentation.__enabled is self:
+            Instrumentation.__enabled = None
+
+    def reset(self) -> None:
+        """
+        Discard the recorded timings.
+        """
+        self.timings.clear()
+
+    def __enter__(self) -> "Instrumentation":
+        self.enable()
+        return self
+
+    def __exit__(self, *_exc_info: object) -> None:
+        self.disable()
+
+    def summary_table(self) -> str:
+        """
+        Returns:
+            str: A table of the calls, total time and mean time of each stage, slowest stage first.
+        """
+        rows = [f"| {'stage':<16} | {'offer':<24} | {'calls':>8} | {'total ms':>10} | {'mean µs':>10} |"]
+        for (stage, offer), timing in sorted(self.timings.items(), key=lambda item: item[1].seconds, reverse=True):
+            mean_microseconds = timing.seconds / timing.calls * 1_000_000 if timing.calls else 0.0
+            rows.append(
+                f"| {stage:<16} | {offer:<24} | {timing.calls:>8} | {timing.seconds * 1000:>10.3f} | "
+                f"{mean_microseconds:>10.3f} |"
+            )
+        return "\n".join(rows) + "\n"
+
+    def prometheus_text(self) -> str:
+        """
+        Returns:
+            str: The calls and total time of each stage as counters in the Prometheus text exposition format.
+        """
+        lines = []
+        for metric, description, value_of in (
+            ("supermarket_pricing_calls_total", "Number of calls to each pricing stage.", lambda t: t.calls),
+            ("supermarket_pricing_seconds_total", "Cumulative wall time of each pricing stage.", lambda t: t.seconds),
+        ):
+            lines.append(f"# HELP {metric} {description}")
+            lines.append(f"# TYPE {metric} counter")
+            for (stage, offer), timing in sorted(self.timings.items()):
+                labels = f'stage="{stage}"' + (f',offer="{self.__escape_label(offer)}"' if offer else "")
+                lines.append(f"{metric}{{{labels}}} {value_of(timing)}")
+        return "\n".join(lines) + "\n"
+
+    def __wrap(self, owner: type, attribute_name: str, make_wrapper: Callable[[Callable], Callable]) -> None:
+        """
+        Replace a method on a class with a timed wrapper, remembering the original to restore.
+        """
+        original = self.__originals[(owner, attribute_name)] = owner.__dict__[attribute_name]
+        if isinstance(original, staticmethod):
+            setattr(owner, attribute_name, staticmethod(make_wrapper(original.__func__)))
+        else:
+            setattr(owner, attribute_name, make_wrapper(original))
+
+    def __timing(self, key: StageKey) -> StageTiming:
+        if (timing := self.timings.get(key)) is None:
+            timing = self.timings[key] = StageTiming()
+        return timing
+
+    def __timed(self, key: StageKey, function: Callable) -> Callable:
+        @wraps(function)
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                timing = self.__timing(key)
+                timing.seconds += time.perf_counter() - start
+                timing.calls += 1
+
+        return timed
+
+    def __timed_offer(self, check_and_apply: Callable) -> Callable:
+        @wraps(check_and_apply)
+        def timed_check_and_apply(offer, product_quantities):
+            start = time.perf_counter()
+            try:
+                return check_and_apply(offer, product_quantities)
+            finally:
+                timing = self.__timing(("offer", offer.short_description))
+                timing.seconds += time.perf_counter() - start
+                timing.calls += 1
+
+        return timed_check_and_apply
+
+    @staticmethod
+    def __escape_label(value: str) -> str:
+        return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
@@ -0,0 +1,198 @@
+from array import array
+from bisect import bisect_left, insort
+from collections import namedtuple
+from decimal import Decimal
+from typing import Callable, Dict, Iterable, Iterator, List, Mapping, Sequence, overload
+
+from supermarket_pricing.compiled_catalogue import CatalogueProduct
+from supermarket_pricing.product import (
+    MILLIGRAMS_PER_KG,
+    Price,
+    Weight,
+    from_pence,
+    to_pence,
+)
+
+AddedProduct = namedtuple("AddedProduct", "name quantity price price_per_kg")
+
+# The largest quantity or price in pence a CompactLineStore can hold, the maximum of a signed 64 bit integer.
+MAX_STORED_VALUE = 2**63 - 1
+
+
+class CompactLineStore(Sequence[AddedProduct]):
+    """
+    Stores the lines of a cart as product ids, integer quantities and prices in pence in typed arrays,
+    rather than an AddedProduct per line. Lines are only turned into AddedProduct views when read,
+    such as when the receipt printer iterates them.
+
+    Quantities are stored as a count of units, or milligrams for products priced by kg. Carts using the store
+    reject quantities priced by kg that are not a whole number of milligrams, so stored quantities are exact,
+    and quantities or prices in pence larger than MAX_STORED_VALUE.
+    """
+
+    def __init__(self) -> None:
+        self.product_ids = array("l")
+        self.quantities = array("q")
+        self.prices = array("q")
+        self.__products: List[CatalogueProduct] = []
+        self.__product_ids: Dict[str, int] = {}
+
+    @property
+    def products(self) -> Sequence[CatalogueProduct]:
+        """
+        Returns:
+            sequence: The products of the lines, indexed by the product ids in product_ids.
+        """
+        return self.__products
+
+    def add(self, product: CatalogueProduct, quantity: Decimal, price: Price) -> None:
+        """
+        Add a line to the store.
+
+        Args:
+            product (Product | CompiledProduct): The product added.
+            quantity (Decimal): The quantity added, a whole number if the product is priced by unit,
+                or a whole number of milligrams if priced by kg.
+            price (Price): The price of the line, rounded to two decimal places.
+        """
+        if (product_id := self.__product_ids.get(product.name)) is None:
+            product_id = self.__product_ids[product.name] = len(self.__products)
+            self.__products.append(product)
+        self.product_ids.append(product_id)
+        self.quantities.append(int(quantity * MILLIGRAMS_PER_KG) if product.is_by_kg else int(quantity))
+        self.prices.append(to_pence(price))
+
+    def replace(self, line_number: int, quantity: Decimal, price: Price) -> None:
+        """
+        Change the quantity and price of a line, keeping its product and position.
+
+        Args:
+            line_number (int): The position of the line.
+            quantity (Decimal): The new quantity, a whole number if the product is priced by unit,
+                or a whole number of milligrams if priced by kg.
+            price (Price): The new price of the line, rounded to two decimal places.
+        """
+        product = self.__products[self.product_ids[line_number]]
+        self.quantities[line_number] = int(quantity * MILLIGRAMS_PER_KG) if product.is_by_kg else int(quantity)
+        self.prices[line_number] = to_pence(price)
+
+    def reprice(
+        self,
+        products: Mapping[str, CatalogueProduct],
+        price_line: Callable[[CatalogueProduct, Decimal], Price],
+    ) -> Price:
+        """
+        Replace products with new versions priced the same way, such as with new prices, and re-price their lines.
+
+        Args:
+            products (dict): A dictionary of product names to the new versions of products.
+            price_line (callable): Calculates the price of a line from a product and quantity.
+
+        Returns:
+            Price: The change in the total price of the lines.
+        """
+        repriced_product_ids = set()
+        for product_name, product in products.items():
+            if (product_id := self.__product_ids.get(product_name)) is not None:
+                self.__products[product_id] = product
+                repriced_product_ids.add(product_id)
+        change_in_pence = 0
+        for line_number, product_id in enumerate(self.product_ids):
+            if product_id in repriced_product_ids:
+                line = self[line_number]
+                pence = to_pence(price_line(self.__products[product_id], line.quantity))
+                change_in_pence += pence - self.prices[line_number]
+                self.prices[line_number] = pence
+        return from_pence(change_in_pence)
+
+    @overload
+    def __getitem__(self, index: int) -> AddedProduct:
+        ...
+
+    @overload
+    def __getitem__(self, index: slice) -> List[AddedProduct]:
+        ...
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[line_number] for line_number in range(*index.indices(len(self)))]
+        product = self.__products[self.product_ids[index]]
+        quantity = self.quantities[index]
+        return AddedProduct(
+            product.name,
+            Weight(Decimal(quantity).scaleb(-6)) if product.is_by_kg else Decimal(quantity),
+            from_pence(self.prices[index]),
+            product.price if product.is_by_kg else 0,
+        )
+
+    def __delitem__(self, line_number: int) -> None:
+        del self.product_ids[line_number]
+        del self.quantities[line_number]
+        del self.prices[line_number]
+
+    def __iter__(self) -> Iterator[AddedProduct]:
+        return (self[line_number] for line_number in range(len(self)))
+
+    def __len__(self) -> int:
+        return len(self.product_ids)
+
+
+class LineIndex:
+    """
+    Tracks the positions of each product's lines in a cart, so the latest line of a product is found, and lines are
+    removed, without passing over the rest of the cart.
+
+    Each line is given an id in the order lines are added. A line's position is its id less the number of lines
+    removed before it, counted by bisecting the sorted ids of the removed lines, so removing a line does not
+    renumber the lines after it.
+    """
+
+    def __init__(self) -> None:
+        self.__line_ids = array("q")  # The id of the line at each position
+        self.__line_ids_by_product: Dict[str, List[int]] = {}  # Ascending
+        self.__removed_line_ids: List[int] = []  # Ascending
+
+    def add(self, product_name: str) -> None:
+        """
+        Add a line after the last line.
+
+        Args:
+            product_name (str): The name of the line's product.
+        """
+        line_id = len(self.__line_ids) + len(self.__removed_line_ids)
+        self.__line_ids.append(line_id)
+        self.__line_ids_by_product.setdefault(product_name, []).append(line_id)
+
+    def extend(self, product_names: Iterable[str]) -> None:
+        """
+        Add lines after the last line.
+
+        Args:
+            product_names (iterable): The name of each line's product.
+        """
+        for product_name in product_names:
+            self.add(product_name)
+
+    def remove(self, line_number: int, product_name: str) -> None:
+        """
+        Remove a line, moving the lines after it back one position.
+
+        Args:
+            line_number (int): The position of the line, not negative.
+            product_name (str): The name of the line's product.
+        """
+        line_id = self.__line_ids.pop(line_number)
+        product_line_ids = self.__line_ids_by_product[product_name]
+        del product_line_ids[bisect_left(product_line_ids, line_id)]
+        insort(self.__removed_line_ids, line_id)
+
+    def last_line_number(self, product_name: str) -> int:
+        """
+        Args:
+            product_name (str): The name of a product with lines.
+
+        Returns:
+            int: The position of the latest line of the product.
+        """
+        line_id = self.__line_ids_by_product[product_name][-1]
+        return line_id - bisect_left(self.__removed_line_ids, line_id)
@@ -0,0 +1,216 @@
+"""
+A binary catalogue image, which worker processes memory map rather than parse, so they share one read-only copy
+of the catalogue through the page cache and are ready to price as soon as the file is mapped.
+
+The image is laid out as:
+    header: magic, format version, product count, and the offsets of the sections below
+    records: one fixed size record per product, sorted by UTF-8 name, holding the offset and length of the name,
+        the pricing unit and the price in pence
+    names: the UTF-8 names of the products, one after another
+    offers: the offers, as the JSON written by catalogue_loader.offer_to_dict
+
+Products are found by binary search over the records and decoded only when first looked up.
+"""
+import json
+import mmap
+import os
+import struct
+from typing import Dict, Iterator, Mapping, Optional, Tuple
+
+from supermarket_pricing.catalogue_loader import (
+    PathOrStr,
+    offer_from_dict,
+    offer_to_dict,
+)
+from supermarket_pricing.compiled_catalogue import CatalogueProduct, CompiledProduct
+from supermarket_pricing.exceptions import InvalidCatalogueException
+from supermarket_pricing.offers import Offer
+from supermarket_pricing.product import (
+    Price,
+    PricingUnits,
+    Product,
+    ProductByKg,
+    from_pence,
+    to_pence,
+)
+
+MAGIC = b"SPCATIMG"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<8sII4Q")  # magic, version, product count, records, names, offers offsets, offers length
+RECORD = struct.Struct("<IHBxq")  # name offset, name length, 1 if priced by kg, price in pence
+PRICING_UNIT_CODES = {PricingUnits.UNIT: 0, PricingUnits.KG: 1}
+PRICING_UNITS = {code: pricing_unit for pricing_unit, code in PRICING_UNIT_CODES.items()}
+
+
+def write_catalogue_image(
+    path: PathOrStr, product_catalogue: Mapping[str, CatalogueProduct], offers: Tuple[Offer, ...]
+) -> None:
+    """
+    Write a catalogue image, replacing any image at the path atomically,
+    so processes which have mapped the old image keep using it until they reopen the path.
+
+    Args:
+        path (str | PathLike): The path of the image.
+        product_catalogue (dict): A dictionary of product names to Products, or a CompiledCatalogue.
+        offers (tuple): A tuple of Offers for the products.
+
+    Raises:
+        InvalidCatalogueException: If a type of offer can not be saved.
+    """
+    encoded_products = sorted(
+        (product.name.encode("utf-8"), product) for product in product_catalogue.values()
+    )  # UTF-8 byte order, which the binary search compares in
+    names = bytearray()
+    records = bytearray()
+    for encoded_name, product in encoded_products:
+        pence = to_pence(product.price)
+        records += RECORD.pack(len(names), len(encoded_name), PRICING_UNIT_CODES[product.pricing_unit], pence)
+        names += encoded_name
+    encoded_offers = json.dumps([offer_to_dict(offer) for offer in offers]).encode("utf-8")
+    records_offset = HEADER.size
+    names_offset = records_offset + len(records)
+    offers_offset = names_offset + len(names)
+    header = HEADER.pack(
+        MAGIC, FORMAT_VERSION, len(encoded_products), records_offset, names_offset, offers_offset, len(encoded_offers)
+    )
+    temporary_path = f"{os.fspath(path)}.{os.getpid()}.tmp"
+    with open(temporary_path, "wb") as file:
+        file.write(header)
+        file.write(records)
+        file.write(names)
+        file.write(encoded_offers)
+    os.replace(temporary_path, path)
+
+
+class MappedCatalogue(Mapping[str, CompiledProduct]):
+    """
+    Read-only product catalogue backed by a memory mapped catalogue image, mapping product names to CompiledProducts,
+    which can be used in place of a dictionary of Products. Product ids are positions in name order.
+    """
+
+    def __init__(self, path: PathOrStr) -> None:
+        """
+        Args:
+            path (str | PathLike): The path of an image written by write_catalogue_image.
+
+        Raises:
+            InvalidCatalogueException: If the file is not a catalogue image.
+        """
+        with open(path, "rb") as file:
+            if os.fstat(file.fileno()).st_size < HEADER.size:
+                raise InvalidCatalogueException(f"Invalid catalogue image {path}: file is too short")
+            self.__image = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        (
+            magic,
+            version,
+            self.__product_count,
+            self.__records_offset,
+            self.__names_offset,
+            offers_offset,
+            offers_length,
+        ) = HEADER.unpack_from(self.__image)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            self.close()
+            raise InvalidCatalogueException(f"Invalid catalogue image {path}: not a version {FORMAT_VERSION} image")
+        self.__offers_section = (offers_offset, offers_offset + offers_length)
+        self.__products_by_name: Dict[str, CompiledProduct] = {}  # Products decoded so far
+        self.__prices: Dict[int, Price] = {}
+        self.__offers: Optional[Tuple[Offer, ...]] = None
+
+    @property
+    def offers(self) -> Tuple[Offer, ...]:
+        """
+        Returns:
+            tuple: The offers in the image, built the first time they are needed.
+        """
+        if self.__offers is None:
+            offers_data = json.loads(self.__image[slice(*self.__offers_section)])
+            offer_products = _OfferProducts(self)
+            self.__offers = tuple(offer_from_dict(offer_data, offer_products) for offer_data in offers_data)
+        return self.__offers
+
+    def get(  # type: ignore[override]
+        self, product_name: str, default: Optional[CompiledProduct] = None
+    ) -> Optional[CompiledProduct]:
+        if (product := self.__products_by_name.get(product_name)) is None:
+            if (index := self.__find(product_name.encode("utf-8"))) is None:
+                return default
+            product = self.__products_by_name[product_name] = self.__decode(index)
+        return product
+
+    def __getitem__(self, product_name: str) -> CompiledProduct:
+        if (product := self.get(product_name)) is None:
+            raise KeyError(product_name)
+        return product
+
+    def __iter__(self) -> Iterator[str]:
+        for index in range(self.__product_count):
+            yield self.__name(index).decode("utf-8")
+
+    def __len__(self) -> int:
+        return self.__product_count
+
+    def close(self) -> None:
+        """
+        Unmap the image. Products and offers already looked up stay usable.
+        """
+        self.__image.close()
+
+    def __enter__(self) -> "MappedCatalogue":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def __find(self, encoded_name: bytes) -> Optional[int]:
+        """
+        Binary search the records for a product name.
+        """
+        low, high = 0, self.__product_count
+        while low < high:
+            middle = (low + high) // 2
+            if (name := self.__name(middle)) < encoded_name:
+                low = middle + 1
+            elif name > encoded_name:
+                high = middle
+            else:
+                return middle
+        return None
+
+    def __name(self, index: int) -> bytes:
+        name_offset, name_length, _, _ = RECORD.unpack_from(self.__image, self.__records_offset + index * RECORD.size)
+        name_start = self.__names_offset + name_offset
+        name_end = name_start + name_length
+        return self.__image[name_start:name_end]
+
+    def __decode(self, index: int) -> CompiledProduct:
+        _, _, pricing_unit_code, pence = RECORD.unpack_from(self.__image, self.__records_offset + index * RECORD.size)
+        if (price := self.__prices.get(pence)) is None:
+            price = self.__prices[pence] = from_pence(pence)
+        pricing_unit = PRICING_UNITS[pricing_unit_code]
+        return CompiledProduct(
+            index, self.__name(index).decode("utf-8"), price, pricing_unit, pricing_unit == PricingUnits.KG
+        )
+
+
+class _OfferProducts(Mapping[str, Product]):
+    """
+    Products of a MappedCatalogue as Products, for building the offers which refer to them
+    """
+
+    def __init__(self, catalogue: MappedCatalogue) -> None:
+        self.catalogue = catalogue
+        self.products: Dict[str, Product] = {}  # So offers for the same product share one Product
+
+    def __getitem__(self, product_name: str) -> Product:
+        if (product := self.products.get(product_name)) is None:
+            compiled_product = self.catalogue[product_name]
+            product_type = ProductByKg if compiled_product.is_by_kg else Product
+            product = self.products[product_name] = product_type(compiled_product.name, compiled_product.price)
+        return product
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.catalogue)
+
+    def __len__(self) -> int:
+        return len(self.catalogue)
@@ -0,0 +1,89 @@
+from typing import Dict, Iterable, List, Tuple
+from weakref import WeakValueDictionary
+
+from supermarket_pricing.offers import Offer
+
+
+class OfferIndex:
+    """
+    Inverted index from product names to the offers which reference them,
+    so a cart only checks the offers for the products it holds rather than the whole offers catalogue.
+    Offers which do not declare eligible_products are candidates for every product, so they are still checked.
+    """
+
+    # Indexes by the id of their offers catalogue, kept only while a cart or snapshot holds them,
+    # so replaced catalogues are not kept alive by the cache. Tuples can not be weakly referenced themselves.
+    __cached_indexes: "WeakValueDictionary[int, OfferIndex]" = WeakValueDictionary()
+
+    def __init__(self, offers: Tuple[Offer, ...]) -> None:
+        """
+        Args:
+            offers (tuple): A tuple of Offers to index.
+        """
+        self.offers = offers
+        offer_positions_by_product: Dict[str, List[int]] = {}
+        for position, offer in enumerate(offers):
+            for product_name in offer.eligible_product_names:
+                offer_positions_by_product.setdefault(product_name, []).append(position)
+        self.unindexed_positions = tuple(
+            position for position, offer in enumerate(offers) if not offer.eligible_product_names
+        )
+        self.offer_positions_by_product = {
+            product_name: tuple(sorted({*positions, *self.unindexed_positions}))
+            for product_name, positions in offer_positions_by_product.items()
+        }
+
+    @classmethod
+    def for_offers(cls, offers: Tuple[Offer, ...]) -> "OfferIndex":
+        """
+        Get the index for an offers catalogue, building it only the first time the catalogue is seen,
+        so carts sharing a catalogue share one index. An index is only cached while something holds it,
+        so a catalogue used by short-lived carts should keep its index, as CatalogueSnapshot does.
+
+        Args:
+            offers (tuple): A tuple of Offers.
+
+        Returns:
+            OfferIndex: The index of the offers.
+        """
+        if (offer_index := cls.__cached_indexes.get(id(offers))) is None or offer_index.offers is not offers:
+            offer_index = cls.__cached_indexes[id(offers)] = cls(offers)
+        return offer_index
+
+    def offer_positions(self, product_name: str) -> Tuple[int, ...]:
+        """
+        Args:
+            product_name (str): The name of a product.
+
+        Returns:
+            tuple: The positions in the offers catalogue of the offers which reference the product,
+                or which do not declare their products.
+        """
+        return self.offer_positions_by_product.get(product_name, self.unindexed_positions)
+
+    def candidate_positions(self, product_names: Iterable[str]) -> List[int]:
+        """
+        Args:
+            product_names (iterable): The names of the products in a cart.
+
+        Returns:
+            list: The positions in the offers catalogue of the offers which reference any of the products,
+                or which do not declare their products, in order.
+        """
+        return sorted(
+            {
+                *self.unindexed_positions,
+                *(position for product_name in product_names for position in self.offer_positions(product_name)),
+            }
+        )
+
+    def candidate_offers(self, product_names: Iterable[str]) -> List[Offer]:
+        """
+        Args:
+            product_names (iterable): The names of the products in a cart.
+
+        Returns:
+            list: The offers which reference any of the products, or which do not declare their products,
+                in the order of the offers catalogue.
+        """
+        return [self.offers[position] for position in self.candidate_positions(product_names)]
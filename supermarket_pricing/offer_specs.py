@@ -0,0 +1,276 @@
+"""
+Offers defined as data, as OfferSpecs, and compiled once into CompiledOffers.
+
+Compiling works out everything which does not depend on the cart, such as the group size, the saving of each group
+in pence, and the products of a set grouped into price tiers, so evaluating an offer is a few integer operations
+on the quantities of its products.
+
+The hand-written offers are expressible as specs, via offer_spec:
+    ThreeForTwo(product) is NForM(product, 3, 2)
+    TwoForPrice(product, price) is NForPrice(product, 2, price)
+    ThreeFromSetForPrice(products, price, category) is MixAndMatch(products, 3, price, category)
+"""
+from dataclasses import dataclass
+from decimal import Decimal
+from itertools import groupby
+from typing import Callable, Dict, Optional, Tuple, Union
+
+from supermarket_pricing.offers import (
+    Offer,
+    OfferResult,
+    ThreeForTwo,
+    ThreeFromSetForPrice,
+    TwoForPrice,
+)
+from supermarket_pricing.product import Price, Product, from_pence, to_pence
+
+SavingsInPence = Callable[[Dict[str, Decimal]], Optional[int]]
+
+
+@dataclass(frozen=True)
+class NForM:
+    """
+    Buy a number of a product for the price of fewer, such as 3 for 2
+    """
+
+    product: Product
+    buy: int
+    pay_for: int
+
+    def __post_init__(self) -> None:
+        _check_count("buy", self.buy, minimum=1)
+        _check_count("pay_for", self.pay_for, minimum=0)
+        if self.pay_for >= self.buy:
+            raise ValueError(f"pay_for must be less than buy, got {self.pay_for} for {self.buy}")
+
+
+@dataclass(frozen=True)
+class NForPrice:
+    """
+    Buy a number of a product for a fixed price, such as 2 for £1
+    """
+
+    product: Product
+    buy: int
+    price: Price
+
+    def __post_init__(self) -> None:
+        _check_count("buy", self.buy, minimum=1)
+        to_pence(self.price)
+
+
+@dataclass(frozen=True)
+class BuyXGetYFree:
+    """
+    Buy a number of a product and get more of it free, such as buy 2 get 1 free
+    """
+
+    product: Product
+    buy: int
+    free: int
+
+    def __post_init__(self) -> None:
+        _check_count("buy", self.buy, minimum=1)
+        _check_count("free", self.free, minimum=1)
+
+
+@dataclass(frozen=True)
+class MixAndMatch:
+    """
+    Buy a number of any products from a set for a fixed price, discounting the cheapest products
+    """
+
+    products: Tuple[Product, ...]
+    buy: int
+    price: Price
+    category: str
+
+    def __post_init__(self) -> None:
+        if not self.products:
+            raise ValueError("products must not be empty")
+        _check_count("buy", self.buy, minimum=1)
+        to_pence(self.price)
+
+
+OfferSpec = Union[NForM, NForPrice, BuyXGetYFree, MixAndMatch]
+
+
+class CompiledOffer(Offer):
+    """
+    An Offer evaluated by a function compiled from an OfferSpec, which can be used anywhere a hand-written Offer is
+    """
+
+    def __init__(
+        self,
+        spec: OfferSpec,
+        short_description: str,
+        group_size: int,
+        savings_in_pence: SavingsInPence,
+        group_price: Optional[Price] = None,
+    ):
+        """
+        Args:
+            spec (OfferSpec): The spec the offer was compiled from.
+            short_description (str): The description of the offer, for receipts.
+            group_size (int): The number of units the offer uses each time it applies.
+            savings_in_pence (callable): Calculates the savings in pence from the product quantities,
+                or None if the offer is not eligible.
+            group_price (Price) [optional, default=None]: The price paid for each group of units, see Offer.
+        """
+        self.spec = spec
+        self.short_description = short_description
+        self.group_size = group_size
+        self.group_price = group_price
+        self.eligible_products = spec.products if isinstance(spec, MixAndMatch) else (spec.product,)
+        self.__savings_in_pence = savings_in_pence
+
+    def is_eligible(self, product_quantities: Dict[str, Decimal]) -> bool:
+        """
+        Args:
+            product_quantities (dict): A dictionary of product names to quantities.
+
+        Returns:
+            bool: True if the offer is eligible, False otherwise.
+        """
+        return self.__savings_in_pence(product_quantities) is not None
+
+    def offer_amount(self, product_quantities: Dict[str, Decimal]) -> Price:
+        """
+        Args:
+            product_quantities (dict): A dictionary of product names to quantities.
+
+        Returns:
+            Price: The amount of discount or savings.
+        """
+        return self.evaluate(product_quantities).offer_amount
+
+    def evaluate(self, product_quantities: Dict[str, Decimal]) -> OfferResult:
+        """
+        Check if the offer is eligible and calculate the offer amount with the compiled function.
+
+        Args:
+            product_quantities (dict): A dictionary of product names to quantities.
+
+        Returns:
+            OfferResult: Whether the offer is eligible, and the amount of discount or savings, Price(0) if not eligible.
+        """
+        if (savings := self.__savings_in_pence(product_quantities)) is None:
+            return OfferResult(False, Price(0))
+        return OfferResult(True, from_pence(savings))
+
+    def __repr__(self) -> str:
+        return f"CompiledOffer({self.spec!r})"
+
+
+def compile_offer(spec: OfferSpec) -> CompiledOffer:
+    """
+    Compile an offer spec into an offer.
+
+    Args:
+        spec (OfferSpec): The spec of the offer.
+
+    Returns:
+        CompiledOffer: The offer, evaluated in integer pence.
+
+    Raises:
+        ValueError: If the spec is not a type of OfferSpec.
+    """
+    if isinstance(spec, NForM):
+        saving_per_group = (spec.buy - spec.pay_for) * to_pence(spec.product.price)
+        description = f"{spec.product.name} {spec.buy} for {spec.pay_for}"
+        group_price = Price(spec.pay_for * spec.product.price)
+        savings_in_pence = _multi_buy(spec.product.name, spec.buy, saving_per_group)
+        return CompiledOffer(spec, description, spec.buy, savings_in_pence, group_price)
+    if isinstance(spec, NForPrice):
+        saving_per_group = spec.buy * to_pence(spec.product.price) - to_pence(spec.price)
+        description = f"{spec.product.name} {spec.buy} for {str(spec.price)}"
+        savings_in_pence = _multi_buy(spec.product.name, spec.buy, saving_per_group)
+        return CompiledOffer(spec, description, spec.buy, savings_in_pence, spec.price)
+    if isinstance(spec, BuyXGetYFree):
+        group_size = spec.buy + spec.free
+        saving_per_group = spec.free * to_pence(spec.product.price)
+        description = f"{spec.product.name} buy {spec.buy} get {spec.free} free"
+        group_price = Price(spec.buy * spec.product.price)
+        savings_in_pence = _multi_buy(spec.product.name, group_size, saving_per_group)
+        return CompiledOffer(spec, description, group_size, savings_in_pence, group_price)
+    if isinstance(spec, MixAndMatch):
+        description = f"{spec.category} {spec.buy} for {str(spec.price)}"
+        savings_in_pence = _mix_and_match(spec.products, spec.buy, to_pence(spec.price))
+        return CompiledOffer(spec, description, spec.buy, savings_in_pence, spec.price)
+    raise ValueError(f"Unknown offer spec {spec!r}")
+
+
+def offer_spec(offer: Offer) -> OfferSpec:
+    """
+    Express a hand-written offer as a spec, which compiles to an offer with the same results.
+
+    Args:
+        offer (Offer): A ThreeForTwo, TwoForPrice, ThreeFromSetForPrice or CompiledOffer.
+
+    Returns:
+        OfferSpec: The spec of the offer.
+
+    Raises:
+        ValueError: If the type of offer has no spec.
+    """
+    if isinstance(offer, CompiledOffer):
+        return offer.spec
+    if isinstance(offer, ThreeForTwo):
+        return NForM(offer.eligible_product, 3, 2)
+    if isinstance(offer, TwoForPrice):
+        return NForPrice(offer.eligible_product, 2, offer.offer_price)
+    if isinstance(offer, ThreeFromSetForPrice):
+        return MixAndMatch(offer.eligible_products, 3, Price(offer.offer_price), offer.offer_category)
+    raise ValueError(f"Offers of type {type(offer).__name__} have no spec")
+
+
+def _multi_buy(product_name: str, group_size: int, saving_per_group: int) -> SavingsInPence:
+    """
+    Build the savings function of an offer on groups of a single product.
+    """
+
+    def savings_in_pence(product_quantities: Dict[str, Decimal]) -> Optional[int]:
+        if groups := int(product_quantities.get(product_name, 0)) // group_size:
+            return groups * saving_per_group
+        return None
+
+    return savings_in_pence
+
+
+def _mix_and_match(products: Tuple[Product, ...], group_size: int, group_price: int) -> SavingsInPence:
+    """
+    Build the savings function of an offer on groups from a set of products, which discounts the cheapest products.
+    """
+    products_by_price = sorted(products, key=lambda product: product.price)
+    tier_prices = tuple(
+        pence for pence, _ in groupby(products_by_price, key=lambda product: to_pence(product.price))
+    )  # Cheapest first
+    product_tiers = tuple(
+        (product.name, tier_prices.index(to_pence(product.price))) for product in products_by_price
+    )  # The price tier of each product
+
+    def savings_in_pence(product_quantities: Dict[str, Decimal]) -> Optional[int]:
+        counts = [0] * len(tier_prices)
+        for product_name, tier in product_tiers:
+            if quantity := product_quantities.get(product_name):
+                counts[tier] += int(quantity)
+        if not (groups := sum(counts) // group_size):
+            return None
+        remaining_units = groups * group_size
+        full_price = 0
+        for pence, count in zip(tier_prices, counts):  # Take the cheapest products first
+            units = min(count, remaining_units)
+            full_price += units * pence
+            remaining_units -= units
+        return full_price - groups * group_price
+
+    return savings_in_pence
+
+
+def _check_count(field: str, count: int, minimum: int) -> None:
+    """
+    Raises:
+        ValueError: If a count of units is not an integer of at least the minimum.
+    """
+    if isinstance(count, bool) or not isinstance(count, int) or count < minimum:
+        raise ValueError(f"{field} must be an integer of at least {minimum}, got {count!r}")
@@ -1,21 +1,45 @@
 from abc import ABC, abstractmethod
+from collections import namedtuple
 from decimal import Decimal
-from typing import Dict, List, Tuple, Type
+from itertools import groupby
+from typing import Dict, FrozenSet, Hashable, List, Optional, Tuple
 
 from supermarket_pricing.product import Price, Product
+from supermarket_pricing.savings_tables import SavingsTables
+
+OfferResult = namedtuple("OfferResult", "is_eligible offer_amount")
 
 
 class Offer(ABC):
     """
-    Abstract class for any offer, is_eligible and offer_amount must be implemented
+    Abstract class for any offer, is_eligible and offer_amount must be implemented,
+    and eligible_products should be set to every product which can affect the offer,
+    otherwise the offer is re-checked whenever any product in a cart changes
+    Offers must not store state between calls, as one offer is shared by every cart using the offers catalogue
     """
 
+    eligible_products: Tuple[Product, ...] = ()
+    group_size = 1  # Number of units the offer uses each time it applies, used when allocating units between offers
+    # The price paid for each group of group_size units, for offers which save the full price of the units in each
+    # group less this, so units can be allocated between offers exactly. None for offers which save in other ways.
+    group_price: Optional[Price] = None
+
     def __init__(self) -> None:
         """
         Initialize an offer with a description of the offer.
         """
         self.short_description = ""
 
+    @property
+    def eligible_product_names(self) -> FrozenSet[str]:
+        """
+        The names of the products which can affect this offer, used to find the offers to re-check when a cart changes.
+
+        Returns:
+            frozenset: The names of the eligible products.
+        """
+        return frozenset(product.name for product in self.eligible_products)
+
     @abstractmethod
     def is_eligible(self, product_quantities: Dict[str, Decimal]) -> bool:
         """
@@ -42,6 +66,21 @@ class Offer(ABC):
         """
         raise NotImplementedError
 
+    def evaluate(self, product_quantities: Dict[str, Decimal]) -> OfferResult:
+        """
+        Check if the offer is eligible and calculate the offer amount in one pass, without modifying the offer.
+        Offers which share work between is_eligible and offer_amount should override this.
+
+        Args:
+            product_quantities (dict): A dictionary of product names to quantities.
+
+        Returns:
+            OfferResult: Whether the offer is eligible, and the amount of discount or savings, Price(0) if not eligible.
+        """
+        if self.is_eligible(product_quantities):
+            return OfferResult(True, self.offer_amount(product_quantities))
+        return OfferResult(False, Price(0))
+
     def check_and_apply(self, product_quantities: Dict[str, Decimal]) -> Price:
         """
         Check if the offer is eligible and apply it to the product quantities.
@@ -52,23 +91,63 @@ class Offer(ABC):
         Returns:
             Price: The amount of discount or savings if the offer is eligible, or Price(0) if not eligible.
         """
-        if self.is_eligible(product_quantities):
-            return self.offer_amount(product_quantities)
-        return Price(0)
+        return self.evaluate(product_quantities).offer_amount
 
 
-class ThreeForTwo(Offer):
+class SingleProductOffer(Offer):
+    """
+    Abstract class for offers whose result depends only on the quantity of one product,
+    which can look their results up in SavingsTables rather than calculating them.
+    savings_key must be equal for offers with the same result for every quantity, so they share a table.
+    """
+
+    eligible_product: Product
+    savings_tables: Optional[SavingsTables] = None
+    savings_key: Hashable = None
+
+    def evaluate(self, product_quantities: Dict[str, Decimal]) -> OfferResult:
+        """
+        Look the result up in the savings tables, if the offer has them and the quantity is within their bound,
+        otherwise calculate it.
+
+        Args:
+            product_quantities (dict): A dictionary of product names to quantities.
+
+        Returns:
+            OfferResult: Whether the offer is eligible, and the amount of discount or savings, Price(0) if not eligible.
+        """
+        if self.savings_tables is not None:
+            quantity = product_quantities.get(self.eligible_product.name, 0)
+            if (offer_result := self.savings_tables.lookup(self.savings_key, quantity, self.__evaluate)) is not None:
+                return offer_result
+        return super().evaluate(product_quantities)
+
+    def __evaluate(self, quantity: int) -> OfferResult:
+        """
+        Calculate the result for a whole quantity of the product, to build a savings table.
+        """
+        return super().evaluate({self.eligible_product.name: Decimal(quantity)})
+
+
+class ThreeForTwo(SingleProductOffer):
     """
     Three for the price of two offer
     """
 
-    def __init__(self, eligible_product: Product) -> None:
+    group_size = 3
+
+    def __init__(self, eligible_product: Product, savings_tables: Optional[SavingsTables] = None) -> None:
         """
         Args:
         eligible_product (Product): The eligible product for this offer.
+        savings_tables (SavingsTables) [optional, default=None]: Tables to look the savings up in, by quantity.
         """
         self.eligible_product = eligible_product
+        self.eligible_products = (eligible_product,)
         self.short_description = f"{eligible_product.name} 3 for 2"
+        self.group_price = Price(eligible_product.price * 2)
+        self.savings_tables = savings_tables
+        self.savings_key = (ThreeForTwo, eligible_product.price.as_tuple())
 
     def is_eligible(self, product_quantities: Dict[str, Decimal]) -> bool:
         """
@@ -97,20 +176,29 @@ class ThreeForTwo(Offer):
         return Price(number_of_offers * product_price)
 
 
-class TwoForPrice(Offer):
+class TwoForPrice(SingleProductOffer):
     """
     Two for a given price of two offer
     """
 
-    def __init__(self, eligible_product: Product, offer_price: Price) -> None:
+    group_size = 2
+
+    def __init__(
+        self, eligible_product: Product, offer_price: Price, savings_tables: Optional[SavingsTables] = None
+    ) -> None:
         """
         Args:
         eligible_product (Product): The eligible product for this offer.
         offer_price (Price): The price of the two products bought together
+        savings_tables (SavingsTables) [optional, default=None]: Tables to look the savings up in, by quantity.
         """
         self.eligible_product = eligible_product
+        self.eligible_products = (eligible_product,)
         self.offer_price = offer_price
+        self.group_price = offer_price
         self.short_description = f"{eligible_product.name} 2 for {str(offer_price)}"
+        self.savings_tables = savings_tables
+        self.savings_key = (TwoForPrice, eligible_product.price.as_tuple(), offer_price.as_tuple())
 
     def is_eligible(self, product_quantities: Dict[str, Decimal]) -> bool:
         """
@@ -145,6 +233,8 @@ class ThreeFromSetForPrice(Offer):
     Three items from a set for a given price, discounts the cheapest items in the set
     """
 
+    group_size = 3
+
     def __init__(self, eligible_products: Tuple[Product, ...], offer_price: Decimal, offer_category: str) -> None:
         """
         Args:
@@ -154,9 +244,14 @@ class ThreeFromSetForPrice(Offer):
         """
         self.eligible_products = eligible_products
         self.offer_price = offer_price
+        self.offer_category = offer_category
+        self.group_price = Price(offer_price)
         self.short_description = f"{offer_category} 3 for {str(offer_price)}"
-        self.product_list: List[Product | Type[Product]] = []
-        self.eligible_product_count = 0
+        products_sorted_by_price = sorted(eligible_products, key=lambda product: product.price)
+        self.product_names_by_price = tuple(
+            (Price(price), tuple(product.name for product in products))
+            for price, products in groupby(products_sorted_by_price, key=lambda product: product.price.as_tuple())
+        )  # Products grouped into price tiers, cheapest first, keeping equal prices with different exponents apart
 
     def is_eligible(self, product_quantities: Dict[str, Decimal]) -> bool:
         """
@@ -168,18 +263,9 @@ class ThreeFromSetForPrice(Offer):
         Returns:
             bool: True if the offer is eligible, False otherwise.
         """
-        eligible_product_names = [product.name for product in self.eligible_products]
-        found_products = {key: value for key, value in product_quantities.items() if key in eligible_product_names}
-        products_sorted_by_price = sorted(self.eligible_products, key=lambda product: product.price)
-        self.product_list = [
-            product for product in products_sorted_by_price for _ in range(int(found_products.get(product.name, 0)))
-        ]  # Store list of eligible products, to be used to calculate offer amount
-        self.eligible_product_count = len(
-            self.product_list
-        )  # Store count of eligible products, to be used to calculate offer amount
-        return self.eligible_product_count >= 3
+        return self.evaluate(product_quantities).is_eligible
 
-    def offer_amount(self, _product_quantities: Dict[str, Decimal]) -> Price:
+    def offer_amount(self, product_quantities: Dict[str, Decimal]) -> Price:
         """
         Calculate how many sets of three there are,
         and how much savings there are based on the product price minus the deal price.
@@ -191,7 +277,54 @@ class ThreeFromSetForPrice(Offer):
         Returns:
             Price: The amount of discount or savings.
         """
-        number_of_offers = self.eligible_product_count // 3
-        discounted_products = self.product_list[: number_of_offers * 3]
-        pre_discounted_price = sum(product.price for product in discounted_products)
+        return self.__discount(self.__count_price_tiers(product_quantities))
+
+    def evaluate(self, product_quantities: Dict[str, Decimal]) -> OfferResult:
+        """
+        Counts the products in each price tier once, and uses the counts for both eligibility and offer amount.
+
+        Args:
+            product_quantities (dict): A dictionary of product names to quantities.
+
+        Returns:
+            OfferResult: Whether the offer is eligible, and the amount of discount or savings, Price(0) if not eligible.
+        """
+        price_tiers = self.__count_price_tiers(product_quantities)
+        if sum(count for _, count in price_tiers) >= 3:
+            return OfferResult(True, self.__discount(price_tiers))
+        return OfferResult(False, Price(0))
+
+    def __count_price_tiers(self, product_quantities: Dict[str, Decimal]) -> List[Tuple[Price, int]]:
+        """
+        Count the eligible products in each price tier, so the cost depends on the number of products in the set
+        rather than the quantities in the cart.
+
+        Args:
+            product_quantities (dict): A dictionary of product names to quantities.
+
+        Returns:
+            list: Pairs of price and count of eligible products at that price, cheapest first.
+        """
+        return [
+            (price, sum(int(product_quantities.get(name, 0)) for name in names))
+            for price, names in self.product_names_by_price
+        ]
+
+    def __discount(self, price_tiers: List[Tuple[Price, int]]) -> Price:
+        """
+        Discount the cheapest products in as many sets of three as possible.
+
+        Args:
+            price_tiers (list): Pairs of price and count of eligible products at that price, cheapest first.
+
+        Returns:
+            Price: The amount of discount or savings.
+        """
+        number_of_offers = sum(count for _, count in price_tiers) // 3
+        remaining_discounted_products = number_of_offers * 3
+        pre_discounted_price = Decimal(0)
+        for price, count in price_tiers:  # Take the cheapest products first
+            if discounted_count := min(count, remaining_discounted_products):
+                pre_discounted_price += price * discounted_count
+                remaining_discounted_products -= discounted_count
         return Price(pre_discounted_price - (number_of_offers * self.offer_price))
@@ -0,0 +1,103 @@
+from collections import OrderedDict, namedtuple
+from decimal import Decimal
+from threading import Lock
+from typing import Dict, FrozenSet, Optional, Tuple
+
+from supermarket_pricing.offer_index import OfferIndex
+
+CachedOffers = namedtuple("CachedOffers", "offer_amounts applied_offers savings")
+CacheStats = namedtuple("CacheStats", "hits misses entries max_entries")
+
+BasketSignature = Tuple[OfferIndex, bool, FrozenSet[Tuple[str, Decimal]]]
+
+
+class PricingCache:
+    """
+    Bounded least recently used cache of offer results, keyed by a signature of a cart's product quantities,
+    so carts holding the same products as an earlier cart skip re-checking the offers.
+    One cache can be shared by many carts and by carts with different offers catalogues.
+
+    The signature includes the OfferIndex of the offers catalogue, which is rebuilt whenever a different offers
+    catalogue is used, so results for an old catalogue are never returned for a new one and are evicted over time.
+    Offers catalogues are tuples and are treated as immutable: to change the offers, build a new tuple.
+    """
+
+    def __init__(self, max_entries: int = 4096) -> None:
+        """
+        Args:
+            max_entries (int) [optional, default=4096]: The number of baskets to keep results for,
+                beyond which the least recently used are evicted.
+        """
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.__entries: "OrderedDict[BasketSignature, CachedOffers]" = OrderedDict()
+        self.__lock = Lock()
+
+    @staticmethod
+    def signature(
+        offer_index: OfferIndex, optimal_offers: bool, product_quantities: Dict[str, Decimal]
+    ) -> BasketSignature:
+        """
+        Build the canonical signature of a cart, which does not depend on the order products were added in.
+
+        Args:
+            offer_index (OfferIndex): The index of the cart's offers catalogue.
+            optimal_offers (bool): Whether the cart allocates units between overlapping offers.
+            product_quantities (dict): A dictionary of product names to quantities.
+
+        Returns:
+            tuple: The signature of the cart.
+        """
+        return offer_index, optimal_offers, frozenset(product_quantities.items())
+
+    def get(self, signature: BasketSignature) -> Optional[CachedOffers]:
+        """
+        Args:
+            signature (tuple): The signature of a cart.
+
+        Returns:
+            CachedOffers: The offer results for the signature, or None if they are not cached.
+        """
+        with self.__lock:
+            if (cached_offers := self.__entries.get(signature)) is None:
+                self.misses += 1
+                return None
+            self.__entries.move_to_end(signature)
+            self.hits += 1
+            return cached_offers
+
+    def put(self, signature: BasketSignature, cached_offers: CachedOffers) -> None:
+        """
+        Store the offer results for a signature, evicting the least recently used results if the cache is full.
+
+        Args:
+            signature (tuple): The signature of a cart.
+            cached_offers (CachedOffers): The offer amounts by position, applied offers and savings of the cart.
+        """
+        with self.__lock:
+            self.__entries[signature] = cached_offers
+            self.__entries.move_to_end(signature)
+            if len(self.__entries) > self.max_entries:
+                self.__entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """
+        Remove every cached result and reset the statistics.
+        """
+        with self.__lock:
+            self.__entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> CacheStats:
+        """
+        Returns:
+            CacheStats: The number of hits, misses and entries, and the maximum number of entries.
+        """
+        return CacheStats(self.hits, self.misses, len(self.__entries), self.max_entries)
+
+    def __len__(self) -> int:
+        return len(self.__entries)
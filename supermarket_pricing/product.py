@@ -1,9 +1,56 @@
 from dataclasses import dataclass
-from decimal import ROUND_DOWN, Decimal
+from decimal import (
+    ROUND_DOWN,
+    Context,
+    Decimal,
+    DivisionByZero,
+    InvalidOperation,
+    Overflow,
+)
 from enum import Enum
 
 from supermarket_pricing.exceptions import InvalidProductPriceException
 
+PENCE_PER_POUND = 100
+MILLIGRAMS_PER_KG = 1_000_000
+
+PRICE_PLACES = Decimal("0.01")
+WEIGHT_PLACES = Decimal("0.001")
+# Built once rather than per call, and passed positionally to quantize, which is much cheaper than rounding=ROUND_DOWN
+ROUND_DOWN_CONTEXT = Context(rounding=ROUND_DOWN, traps=[InvalidOperation, DivisionByZero, Overflow])
+
+
+def to_pence(price: Decimal) -> int:
+    """
+    Convert a price in pounds to integer pence.
+
+    Args:
+        price (Decimal): The price in pounds, a whole number of pence.
+
+    Returns:
+        int: The price in pence.
+
+    Raises:
+        ValueError: If the price is not a whole number of pence.
+    """
+    pence = Decimal(price) * PENCE_PER_POUND
+    if pence != pence.to_integral_value():
+        raise ValueError(f"Invalid price {price}: must be a whole number of pence")
+    return int(pence)
+
+
+def from_pence(pence: int) -> "Price":
+    """
+    Convert integer pence, or a NumPy integer, to a Price in pounds.
+
+    Args:
+        pence (int): The price in pence.
+
+    Returns:
+        Price: The price in pounds, with two decimal places.
+    """
+    return Price(Decimal(int(pence)).scaleb(-2))  # 2 places, as PENCE_PER_POUND is 100
+
 
 class Price(Decimal):
     """
@@ -12,21 +59,24 @@ class Price(Decimal):
     """
 
     def __str__(self):
-        return f"£{self.quantize(Decimal('00.00'), rounding=ROUND_DOWN):.2f}"
+        return "£" + str(self.quantize(PRICE_PLACES, None, ROUND_DOWN_CONTEXT))
 
     def __add__(self, other):
-        result = super().__add__(other)
-        if isinstance(other, Price):
-            return Price(result)
-        return Price(super(Price, result))
+        result = Decimal.__add__(self, other)
+        return result if result is NotImplemented else Price(result)
+
+    __radd__ = __add__  # So sum() of Prices without a start value is a Price
 
     def __sub__(self, other):
-        result = super().__sub__(other)
-        return Price(result)
+        result = Decimal.__sub__(self, other)
+        return result if result is NotImplemented else Price(result)
 
     def __mul__(self, other):
-        result = super().__mul__(other)
-        return Price(result)
+        result = Decimal.__mul__(self, other)
+        return result if result is NotImplemented else Price(result)
+
+
+MINIMUM_PRICE = Price(PRICE_PLACES)
 
 
 class Weight(Decimal):
@@ -35,7 +85,7 @@ class Weight(Decimal):
     """
 
     def __str__(self):
-        return f"{self.quantize(Decimal('0.000'), rounding=ROUND_DOWN):.3f}"
+        return str(self.quantize(WEIGHT_PLACES, None, ROUND_DOWN_CONTEXT))
 
 
 class PricingUnits(str, Enum):
@@ -62,6 +112,14 @@ class Product:
                 f"Invalid product price {self.price}: must not have more than 2 decimal places"
             )
 
+    @property
+    def is_by_kg(self) -> bool:
+        """
+        Returns:
+            bool: True if the product is priced by kg, False if priced by unit.
+        """
+        return self.pricing_unit == PricingUnits.KG
+
 
 @dataclass
 class ProductByKg(Product):
@@ -1,41 +1,98 @@
-from typing import Union
+import sys
+from typing import Iterable, Iterator, List, Optional, TextIO, Union
 
 from supermarket_pricing.product import Price
 from supermarket_pricing.shopping_cart import ShoppingCart
 
 
-def print_receipt_row(description: str, price: Union[str, Price] = "") -> None:
+def format_receipt_row(description: str, price: Union[str, Price] = "") -> str:
+    """
+    Format a single row of the receipt table.
+
+    Args:
+        description (str): The description of the line item.
+        price (Union[str, Price]): The price of the line item, can be blank.
+
+    Returns:
+        str: The row, ending with a new line.
+    """
+    return f"| {description.ljust(20)} | {str(price).rjust(6)} |\n"
+
+
+def print_receipt_row(description: str, price: Union[str, Price] = "", file: Optional[TextIO] = None) -> None:
     """
     Print a single row of the receipt table.
 
     Args:
         description (str): The description of the line item.
         price (Union[str, Price]): The price of the line item, can be blank.
+        file (TextIO) [optional, default=sys.stdout]: The text stream to write to.
     """
-    print("|", description.ljust(20), "|", str(price).rjust(6), "|")
+    (file or sys.stdout).write(format_receipt_row(description, price))
 
 
-def print_receipt(cart: ShoppingCart) -> None:
+def receipt_rows(cart: ShoppingCart) -> Iterator[str]:
     """
-    Print the itemized receipt for a shopping cart, including sub total, savings, and total amount.
+    Lazily format the itemized receipt for a shopping cart, including sub total, savings, and total amount.
 
     Args:
         cart (ShoppingCart): The shopping cart object.
+
+    Yields:
+        str: Each row of the receipt, ending with a new line.
     """
     for product in cart.products_in_cart:
         product_name = product.name.capitalize()
         if product.price_per_kg:
-            print_receipt_row(product_name)
-            print_receipt_row(f"{str(product.quantity)} kg @ {str(product.price_per_kg)}/kg", product.price)
+            yield format_receipt_row(product_name)
+            yield format_receipt_row(f"{str(product.quantity)} kg @ {str(product.price_per_kg)}/kg", product.price)
         else:
             quantity = (
                 f" x {product.quantity}" if product.quantity != 1 else ""
             )  # Only display product quantity if it's not 1
-            print_receipt_row(f"{product_name}{quantity}", product.price)
+            yield format_receipt_row(f"{product_name}{quantity}", product.price)
     if cart.savings:
-        print_receipt_row("**Sub-total**", cart.sub_total)
-        print_receipt_row("**Savings**")
+        yield format_receipt_row("**Sub-total**", cart.sub_total)
+        yield format_receipt_row("**Savings**")
         for offer in cart.applied_offers:
-            print_receipt_row(offer.description.capitalize(), f"-{str(offer.offer_amount)}")
-        print_receipt_row("**Total savings**", cart.savings)
-    print_receipt_row("**Total to Pay**", cart.total)
+            yield format_receipt_row(offer.description.capitalize(), f"-{str(offer.offer_amount)}")
+        yield format_receipt_row("**Total savings**", cart.savings)
+    yield format_receipt_row("**Total to Pay**", cart.total)
+
+
+def print_receipt(cart: ShoppingCart, file: Optional[TextIO] = None) -> None:
+    """
+    Print the itemized receipt for a shopping cart, including sub total, savings, and total amount.
+
+    Args:
+        cart (ShoppingCart): The shopping cart object.
+        file (TextIO) [optional, default=sys.stdout]: The text stream to write to.
+    """
+    (file or sys.stdout).write("".join(receipt_rows(cart)))
+
+
+def print_receipts(
+    carts: Iterable[ShoppingCart], file: Optional[TextIO] = None, separator: str = "\n", receipts_per_write: int = 256
+) -> None:
+    """
+    Print the receipts for many shopping carts, joining batches of receipts into a single write
+    rather than writing every row, for bulk exports to a file or pipe.
+    Each receipt is rendered as soon as its cart is taken from carts, so a generator can reuse one cart.
+
+    Args:
+        carts (iterable): The shopping cart objects, which can be a generator.
+        file (TextIO) [optional, default=sys.stdout]: The text stream to write to.
+        separator (str) [optional, default="\\n"]: Text written between receipts.
+        receipts_per_write (int) [optional, default=256]: The number of receipts joined into each write.
+    """
+    output = file or sys.stdout
+    pending_receipts: List[str] = []
+    for receipt_number, cart in enumerate(carts, 1):
+        if receipt_number > 1:
+            pending_receipts.append(separator)
+        pending_receipts.extend(receipt_rows(cart))
+        if receipt_number % receipts_per_write == 0:
+            output.write("".join(pending_receipts))
+            pending_receipts.clear()
+    if pending_receipts:
+        output.write("".join(pending_receipts))
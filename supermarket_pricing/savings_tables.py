@@ -0,0 +1,92 @@
+from collections import namedtuple
+from decimal import Decimal
+from threading import Lock
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple, TypeVar, Union
+
+TableStats = namedtuple("TableStats", "tables entries max_entries builds")
+
+Result = TypeVar("Result")
+
+
+class SavingsTables:
+    """
+    Memory bounded store of savings tables, for offers whose result depends only on the quantity of one product.
+    A table holds an offer's result for every whole quantity from 0 to max_quantity, and is built the first time
+    an offer with its key is evaluated, so carts sharing the store, and offers with the same key, share one table.
+    Above max_quantity offers fall back to calculating their result.
+
+    Tables are evicted oldest first once max_entries results are stored. Looking a table up does not take a lock,
+    only building one does, so evaluating offers from many threads does not contend.
+    """
+
+    def __init__(self, max_quantity: int = 256, max_entries: int = 65_536) -> None:
+        """
+        Args:
+            max_quantity (int) [optional, default=256]: The largest quantity each table holds a result for.
+            max_entries (int) [optional, default=65,536]: The number of results kept across every table,
+                beyond which the oldest tables are evicted.
+        """
+        if max_quantity < 0:
+            raise ValueError("max_quantity must not be negative")
+        if max_entries < max_quantity + 1:
+            raise ValueError("max_entries must be enough for at least one table")
+        self.max_quantity = max_quantity
+        self.max_entries = max_entries
+        self.builds = 0
+        self.__tables: Dict[Hashable, Tuple[Any, ...]] = {}  # In the order built, oldest first
+        self.__lock = Lock()
+
+    def lookup(
+        self, key: Hashable, quantity: Union[Decimal, int], evaluate: Callable[[int], Result]
+    ) -> Optional[Result]:
+        """
+        Look up the result for a quantity, building the table for the key if it is not stored.
+
+        Args:
+            key (Hashable): Identifies the results, equal for offers with the same result for every quantity.
+            quantity (Decimal | int): The quantity of the offer's product, only the whole units of which are used.
+            evaluate (callable): Calculates the result for a whole quantity, used to build the table.
+
+        Returns:
+            Result: The result for the quantity, or None if the quantity is above max_quantity.
+        """
+        if quantity > self.max_quantity:
+            return None
+        if (table := self.__tables.get(key)) is None:
+            table = self.__build(key, evaluate)
+        return table[int(quantity)]
+
+    def clear(self) -> None:
+        """
+        Remove every table, such as after prices change.
+        """
+        with self.__lock:
+            self.__tables.clear()
+
+    def stats(self) -> TableStats:
+        """
+        Returns:
+            TableStats: The number of tables and results stored, the most results kept, and the tables built so far.
+        """
+        with self.__lock:
+            return TableStats(
+                len(self.__tables), len(self.__tables) * (self.max_quantity + 1), self.max_entries, self.builds
+            )
+
+    def __len__(self) -> int:
+        return len(self.__tables)
+
+    def __build(self, key: Hashable, evaluate: Callable[[int], Result]) -> Tuple[Result, ...]:
+        """
+        Build the table for a key and store it, evicting the oldest tables if the store is full.
+        """
+        table = tuple(evaluate(quantity) for quantity in range(self.max_quantity + 1))
+        with self.__lock:
+            if (stored_table := self.__tables.get(key)) is not None:  # Built by another thread meanwhile
+                return stored_table
+            max_tables = self.max_entries // (self.max_quantity + 1)
+            while len(self.__tables) >= max_tables:
+                del self.__tables[next(iter(self.__tables))]
+            self.__tables[key] = table
+            self.builds += 1
+        return table
@@ -0,0 +1,159 @@
+import asyncio
+import threading
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import List, Mapping, Optional, Set, Tuple, Union
+
+from supermarket_pricing import catalogue
+from supermarket_pricing.batch import Basket, BasketPricer, PricedBasket
+from supermarket_pricing.compiled_catalogue import CatalogueProduct
+from supermarket_pricing.offers import Offer
+from supermarket_pricing.pricing_cache import PricingCache
+
+PendingRequest = Tuple[Basket, "asyncio.Future[PricedBasket]"]
+
+
+class PricingService:
+    """
+    Asyncio front end for pricing baskets, for use from request handlers.
+    Requests arriving within batch_window seconds of each other are coalesced into one batch,
+    which is priced by a single reused BasketPricer on an executor, so the event loop is never blocked
+    by pricing and the catalogues are set up once per worker thread rather than once per request.
+    While max_batches_in_flight batches are being priced, new requests wait and join the next batch,
+    so batches grow with the load rather than each request paying for a hand over to the executor.
+    """
+
+    def __init__(
+        self,
+        product_catalogue: Optional[Mapping[str, CatalogueProduct]] = None,
+        offers_catalogue: Optional[Tuple[Offer, ...]] = None,
+        batch_window: float = 0.001,
+        max_batch_size: int = 256,
+        max_batches_in_flight: int = 1,
+        executor: Optional[Executor] = None,
+        pricing_cache: Optional[PricingCache] = None,
+    ) -> None:
+        """
+        Args:
+            product_catalogue (dict) [optional, default=None]: A dictionary of product names to Products
+                that are available to buy. Defaults to the default catalogue.
+            offers_catalogue (tuple) [optional, default=None]: A tuple of Offers that can be applied.
+                Defaults to the default offers.
+            batch_window (float) [optional, default=0.001]: Seconds to wait after the first request of a batch
+                for more requests to join it. 0 prices the requests made before the event loop next runs.
+            max_batch_size (int) [optional, default=256]: The number of requests which sends a batch straight away.
+            max_batches_in_flight (int) [optional, default=1]: The number of batches priced at once,
+                which should match the number of executor workers.
+            executor (Executor) [optional, default=None]: A thread pool executor to price batches on.
+                By default the service uses, and shuts down on close, its own single worker thread.
+            pricing_cache (PricingCache) [optional, default=None]: A cache of offer results for repeated baskets.
+        """
+        self.product_catalogue = catalogue.PRODUCT_CATALOGUE if product_catalogue is None else product_catalogue
+        self.offers_catalogue = catalogue.OFFERS if offers_catalogue is None else offers_catalogue
+        self.batch_window = batch_window
+        self.max_batch_size = max_batch_size
+        self.max_batches_in_flight = max_batches_in_flight
+        self.pricing_cache = pricing_cache
+        self.executor = executor or ThreadPoolExecutor(max_workers=1, thread_name_prefix="pricing-service")
+        self.__owns_executor = executor is None
+        self.__pending: List[PendingRequest] = []
+        self.__flush_handle: Optional[asyncio.TimerHandle] = None
+        self.__batches_in_flight: Set["asyncio.Task[None]"] = set()
+        self.__worker_state = threading.local()
+        self.batches_priced = 0
+
+    async def price_basket(self, basket: Basket) -> PricedBasket:
+        """
+        Price a basket, together with any other baskets requested at about the same time.
+
+        Args:
+            basket (Basket): A mapping of product names to quantities, or an iterable of (product name, quantity) lines.
+
+        Returns:
+            PricedBasket: The sub total, savings, total and applied offers of the basket.
+
+        Raises:
+            InvalidProductException: If a product is not found in the catalog.
+            ProductQuantityException: If there is an issue with a quantity.
+        """
+        loop = asyncio.get_running_loop()
+        future: "asyncio.Future[PricedBasket]" = loop.create_future()
+        self.__pending.append((basket, future))
+        if len(self.__pending) >= self.max_batch_size:
+            self.__flush()
+        elif self.__flush_handle is None:
+            self.__flush_handle = loop.call_later(self.batch_window, self.__flush)
+        return await future
+
+    async def close(self) -> None:
+        """
+        Price any pending requests, wait for the batches in flight, and shut down the service's own executor.
+        """
+        self.__flush()
+        while self.__batches_in_flight:
+            await asyncio.gather(*self.__batches_in_flight, return_exceptions=True)
+        if self.__owns_executor:
+            self.executor.shutdown(wait=True)
+
+    async def __aenter__(self) -> "PricingService":
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        await self.close()
+
+    def __flush(self) -> None:
+        """
+        Send the pending requests to the executor as batches of up to max_batch_size,
+        unless max_batches_in_flight batches are already being priced, when they are sent as one finishes.
+        """
+        if self.__flush_handle is not None:
+            self.__flush_handle.cancel()
+            self.__flush_handle = None
+        while self.__pending and len(self.__batches_in_flight) < self.max_batches_in_flight:
+            batch = self.__pending[: self.max_batch_size]
+            del self.__pending[: self.max_batch_size]
+            batch_task = asyncio.create_task(self.__price_batch(batch))
+            self.__batches_in_flight.add(batch_task)
+            batch_task.add_done_callback(self.__batch_done)
+
+    def __batch_done(self, batch_task: "asyncio.Task[None]") -> None:
+        """
+        Send the requests which arrived while the batch was being priced, without waiting for the rest of the window,
+        as they have already waited for the batch in flight.
+        """
+        self.__batches_in_flight.discard(batch_task)
+        if self.__pending:
+            self.__flush()
+
+    async def __price_batch(self, batch: List[PendingRequest]) -> None:
+        """
+        Price a batch on the executor, then resolve each request's future with its result or error.
+        """
+        loop = asyncio.get_running_loop()
+        try:
+            results = await loop.run_in_executor(self.executor, self.__price_baskets, [basket for basket, _ in batch])
+        except Exception as error:  # The whole batch failed, for example the executor was shut down
+            results = [error] * len(batch)
+        self.batches_priced += 1
+        for (_, future), result in zip(batch, results):
+            if future.done():  # The caller was cancelled
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    def __price_baskets(self, baskets: List[Basket]) -> List[Union[PricedBasket, Exception]]:
+        """
+        Price a batch of baskets on an executor thread, with a BasketPricer kept for the thread,
+        returning the error in place of the result for a basket which can not be priced.
+        """
+        if (basket_pricer := getattr(self.__worker_state, "basket_pricer", None)) is None:
+            basket_pricer = BasketPricer(self.product_catalogue, self.offers_catalogue, self.pricing_cache)
+            self.__worker_state.basket_pricer = basket_pricer
+        results: List[Union[PricedBasket, Exception]] = []
+        for basket in baskets:
+            try:
+                results.append(basket_pricer.price(basket))
+            except Exception as error:
+                results.append(error)
+        return results
@@ -1,42 +1,100 @@
 from collections import namedtuple
-from decimal import ROUND_DOWN, Decimal, InvalidOperation
-from typing import Dict, List, Tuple
+from decimal import Decimal, InvalidOperation
+from typing import Dict, Iterable, List, Mapping, Optional, Set, Tuple, Union
 
-from supermarket_pricing.catalogue import OFFERS, PRODUCT_CATALOGUE
+from supermarket_pricing import catalogue
+from supermarket_pricing.compiled_catalogue import CatalogueProduct
 from supermarket_pricing.exceptions import (
+    InvalidLinesException,
     InvalidProductException,
+    LineError,
+    LineNotFoundException,
     ProductQuantityException,
 )
+from supermarket_pricing.line_store import (
+    MAX_STORED_VALUE,
+    AddedProduct,
+    CompactLineStore,
+    LineIndex,
+)
+from supermarket_pricing.offer_index import OfferIndex
 from supermarket_pricing.offers import Offer
-from supermarket_pricing.product import Price, PricingUnits, Product, Weight
+from supermarket_pricing.pricing_cache import CachedOffers, PricingCache
+from supermarket_pricing.product import (
+    MILLIGRAMS_PER_KG,
+    MINIMUM_PRICE,
+    PENCE_PER_POUND,
+    PRICE_PLACES,
+    ROUND_DOWN_CONTEXT,
+    Price,
+    Weight,
+)
 
-AddedProduct = namedtuple("AddedProduct", "name quantity price price_per_kg")
 AppliedOffer = namedtuple("AppliedOffer", "description offer_amount")
 
+Lines = Union[Mapping[str, str], Iterable[Tuple[str, str]]]
+
 
 class ShoppingCart:
     """
     Represents a ShoppingCart which items can be added to,
     and calculate the sub_total, savings and total from the items in the cart
+
+    Totals are maintained incrementally: adding or removing a product updates a running sub total and marks only
+    the offers for that product as needing to be re-checked, so reading the totals is O(1) when nothing has changed.
+    With optimal_offers, any change re-allocates the units between every offer for the products in the cart.
+    With a pricing_cache, the offer results are looked up by the cart's product quantities before re-checking.
     """
 
     def __init__(
         self,
-        product_catalogue: Dict[str, Product] = PRODUCT_CATALOGUE,
-        offers_catalogue: Tuple[Offer, ...] = OFFERS,
+        product_catalogue: Optional[Mapping[str, CatalogueProduct]] = None,
+        offers_catalogue: Optional[Tuple[Offer, ...]] = None,
+        compact_lines: bool = False,
+        optimal_offers: bool = False,
+        pricing_cache: Optional[PricingCache] = None,
     ) -> None:
         """
         Initialize a shopping cart.
 
         Args:
-            product_catalogue (dict): A dictionary of product names to Products that are available to buy.
-            offers_catalogue (tuple): A tuple of Offers that can be applied.
+            product_catalogue (dict) [optional, default=None]: A dictionary of product names to Products
+                that are available to buy, or a CompiledCatalogue. Defaults to the default catalogue.
+            offers_catalogue (tuple) [optional, default=None]: A tuple of Offers that can be applied.
+                Defaults to the default offers.
+            compact_lines (bool) [optional, default=False]: Store products_in_cart in a CompactLineStore,
+                for carts with very many lines. Quantities priced by kg must then be in whole milligrams.
+            optimal_offers (bool) [optional, default=False]: Assign units to overlapping offers to maximize savings,
+                so a unit is only discounted once, rather than applying every offer to the full quantities.
+            pricing_cache (PricingCache) [optional, default=None]: A cache of offer results to share between carts
+                which often hold the same products, such as repeated orders.
         """
+        if product_catalogue is None:
+            product_catalogue = catalogue.PRODUCT_CATALOGUE
+        if offers_catalogue is None:
+            offers_catalogue = catalogue.OFFERS
         self.product_catalogue = product_catalogue
         self.offers_catalogue = offers_catalogue
+        self.compact_lines = compact_lines
+        self.optimal_offers = optimal_offers
+        self.pricing_cache = pricing_cache
+        self.offer_index = OfferIndex.for_offers(offers_catalogue)
+        self.clear()
+
+    def clear(self) -> None:
+        """
+        Remove every product from the shopping cart, so the cart can be reused without rebuilding it.
+        """
         self.product_quantities: Dict[str, Decimal] = {}
-        self.products_in_cart: List[AddedProduct] = []
-        self.applied_offers: List[AppliedOffer] = []
+        self.products_in_cart: Union[List[AddedProduct], CompactLineStore] = (
+            CompactLineStore() if self.compact_lines else []
+        )
+        self._line_index = LineIndex()  # Finds the lines of a product to remove without passing over the cart
+        self._sub_total: Price = Price(0)
+        self._savings: Price = Price(0)
+        self._applied_offers: List[AppliedOffer] = []
+        self._offer_amounts: Dict[int, Price] = {}  # Savings of each applied offer by position in offers_catalogue
+        self._dirty_offers: Set[int] = set()  # Positions of offers to re-check before the totals are next read
 
     def add_product(self, product_name: str, input_quantity: str = "1") -> None:
         """
@@ -56,14 +114,171 @@ class ShoppingCart:
             self.product_quantities[product_name] = (
                 self.product_quantities.get(product_name, 0) + quantity
             )  # Track product quantites for offer eligibility
-            price_per_kg = product.price if product.pricing_unit == PricingUnits.KG else 0
-            self.products_in_cart.append(
-                AddedProduct(
-                    product_name, quantity, self.__round_down_price(Price(product.price * quantity)), price_per_kg
+            self._dirty_offers.update(self.offer_index.offer_positions(product_name))
+            price = self.__price_line(product, quantity)
+            self._sub_total += price
+            self._line_index.add(product_name)
+            if isinstance(self.products_in_cart, CompactLineStore):
+                self.products_in_cart.add(product, quantity, price)
+            else:
+                price_per_kg = product.price if product.is_by_kg else 0
+                self.products_in_cart.append(AddedProduct(product_name, quantity, price, price_per_kg))
+        else:
+            raise InvalidProductException("Unexpected Item in Bagging Area")
+
+    def add_products(self, lines: Lines) -> None:
+        """
+        Add many products to the shopping cart at once, such as a basket uploaded by a scanner.
+        Every line is validated before the cart is changed, so either every line is added or none are.
+        Lines which repeat a product and quantity are parsed and priced once,
+        and each product's quantity and offers are updated once however many lines it has.
+
+        Args:
+            lines (Lines): A mapping of product names to quantities, or an iterable of (product name, quantity) lines,
+                with quantities as for add_product.
+
+        Raises:
+            InvalidLinesException: If any line has a product which is not found in the catalog or an invalid quantity,
+                listing every such line.
+        """
+        priced_lines: Dict[Tuple[str, str], AddedProduct] = {}  # Each distinct line parsed and priced once
+        added_lines: List[Tuple[CatalogueProduct, AddedProduct]] = []
+        added_quantities: Dict[str, Decimal] = {}
+        line_errors: List[LineError] = []
+        for line_number, (product_name, input_quantity) in enumerate(
+            lines.items() if isinstance(lines, Mapping) else lines, 1
+        ):
+            if (product := self.product_catalogue.get(product_name)) is None:
+                error = InvalidProductException("Unexpected Item in Bagging Area")
+                line_errors.append(LineError(line_number, product_name, input_quantity, error))
+                continue
+            if (line := priced_lines.get((product_name, input_quantity))) is None:
+                try:
+                    quantity = self.__parse_quantity(input_quantity, product)
+                except ProductQuantityException as error:
+                    line_errors.append(LineError(line_number, product_name, input_quantity, error))
+                    continue
+                price_per_kg = product.price if product.is_by_kg else 0
+                line = priced_lines[(product_name, input_quantity)] = AddedProduct(
+                    product_name, quantity, self.__price_line(product, quantity), price_per_kg
                 )
-            )
+            added_lines.append((product, line))
+            added_quantities[product_name] = added_quantities.get(product_name, 0) + line.quantity
+        if line_errors:
+            raise InvalidLinesException(line_errors)
+
+        for product_name, quantity in added_quantities.items():
+            self.product_quantities[product_name] = self.product_quantities.get(product_name, 0) + quantity
+            self._dirty_offers.update(self.offer_index.offer_positions(product_name))
+        self._line_index.extend(line.name for _, line in added_lines)
+        if isinstance(self.products_in_cart, CompactLineStore):
+            for product, line in added_lines:
+                self.products_in_cart.add(product, line.quantity, line.price)
         else:
+            self.products_in_cart.extend(line for _, line in added_lines)
+        self._sub_total += sum((line.price for _, line in added_lines), Price(0))
+
+    def void_line(self, line_number: int = -1) -> AddedProduct:
+        """
+        Remove a line from the shopping cart, such as a mis-scan, re-checking only the offers for its product.
+
+        Args:
+            line_number (int) [optional, default=-1]: The position of the line in products_in_cart,
+                the last line added by default.
+
+        Returns:
+            AddedProduct: The line removed.
+
+        Raises:
+            LineNotFoundException: If there is no line at the position.
+        """
+        try:
+            line = self.products_in_cart[line_number]
+        except IndexError:
+            raise LineNotFoundException(f"There is no line {line_number} in the cart")
+        self.__delete_line(line_number % len(self.products_in_cart), line.name)
+        self._sub_total -= line.price
+        self.__remove_quantity(line.name, line.quantity)
+        return line
+
+    def remove_product(self, product_name: str, input_quantity: str = "1") -> None:
+        """
+        Remove a quantity of a product from the shopping cart, taking it off the product's latest lines:
+        lines are removed while the quantity covers them, and a line only partly removed is re-priced.
+        Only the offers for the product are re-checked.
+
+        Args:
+            product_name (str): The name of the product to remove.
+            input_quantity (str) [optional, default="1"]: The quantity of the product to remove,
+                validated as for add_product.
+
+        Raises:
+            InvalidProductException: If the product is not found in the catalog.
+            ProductQuantityException: If there is an issue with the input quantity,
+                or it is more than the quantity in the cart.
+        """
+        if (product := self.product_catalogue.get(product_name)) is None:
             raise InvalidProductException("Unexpected Item in Bagging Area")
+        quantity = self.__parse_quantity(input_quantity, product)
+        if quantity > self.product_quantities.get(product_name, 0):
+            raise ProductQuantityException(f"Product quantity for {product_name} is more than is in the cart")
+        quantity_to_remove = quantity
+        while quantity_to_remove:
+            line_number = self._line_index.last_line_number(product_name)
+            line = self.products_in_cart[line_number]
+            if line.quantity <= quantity_to_remove:
+                self.__delete_line(line_number, product_name)
+                self._sub_total -= line.price
+                quantity_to_remove -= line.quantity
+            else:
+                line_quantity = line.quantity - quantity_to_remove
+                line_quantity = Weight(line_quantity) if product.is_by_kg else line_quantity
+                price = self.__price_line(product, line_quantity)
+                self.__replace_line(line_number, line, line_quantity, price)
+                self._sub_total += price - line.price
+                quantity_to_remove = Decimal(0)
+        self.__remove_quantity(product_name, quantity)
+
+    def reprice(self, product_catalogue: Mapping[str, CatalogueProduct], offers_catalogue: Tuple[Offer, ...]) -> None:
+        """
+        Move the cart to new product and offers catalogues, such as a new CatalogueSnapshot,
+        re-pricing only the lines of products whose price has changed.
+        The offers are only re-checked if the offers catalogue has changed.
+
+        Args:
+            product_catalogue (dict): A dictionary of product names to Products, or a CompiledCatalogue.
+            offers_catalogue (tuple): A tuple of Offers, built from the Products in product_catalogue.
+
+        Raises:
+            InvalidProductException: If a product in the cart is not in the new product catalogue.
+            ProductQuantityException: If a product in the cart has changed between priced by unit and by kg.
+        """
+        repriced_products = {}
+        for product_name in self.product_quantities:
+            if (product := product_catalogue.get(product_name)) is None:
+                raise InvalidProductException(f"{product_name} is no longer in the product catalogue")
+            previous_product = self.product_catalogue.get(product_name)
+            if previous_product is None or product.is_by_kg != previous_product.is_by_kg:
+                raise ProductQuantityException(f"Product quantity for {product_name} can not be re-priced")
+            if product.price != previous_product.price:
+                repriced_products[product_name] = product
+        if isinstance(self.products_in_cart, CompactLineStore):
+            self._sub_total += self.products_in_cart.reprice(repriced_products, self.__price_line)
+        else:
+            for line_number, line in enumerate(self.products_in_cart):
+                if (product := repriced_products.get(line.name)) is not None:
+                    price = self.__price_line(product, line.quantity)
+                    self._sub_total += price - line.price
+                    price_per_kg = product.price if product.is_by_kg else 0
+                    self.products_in_cart[line_number] = line._replace(price=price, price_per_kg=price_per_kg)
+        self.product_catalogue = product_catalogue
+        if offers_catalogue is not self.offers_catalogue:
+            self.offers_catalogue = offers_catalogue
+            self.offer_index = OfferIndex.for_offers(offers_catalogue)
+            self._savings = Price(0)
+            self._applied_offers = []
+            self._offer_amounts = {}
+            self._dirty_offers = set(self.offer_index.candidate_positions(self.product_quantities))
 
     @property
     def sub_total(self) -> Price:
@@ -71,7 +286,7 @@ class ShoppingCart:
         Returns:
             Price: The total subtotal of the items in the shopping cart before offers.
         """
-        return sum((product.price for product in self.products_in_cart), Price(0))
+        return self._sub_total
 
     @property
     def savings(self) -> Price:
@@ -79,16 +294,17 @@ class ShoppingCart:
         Returns:
             Price: The total savings of all applicable offers.
         """
-        savings: Price = Price(0.0)
-        applied_offers: List[AppliedOffer] = []
-        for offer in self.offers_catalogue:
-            if (offer_amount := offer.check_and_apply(self.product_quantities)) > 0:
-                applied_offers.append(
-                    AppliedOffer(offer.short_description, offer_amount)
-                )  # Store list of applied offers for receipt or audit
-                savings += offer_amount
-        self.applied_offers = applied_offers
-        return savings
+        self.__refresh_offers()
+        return self._savings
+
+    @property
+    def applied_offers(self) -> List[AppliedOffer]:
+        """
+        Returns:
+            list: The offers applied to the cart, in the order of the offers catalogue, for receipt or audit.
+        """
+        self.__refresh_offers()
+        return self._applied_offers
 
     @property
     def total(self) -> Price:
@@ -98,13 +314,90 @@ class ShoppingCart:
         """
         return self.sub_total - self.savings
 
-    def __parse_quantity(self, input_quantity: str, product: Product) -> Decimal:
+    def __refresh_offers(self) -> None:
+        """
+        Re-check only the offers affected by products added since the totals were last read,
+        then rebuild the savings and applied offers from the stored offer amounts.
+        With a pricing_cache, the results of an earlier cart with the same product quantities are used instead.
+        """
+        if not self._dirty_offers:
+            return
+        self._dirty_offers, dirty_offers = set(), self._dirty_offers
+        if self.pricing_cache is not None:
+            signature = PricingCache.signature(self.offer_index, self.optimal_offers, self.product_quantities)
+            if (cached_offers := self.pricing_cache.get(signature)) is not None:
+                self._offer_amounts = dict(cached_offers.offer_amounts)
+                self._applied_offers = list(cached_offers.applied_offers)
+                self._savings = cached_offers.savings
+                return
+        if self.optimal_offers:
+            self.__allocate_offers()
+        else:
+            for position in dirty_offers:
+                if (offer_amount := self.offers_catalogue[position].check_and_apply(self.product_quantities)) > 0:
+                    self._offer_amounts[position] = offer_amount
+                else:
+                    self._offer_amounts.pop(position, None)
+        self._applied_offers = [
+            AppliedOffer(self.offers_catalogue[position].short_description, offer_amount)
+            for position, offer_amount in sorted(self._offer_amounts.items())
+        ]
+        self._savings = sum((applied_offer.offer_amount for applied_offer in self._applied_offers), Price(0))
+        if self.pricing_cache is not None:
+            self.pricing_cache.put(
+                signature,
+                CachedOffers(tuple(self._offer_amounts.items()), tuple(self._applied_offers), self._savings),
+            )
+
+    def __allocate_offers(self) -> None:
+        """
+        Allocate the units in the cart between every offer for its products, so overlapping offers
+        do not discount the same unit twice. The allocation search is only imported by carts which use it.
+        """
+        from supermarket_pricing.allocation import allocate_offers
+
+        positions = self.offer_index.candidate_positions(self.product_quantities)
+        offer_amounts = allocate_offers(
+            self.product_quantities, [self.offers_catalogue[position] for position in positions]
+        )
+        self._offer_amounts = {
+            position: offer_amount for position, offer_amount in zip(positions, offer_amounts) if offer_amount > 0
+        }
+
+    def __remove_quantity(self, product_name: str, quantity: Decimal) -> None:
+        """
+        Take a quantity off a product's total, dropping the product once none is left,
+        and mark the offers for the product as needing to be re-checked.
+        """
+        if (remaining_quantity := self.product_quantities[product_name] - quantity) > 0:
+            self.product_quantities[product_name] = remaining_quantity
+        else:
+            del self.product_quantities[product_name]
+        self._dirty_offers.update(self.offer_index.offer_positions(product_name))
+
+    def __delete_line(self, line_number: int, product_name: str) -> None:
+        """
+        Delete a line from products_in_cart, and from the index of the lines of each product.
+        """
+        del self.products_in_cart[line_number]
+        self._line_index.remove(line_number, product_name)
+
+    def __replace_line(self, line_number: int, line: AddedProduct, quantity: Decimal, price: Price) -> None:
+        """
+        Change the quantity and price of a line in products_in_cart.
+        """
+        if isinstance(self.products_in_cart, CompactLineStore):
+            self.products_in_cart.replace(line_number, quantity, price)
+        else:
+            self.products_in_cart[line_number] = line._replace(quantity=quantity, price=price)
+
+    def __parse_quantity(self, input_quantity: str, product: CatalogueProduct) -> Decimal:
         """
         Parse and validate the input quantity for a product.
 
         Args:
             input_quantity (str): The input quantity.
-            product (Product): The product being added.
+            product (Product | CompiledProduct): The product being added.
 
         Returns:
             Decimal: The parsed and validated quantity.
@@ -113,15 +406,35 @@ class ShoppingCart:
             ProductQuantityException: If there is an issue with the input quantity.
         """
         try:
-            quantity = Weight(input_quantity) if product.pricing_unit == PricingUnits.KG else Decimal(input_quantity)
+            quantity = Weight(input_quantity) if product.is_by_kg else Decimal(input_quantity)
         except InvalidOperation:
             raise ProductQuantityException(f"Product quantity for {product.name} must be a valid number")
         if quantity <= 0:
             raise ProductQuantityException(f"Product quantity for {product.name} must be a positive value")
-        if product.pricing_unit == PricingUnits.UNIT and not self.__decimal_is_int(quantity):
+        if not product.is_by_kg and not self.__decimal_is_int(quantity):
             raise ProductQuantityException(f"Product quantity for {product.name} must be specified in integers")
+        if self.compact_lines:
+            self.__check_compact_quantity(quantity, product)
         return quantity
 
+    def __check_compact_quantity(self, quantity: Decimal, product: CatalogueProduct) -> None:
+        """
+        Check a quantity can be stored exactly in a CompactLineStore, before any cart state is changed.
+
+        Args:
+            quantity (Decimal): The parsed quantity.
+            product (Product | CompiledProduct): The product being added.
+
+        Raises:
+            ProductQuantityException: If the quantity or the price of the line is too large to store,
+                or a quantity priced by kg is not a whole number of milligrams.
+        """
+        stored_quantity = quantity * MILLIGRAMS_PER_KG if product.is_by_kg else quantity
+        if max(stored_quantity, product.price * quantity * PENCE_PER_POUND) > MAX_STORED_VALUE:
+            raise ProductQuantityException(f"Product quantity for {product.name} is too large")
+        if not self.__decimal_is_int(stored_quantity):
+            raise ProductQuantityException(f"Product quantity for {product.name} must be in whole milligrams")
+
     @staticmethod
     def __decimal_is_int(number: Decimal) -> bool:
         """
@@ -133,6 +446,12 @@ class ShoppingCart:
         """
         return number.as_integer_ratio()[1] == 1
 
+    def __price_line(self, product: CatalogueProduct, quantity: Decimal) -> Price:
+        """
+        Price a quantity of a product, rounded down to two decimal places.
+        """
+        return self.__round_down_price(Price(product.price * quantity))
+
     @staticmethod
     def __round_down_price(price: Price) -> Price:
         """
@@ -144,5 +463,6 @@ class ShoppingCart:
         Returns:
             Price: The rounded down Price.
         """
-        minimum_price = Price("0.01")
-        return Price(max(minimum_price, price.quantize(Price("0.00"), rounding=ROUND_DOWN)))
+        if (rounded_price := price.quantize(PRICE_PLACES, None, ROUND_DOWN_CONTEXT)) < MINIMUM_PRICE:
+            return MINIMUM_PRICE
+        return Price(rounded_price)
@@ -0,0 +1,228 @@
+"""
+Vectorized pricing backend for bulk simulation, which prices many baskets at once with NumPy arrays.
+Prices are held as integer pence and weights as integer milligrams, following the same rounding rules as
+ShoppingCart: each line is rounded down to the penny, with a minimum of 1p.
+
+Requires NumPy, an optional dependency installed with the vectorized extra:
+`pip install supermarket_pricing_kata[vectorized]`, or `poetry install --extras vectorized`.
+"""
+from collections import namedtuple
+from decimal import Decimal, InvalidOperation
+from typing import Iterable, List, Mapping, Optional, Tuple
+
+import numpy as np
+from supermarket_pricing import catalogue
+from supermarket_pricing.batch import Basket
+from supermarket_pricing.compiled_catalogue import CatalogueProduct
+from supermarket_pricing.exceptions import (
+    InvalidProductException,
+    ProductQuantityException,
+)
+from supermarket_pricing.offers import (
+    Offer,
+    ThreeForTwo,
+    ThreeFromSetForPrice,
+    TwoForPrice,
+)
+from supermarket_pricing.product import (
+    MILLIGRAMS_PER_KG,
+    Product,
+    from_pence,
+    to_pence,
+)
+from supermarket_pricing.shopping_cart import AppliedOffer
+
+EncodedLines = namedtuple("EncodedLines", "basket_ids product_ids quantities")
+PricedBaskets = namedtuple("PricedBaskets", "sub_totals savings totals offer_savings")
+
+
+class VectorizedPricer:
+    """
+    Prices many baskets at once with array operations, as an alternative to a ShoppingCart per basket.
+    Supports ThreeForTwo, TwoForPrice and ThreeFromSetForPrice offers on products priced by unit.
+    """
+
+    def __init__(
+        self,
+        product_catalogue: Optional[Mapping[str, CatalogueProduct]] = None,
+        offers_catalogue: Optional[Tuple[Offer, ...]] = None,
+    ) -> None:
+        """
+        Args:
+            product_catalogue (dict) [optional, default=None]: A dictionary of product names to Products
+                that are available to buy. Defaults to the default catalogue.
+            offers_catalogue (tuple) [optional, default=None]: A tuple of Offers that can be applied.
+                Defaults to the default offers.
+
+        Raises:
+            ValueError: If an offer is not supported by the vectorized backend.
+        """
+        if product_catalogue is None:
+            product_catalogue = catalogue.PRODUCT_CATALOGUE
+        if offers_catalogue is None:
+            offers_catalogue = catalogue.OFFERS
+        self.product_catalogue = product_catalogue
+        self.offers_catalogue = offers_catalogue
+        self.product_ids = {product_name: product_id for product_id, product_name in enumerate(product_catalogue)}
+        self.unit_prices = np.array([to_pence(product.price) for product in product_catalogue.values()], np.int64)
+        self.is_by_kg = np.array([product.is_by_kg for product in product_catalogue.values()], np.bool_)
+        offer_product_ids = sorted(
+            {self.__offer_product_id(product) for offer in offers_catalogue for product in offer.eligible_products}
+        )
+        self.offer_product_ids = np.array(offer_product_ids, np.int64)
+        self.offer_columns = np.full(len(self.product_ids), -1, np.int64)  # Column of each product in offer quantities
+        self.offer_columns[self.offer_product_ids] = np.arange(len(offer_product_ids))
+        self.offer_evaluators = [self.__compile_offer(offer) for offer in offers_catalogue]
+
+    def encode_baskets(self, baskets: Iterable[Basket]) -> EncodedLines:
+        """
+        Validate baskets and flatten their lines into arrays of basket ids, product ids and integer quantities:
+        a count of units for products priced by unit, and milligrams for products priced by kg.
+
+        Args:
+            baskets (iterable): Baskets, as mappings of product names to quantities or iterables of lines.
+
+        Returns:
+            EncodedLines: Arrays with one entry per line.
+
+        Raises:
+            InvalidProductException: If a product is not found in the catalog.
+            ProductQuantityException: If there is an issue with a quantity.
+        """
+        basket_ids: List[int] = []
+        product_ids: List[int] = []
+        quantities: List[int] = []
+        for basket_id, basket in enumerate(baskets):
+            for product_name, quantity in basket.items() if isinstance(basket, Mapping) else basket:
+                if (product_id := self.product_ids.get(product_name)) is None:
+                    raise InvalidProductException("Unexpected Item in Bagging Area")
+                basket_ids.append(basket_id)
+                product_ids.append(product_id)
+                quantities.append(self.__parse_quantity(str(quantity), self.product_catalogue[product_name]))
+        return EncodedLines(
+            np.array(basket_ids, np.int64), np.array(product_ids, np.int64), np.array(quantities, np.int64)
+        )
+
+    def price_lines(self, lines: EncodedLines, number_of_baskets: int) -> PricedBaskets:
+        """
+        Price encoded lines, rounding each line down to the penny with a minimum of 1p.
+
+        Args:
+            lines (EncodedLines): The lines of every basket.
+            number_of_baskets (int): The number of baskets the lines belong to.
+
+        Returns:
+            PricedBaskets: Arrays in pence of the sub total, savings and total of each basket,
+                and a matrix of the savings of each offer in each basket, 0 where the offer does not apply.
+        """
+        line_prices = self.unit_prices[lines.product_ids] * lines.quantities
+        line_prices = np.where(self.is_by_kg[lines.product_ids], line_prices // MILLIGRAMS_PER_KG, line_prices)
+        line_prices = np.maximum(line_prices, 1)
+        sub_totals = np.zeros(number_of_baskets, np.int64)
+        np.add.at(sub_totals, lines.basket_ids, line_prices)
+
+        offer_quantities = np.zeros((number_of_baskets, len(self.offer_product_ids)), np.int64)
+        is_offer_line = self.offer_columns[lines.product_ids] >= 0
+        np.add.at(
+            offer_quantities,
+            (lines.basket_ids[is_offer_line], self.offer_columns[lines.product_ids[is_offer_line]]),
+            lines.quantities[is_offer_line],
+        )
+        offer_savings = np.zeros((number_of_baskets, len(self.offer_evaluators)), np.int64)
+        for position, evaluate_offer in enumerate(self.offer_evaluators):
+            offer_savings[:, position] = np.maximum(evaluate_offer(offer_quantities), 0)  # Only apply offers that save
+        savings = offer_savings.sum(axis=1)
+        return PricedBaskets(sub_totals, savings, sub_totals - savings, offer_savings)
+
+    def price_baskets(self, baskets: Iterable[Basket]) -> PricedBaskets:
+        """
+        Validate and price baskets.
+
+        Args:
+            baskets (iterable): Baskets, as mappings of product names to quantities or iterables of lines.
+
+        Returns:
+            PricedBaskets: Arrays in pence of the sub total, savings and total of each basket,
+                and a matrix of the savings of each offer in each basket.
+        """
+        baskets = list(baskets)
+        return self.price_lines(self.encode_baskets(baskets), len(baskets))
+
+    def applied_offers(self, priced_baskets: PricedBaskets, basket_id: int) -> List[AppliedOffer]:
+        """
+        Args:
+            priced_baskets (PricedBaskets): The priced baskets.
+            basket_id (int): The position of the basket.
+
+        Returns:
+            list: The offers applied to the basket, as ShoppingCart.applied_offers would list them.
+        """
+        return [
+            AppliedOffer(offer.short_description, from_pence(offer_saving))
+            for offer, offer_saving in zip(self.offers_catalogue, priced_baskets.offer_savings[basket_id])
+            if offer_saving > 0
+        ]
+
+    def __offer_product_id(self, product: Product) -> int:
+        """
+        Raises:
+            ValueError: If the product is not in the catalogue or is priced by kg.
+        """
+        if (product_id := self.product_ids.get(product.name)) is None:
+            raise ValueError(f"Offer product {product.name} is not in the product catalogue")
+        if self.is_by_kg[product_id]:
+            raise ValueError(f"Offers on products priced by kg, such as {product.name}, are not supported")
+        return product_id
+
+    def __compile_offer(self, offer: Offer):
+        """
+        Build a function which calculates the savings in pence of an offer from the offer quantities of every basket.
+
+        Raises:
+            ValueError: If the offer is not supported by the vectorized backend.
+        """
+        if isinstance(offer, ThreeForTwo):
+            column = self.offer_columns[self.product_ids[offer.eligible_product.name]]
+            saving_per_offer = to_pence(offer.eligible_product.price)
+            return lambda offer_quantities: offer_quantities[:, column] // 3 * saving_per_offer
+        if isinstance(offer, TwoForPrice):
+            column = self.offer_columns[self.product_ids[offer.eligible_product.name]]
+            saving_per_offer = to_pence(offer.eligible_product.price) * 2 - to_pence(offer.offer_price)
+            return lambda offer_quantities: offer_quantities[:, column] // 2 * saving_per_offer
+        if isinstance(offer, ThreeFromSetForPrice):
+            products = sorted(offer.eligible_products, key=lambda product: product.price)  # Cheapest first
+            columns = self.offer_columns[[self.product_ids[product.name] for product in products]]
+            prices = np.array([to_pence(product.price) for product in products], np.int64)
+            offer_price = to_pence(offer.offer_price)
+
+            def three_from_set_savings(offer_quantities):
+                counts = offer_quantities[:, columns]
+                number_of_offers = counts.sum(axis=1) // 3
+                counted_before = np.cumsum(counts, axis=1) - counts
+                discounted_counts = np.clip(number_of_offers[:, None] * 3 - counted_before, 0, counts)
+                return (discounted_counts * prices).sum(axis=1) - number_of_offers * offer_price
+
+            return three_from_set_savings
+        raise ValueError(f"Offer {offer.short_description} is not supported by the vectorized backend")
+
+    @staticmethod
+    def __parse_quantity(input_quantity: str, product: CatalogueProduct) -> int:
+        """
+        Parse and validate the input quantity for a product, as a count of units or milligrams if priced by kg.
+
+        Raises:
+            ProductQuantityException: If there is an issue with the input quantity.
+        """
+        try:
+            quantity = Decimal(input_quantity)
+        except InvalidOperation:
+            raise ProductQuantityException(f"Product quantity for {product.name} must be a valid number")
+        if quantity <= 0:
+            raise ProductQuantityException(f"Product quantity for {product.name} must be a positive value")
+        if product.is_by_kg:
+            quantity *= MILLIGRAMS_PER_KG
+            if quantity != quantity.to_integral_value():
+                raise ProductQuantityException(f"Product quantity for {product.name} must be in whole milligrams")
+        elif quantity != quantity.to_integral_value():
+            raise ProductQuantityException(f"Product quantity for {product.name} must be specified in integers")
+        return int(quantity)
@@ -0,0 +1,214 @@
+from decimal import Decimal
+from itertools import product
+from random import Random
+from typing import Dict, Sequence, Tuple, Type, Union
+
+import pytest
+from supermarket_pricing.allocation import DEFAULT_MAX_STEPS, allocate_offers
+from supermarket_pricing.catalogue import OFFERS, PRODUCT_CATALOGUE
+from supermarket_pricing.offers import (
+    Offer,
+    ThreeForTwo,
+    ThreeFromSetForPrice,
+    TwoForPrice,
+)
+from supermarket_pricing.product import Price, Product
+from supermarket_pricing.shopping_cart import AppliedOffer, ShoppingCart
+
+
+@pytest.fixture
+def test_product_catalogue() -> Dict[str, Union[Product, Type[Product]]]:
+    return {
+        "a": Product("a", Price("1")),
+        "b": Product("b", Price("1")),
+        "c": Product("c", Price("1.1")),
+        "d": Product("d", Price("1.2")),
+    }
+
+
+@pytest.fixture
+def overlapping_offers(test_product_catalogue):
+    return (
+        ThreeFromSetForPrice(
+            (test_product_catalogue["b"], test_product_catalogue["c"], test_product_catalogue["d"]),
+            Price("3.0"),
+            "letters",
+        ),
+        TwoForPrice(test_product_catalogue["d"], Price("1.4")),
+        ThreeForTwo(test_product_catalogue["a"]),
+    )
+
+
+def test_unit_only_discounted_by_one_offer(overlapping_offers):
+    cart_count = {"b": Decimal(1), "c": Decimal(1), "d": Decimal(3), "a": Decimal(3)}
+    # Independently the set saves 0.3 and the d 2 for 1.4 saves 1.0, discounting a d twice
+    assert [offer.check_and_apply(cart_count) for offer in overlapping_offers] == [
+        Price("0.3"),
+        Price("1.0"),
+        Price("1"),
+    ]
+    # The set takes b, c and a d, the 2 for 1.4 takes the other two d
+    assert allocate_offers(cart_count, overlapping_offers) == [Price("0.3"), Price("1.0"), Price("1")]
+    cart_count["d"] = Decimal(2)
+    # Two d in the 2 for 1.4 saves more than using one in the set
+    assert allocate_offers(cart_count, overlapping_offers) == [Price("0"), Price("1.0"), Price("1")]
+
+
+def test_offers_without_overlap_apply_independently():
+    cart_count = {"beans": Decimal(4), "coke": Decimal(3), "arbor ale": Decimal(2), "butcombe": Decimal(2)}
+    assert allocate_offers(cart_count, OFFERS) == [offer.check_and_apply(cart_count) for offer in OFFERS]
+
+
+def test_falls_back_to_greedy_allocation_beyond_max_steps(overlapping_offers):
+    cart_count = {"b": Decimal(1), "c": Decimal(1), "d": Decimal(3)}
+    # Greedy first gives the 2 for 1.4 two d, saving more than the set's cheapest group, then the set the rest
+    assert allocate_offers(cart_count, overlapping_offers, max_steps=1) == [Price("0.3"), Price("1.0"), Price("0")]
+    assert allocate_offers(cart_count, overlapping_offers) == [Price("0.3"), Price("1.0"), Price("0")]
+
+
+@pytest.mark.parametrize("max_steps", [0, 1, 10, DEFAULT_MAX_STEPS])
+def test_greedy_allocation_never_worse_than_one_offer_alone(overlapping_offers, max_steps):
+    random = Random(0)
+    for _ in range(20):
+        cart_count = {product_name: Decimal(random.randint(0, 6)) for product_name in "abcd"}
+        best_single_saving = max(offer.check_and_apply(cart_count) for offer in overlapping_offers)
+        assert sum(allocate_offers(cart_count, overlapping_offers, max_steps=max_steps)) >= best_single_saving
+
+
+def test_matches_exhaustive_search(test_product_catalogue, overlapping_offers):
+    offers = overlapping_offers + (
+        ThreeFromSetForPrice((test_product_catalogue["a"], test_product_catalogue["b"]), Price("2.5"), "ab"),
+        TwoForPrice(test_product_catalogue["c"], Price("2.1")),
+    )
+    random = Random(0)
+    for _ in range(20):
+        cart_count = {product_name: random.randint(0, 5) for product_name in "abcd"}
+        assert sum(allocate_offers({name: Decimal(units) for name, units in cart_count.items()}, offers)) == (
+            exhaustive_best_savings(cart_count, offers)
+        )
+
+
+def exhaustive_best_savings(
+    cart_count: Dict[str, int], offers: Sequence[Offer], allocated: Sequence[Tuple[Offer, Dict[str, int]]] = ()
+) -> Decimal:
+    """
+    The best total savings of every way of giving each offer in turn any of the units left, where no multi-product
+    offer leaves a unit of its products undiscounted which is cheaper than one it discounts.
+    """
+    if not offers:
+        if not discounts_cheapest_first(cart_count, allocated):
+            return Decimal("-Infinity")
+        return sum(
+            (offer.check_and_apply(dict(zip(units, map(Decimal, units.values())))) for offer, units in allocated),
+            Decimal(0),
+        )
+    offer, later_offers = offers[0], offers[1:]
+    product_names = sorted(offer.eligible_product_names)
+    best_savings = exhaustive_best_savings(cart_count, later_offers, allocated)
+    for allocation in product(*(range(cart_count.get(product_name, 0) + 1) for product_name in product_names)):
+        if any(allocation):
+            remaining = {
+                **cart_count,
+                **{name: cart_count[name] - units for name, units in zip(product_names, allocation)},
+            }
+            units = dict(zip(product_names, allocation))
+            best_savings = max(
+                best_savings, exhaustive_best_savings(remaining, later_offers, (*allocated, (offer, units)))
+            )
+    return best_savings
+
+
+def discounts_cheapest_first(unallocated: Dict[str, int], allocated: Sequence[Tuple[Offer, Dict[str, int]]]) -> bool:
+    """
+    Whether every multi-product offer discounts units no dearer than any unit of its products left undiscounted,
+    each offer discounting the cheapest whole groups of the units it is given.
+    """
+    prices = {product.name: product.price for offer, _ in allocated for product in offer.eligible_products}
+    undiscounted = dict(unallocated)
+    discounted = []
+    for offer, units in allocated:
+        discounted_units = sum(units.values()) // offer.group_size * offer.group_size
+        offer_discounted = set()
+        for product_name in sorted(units, key=prices.__getitem__):
+            taken = min(units[product_name], discounted_units)
+            discounted_units -= taken
+            undiscounted[product_name] = undiscounted.get(product_name, 0) + units[product_name] - taken
+            if taken:
+                offer_discounted.add(product_name)
+        discounted.append((offer, offer_discounted))
+    return all(
+        prices[discounted_name] <= prices[product_name]
+        for offer, offer_discounted in discounted
+        if len(offer.eligible_products) > 1
+        for discounted_name in offer_discounted
+        for product_name in offer.eligible_product_names
+        if undiscounted.get(product_name, 0)
+    )
+
+
+@pytest.mark.parametrize("max_steps", [0, DEFAULT_MAX_STEPS])
+def test_set_discounts_the_cheapest_units_alongside_an_offer_which_never_saves(max_steps):
+    never_saves = TwoForPrice(PRODUCT_CATALOGUE["kaleidoscope"], Price("5"))
+    cart_count = {"arbor ale": Decimal(3), "kaleidoscope": Decimal(1)}
+    # The set discounts the three arbor ale, the cheapest, not two of them with the dearer kaleidoscope
+    assert allocate_offers(cart_count, OFFERS) == [Price("0"), Price("0"), Price("0.6")]
+    assert allocate_offers(cart_count, OFFERS + (never_saves,), max_steps=max_steps) == [
+        Price("0"),
+        Price("0"),
+        Price("0.6"),
+        Price("0"),
+    ]
+    cart = ShoppingCart(offers_catalogue=OFFERS + (never_saves,), optimal_offers=True)
+    cart.add_product("arbor ale", "3")
+    cart.add_product("kaleidoscope")
+    assert cart.total == Price("8.50")
+
+
+def test_allocates_many_units_of_each_product():
+    offers = OFFERS + (
+        TwoForPrice(PRODUCT_CATALOGUE["butcombe"], Price("3")),
+        TwoForPrice(PRODUCT_CATALOGUE["kaleidoscope"], Price("4.20")),
+    )
+    cart_count = {"arbor ale": Decimal(20), "kaleidoscope": Decimal(20), "butcombe": Decimal(20)}
+    # 2 for £3 takes the butcombe. The set discounts the cheapest ales left, so it takes all 20 arbor ale before any
+    # kaleidoscope, and 16 kaleidoscope, leaving 4 for 2 for £4.20
+    assert allocate_offers(cart_count, offers) == [Price("0"), Price("0"), Price("12.0"), Price("12.0"), Price("1.6")]
+    cart_count = {product_name: Decimal(20_000) for product_name in cart_count}
+    assert sum(allocate_offers(cart_count, offers, max_steps=DEFAULT_MAX_STEPS)) == Price("25999.6")
+
+
+def test_offer_without_group_price_takes_all_or_none_of_its_units(test_product_catalogue):
+    class AOnePenceOffEach(Offer):
+        eligible_products = (test_product_catalogue["a"],)
+        short_description = "a 1p off"
+
+        def is_eligible(self, product_quantities):
+            return product_quantities.get("a", 0) > 0
+
+        def offer_amount(self, product_quantities):
+            return Price(product_quantities["a"] * Decimal("0.01"))
+
+    offers = (ThreeForTwo(test_product_catalogue["a"]), AOnePenceOffEach())
+    assert allocate_offers({"a": Decimal(3)}, offers) == [Price("1"), Price("0")]
+    assert allocate_offers({"a": Decimal(2)}, offers) == [Price("0"), Price("0.02")]
+
+
+def test_shopping_cart_with_optimal_offers():
+    ales_two_for_price = TwoForPrice(PRODUCT_CATALOGUE["butcombe"], Price("3"))
+    offers = OFFERS + (ales_two_for_price,)
+    cart = ShoppingCart(offers_catalogue=offers, optimal_offers=True)
+    cart.add_product("arbor ale")
+    cart.add_product("kaleidoscope")
+    cart.add_product("butcombe", "2")
+    cart.add_product("beans", "3")
+    assert cart.applied_offers == [
+        AppliedOffer("beans 3 for 2", Price("0.5")),
+        AppliedOffer("butcombe 2 for £3.00", Price("1.2")),
+    ]
+    cart.add_product("butcombe")
+    assert cart.applied_offers == [
+        AppliedOffer("beans 3 for 2", Price("0.5")),
+        AppliedOffer("ales 3 for £6.00", Price("0.8")),
+        AppliedOffer("butcombe 2 for £3.00", Price("1.2")),
+    ]
+    assert cart.total == Price("10.00")
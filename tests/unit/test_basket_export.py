@@ -0,0 +1,103 @@
+import io
+
+import pytest
+from supermarket_pricing.basket_export import BasketExportReader, BasketExportWriter
+from supermarket_pricing.cli import main
+from supermarket_pricing.exceptions import InvalidExportException
+from supermarket_pricing.shopping_cart import ShoppingCart
+
+
+def priced_cart(lines, compact_lines=False):
+    cart = ShoppingCart(compact_lines=compact_lines)
+    for product_name, quantity in lines:
+        cart.add_product(product_name, quantity)
+    return cart
+
+
+def read_export(path):
+    """
+    Read every chunk of an export back as lists, releasing the views of the memory map.
+    """
+    with BasketExportReader(path) as reader:
+        chunks = [
+            (
+                {name: column.tolist() for name, column in chunk.baskets.items()},
+                {name: column.tolist() for name, column in chunk.lines.items()},
+                {name: column.tolist() for name, column in chunk.offers.items()},
+                chunk.strings,
+            )
+            for chunk in reader.chunks()
+        ]
+    return chunks
+
+
+@pytest.mark.parametrize("compact_lines", [False, True])
+def test_exported_baskets_read_back_as_columns(tmp_path, compact_lines):
+    path = tmp_path / "baskets.export"
+    with BasketExportWriter(path) as export:
+        export.write_cart("b1", priced_cart([("beans", "3"), ("onions", "1.2777")], compact_lines))
+        export.write_cart("b2", priced_cart([("coke", "2"), ("beans", "1")], compact_lines))
+    assert read_export(path) == [
+        (
+            {"basket_id": [0, 4], "sub_total": [187, 190], "savings": [50, 40], "total": [137, 150]},
+            {
+                "basket": [0, 0, 1, 1],
+                "product": [1, 2, 5, 1],
+                "quantity": [3_000_000, 1_277_700, 2_000_000, 1_000_000],
+                "is_by_kg": [0, 1, 0, 0],
+                "price": [150, 37, 140, 50],
+            },
+            {"basket": [0, 1], "description": [3, 6], "saving": [50, 40]},
+            ["b1", "beans", "onions", "beans 3 for 2", "b2", "coke", "coke 2 for £1.00"],
+        )
+    ]
+
+
+def test_chunks_are_appended_across_writers(tmp_path):
+    path = tmp_path / "baskets.export"
+    with BasketExportWriter(path, baskets_per_chunk=2) as export:
+        for basket_number in range(3):
+            export.write_cart(str(basket_number), priced_cart([("beans", "1")]))
+        assert export.chunks_written == 1
+    with BasketExportWriter(path) as export:
+        export.write_cart("3", priced_cart([("coke", "1")]))
+    chunks = read_export(path)
+    assert [baskets["total"] for baskets, _, _, _ in chunks] == [[50, 50], [50], [70]]
+    assert [strings for _, _, _, strings in chunks] == [["0", "beans", "1"], ["2", "beans"], ["3", "coke"]]
+
+
+def test_columns_are_8_byte_aligned(tmp_path):
+    np = pytest.importorskip("numpy")
+    path = tmp_path / "baskets.export"
+    with BasketExportWriter(path, baskets_per_chunk=2) as export:
+        for basket_number in range(3):
+            export.write_cart(f"basket {basket_number}", priced_cart([("beans", "3"), ("onions", "1.2777")]))
+    with BasketExportReader(path) as reader:
+        for chunk in reader.chunks():
+            for column in (*chunk.baskets.values(), *chunk.lines.values(), *chunk.offers.values()):
+                assert np.frombuffer(column, column.format).ctypes.data % 8 == 0
+                column.release()
+
+
+def test_writes_to_a_stream_without_closing_it():
+    stream = io.BytesIO()
+    with BasketExportWriter(stream) as export:
+        export.write_cart("1", priced_cart([("beans", "1")]))
+    assert not stream.closed
+    assert stream.getvalue().startswith(b"SPBASKET")
+
+
+def test_raises_for_file_which_is_not_an_export(tmp_path):
+    path = tmp_path / "baskets.export"
+    path.write_bytes(b"basket_id,sub_total,savings,total\n")
+    with BasketExportReader(path) as reader, pytest.raises(InvalidExportException):
+        next(reader.chunks())
+
+
+def test_main_exports_priced_baskets(tmp_path):
+    (tmp_path / "scans.csv").write_text("1,beans,3\n2,caviar,1\n3,coke,1\n")
+    export = tmp_path / "baskets.export"
+    assert main([str(tmp_path / "scans.csv"), "--output", str(tmp_path / "totals.csv"), "--export", str(export)]) == 1
+    ((baskets, _, _, strings),) = read_export(export)
+    assert [strings[basket_id] for basket_id in baskets["basket_id"]] == ["1", "3"]
+    assert baskets["total"] == [100, 70]
@@ -0,0 +1,62 @@
+from decimal import Decimal
+from itertools import count
+
+import pytest
+from supermarket_pricing.batch import (
+    BasketPricer,
+    PricedBasket,
+    price_baskets,
+    price_baskets_parallel,
+)
+from supermarket_pricing.exceptions import InvalidProductException
+from supermarket_pricing.product import Price
+from supermarket_pricing.shopping_cart import AppliedOffer
+
+
+def test_prices_baskets_of_mappings_and_lines():
+    baskets = [
+        {"beans": "3", "coke": 2, "oranges": "0.2"},
+        [("arbor ale", 1), ("kaleidoscope", Decimal("2")), ("butcombe", "1"), ("beans", "1")],
+        {"onions": "1.2777"},
+    ]
+    assert list(price_baskets(baskets)) == [
+        PricedBasket(
+            Price("3.29"),
+            Price("0.9"),
+            Price("2.39"),
+            (AppliedOffer("beans 3 for 2", Price("0.5")), AppliedOffer("coke 2 for £1.00", Price("0.4"))),
+        ),
+        PricedBasket(Price("9.8"), Price("0.8"), Price("9"), (AppliedOffer("ales 3 for £6.00", Price("0.8")),)),
+        PricedBasket(Price("0.37"), Price("0"), Price("0.37"), ()),
+    ]
+
+
+def test_basket_pricer_starts_each_basket_empty():
+    basket_pricer = BasketPricer()
+    assert basket_pricer.price({"beans": "2"}).savings == Price("0")
+    assert basket_pricer.price({"beans": "1"}) == PricedBasket(Price("0.5"), Price("0"), Price("0.5"), ())
+
+
+def test_prices_baskets_lazily():
+    baskets = ({"beans": basket_number % 5 + 1} for basket_number in count())  # Endless stream of baskets
+    priced_baskets = price_baskets(baskets)
+    assert [next(priced_baskets).total for _ in range(5)] == [
+        Price("0.5"),
+        Price("1"),
+        Price("1"),
+        Price("1.5"),
+        Price("2"),
+    ]
+
+
+def test_raises_for_invalid_item_in_basket():
+    with pytest.raises(InvalidProductException):
+        list(price_baskets([{"beans": "1"}, {"tomacco": "1"}]))
+
+
+def test_prices_baskets_in_parallel_in_input_order():
+    baskets = [
+        {"beans": str(basket_number % 7 + 1), "arbor ale": "2", "butcombe": str(basket_number % 3 + 1)}
+        for basket_number in range(200)
+    ]
+    assert list(price_baskets_parallel(baskets, processes=2, chunksize=7)) == list(price_baskets(baskets))
@@ -0,0 +1,41 @@
+import pytest
+from benchmarks.__main__ import main
+from benchmarks.bench_import_time import main as import_time_main
+from benchmarks.results import Regression, find_regressions, save_results
+from benchmarks.suite import BENCHMARKS
+
+
+@pytest.mark.parametrize("name", BENCHMARKS)
+def test_benchmark_runs(name):
+    operation = BENCHMARKS[name]()
+    operation()
+
+
+def test_finds_regressions_beyond_threshold():
+    baseline = {"a": {"seconds_per_op": 1.0}, "b": {"seconds_per_op": 1.0}, "c": {"seconds_per_op": 1.0}}
+    current = {"a": {"seconds_per_op": 1.05}, "b": {"seconds_per_op": 1.5}, "d": {"seconds_per_op": 9.0}}
+    assert find_regressions(baseline, current, threshold=0.1) == [Regression("b", 1.0, 1.5, 0.5)]
+    assert find_regressions(baseline, current, threshold=0.01) == [
+        Regression("b", 1.0, 1.5, 0.5),
+        Regression("a", 1.0, 1.05, pytest.approx(0.05)),
+    ]
+
+
+def test_compare_fails_on_regression(tmp_path, capsys):
+    save_results(tmp_path / "baseline.json", {"a": {"seconds_per_op": 1.0, "calls": 1, "repeats": 1}})
+    save_results(tmp_path / "current.json", {"a": {"seconds_per_op": 1.2, "calls": 1, "repeats": 1}})
+    assert main(["compare", str(tmp_path / "baseline.json"), str(tmp_path / "current.json")]) == 1
+    assert "REGRESSION a" in capsys.readouterr().out
+    assert (
+        main(["compare", str(tmp_path / "baseline.json"), str(tmp_path / "current.json"), "--threshold", "0.25"]) == 0
+    )
+
+
+def test_import_time_guard_passes_for_shopping_cart(capsys):
+    assert import_time_main(["--runs", "1"]) == 0
+    assert "supermarket_pricing.shopping_cart" in capsys.readouterr().out
+
+
+def test_import_time_guard_fails_for_module_loading_on_demand_modules(capsys):
+    assert import_time_main(["supermarket_pricing.catalogue_store", "--runs", "1"]) == 1
+    assert "REGRESSION supermarket_pricing.catalogue_store loads" in capsys.readouterr().out
@@ -0,0 +1,23 @@
+import pytest
+from supermarket_pricing import catalogue
+from supermarket_pricing.shopping_cart import ShoppingCart
+
+
+def test_default_catalogue_is_built_once():
+    assert catalogue.OFFERS is catalogue.OFFERS
+    assert catalogue.OFFERS[0].eligible_products[0] is catalogue.PRODUCT_CATALOGUE["beans"]
+    cart = ShoppingCart()
+    assert cart.product_catalogue is catalogue.PRODUCT_CATALOGUE
+    assert cart.offers_catalogue is catalogue.OFFERS
+
+
+def test_build_default_catalogue_returns_a_new_copy():
+    product_catalogue, offers = catalogue.build_default_catalogue()
+    assert product_catalogue == catalogue.PRODUCT_CATALOGUE
+    assert product_catalogue["beans"] is not catalogue.PRODUCT_CATALOGUE["beans"]
+    assert [offer.short_description for offer in offers] == [offer.short_description for offer in catalogue.OFFERS]
+
+
+def test_unknown_attribute_raises():
+    with pytest.raises(AttributeError):
+        catalogue.PRODUCTS
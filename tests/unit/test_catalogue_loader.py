@@ -0,0 +1,83 @@
+import json
+
+import pytest
+from supermarket_pricing.catalogue import OFFERS, PRODUCT_CATALOGUE
+from supermarket_pricing.catalogue_loader import (
+    Catalogue,
+    load_catalogue,
+    parse_catalogue,
+    save_catalogue,
+)
+from supermarket_pricing.exceptions import InvalidCatalogueException
+from supermarket_pricing.offers import ThreeForTwo
+from supermarket_pricing.product import Price, Product, ProductByKg
+from supermarket_pricing.shopping_cart import ShoppingCart
+
+
+def test_loads_products_and_offers(tmp_path):
+    path = tmp_path / "catalogue.json"
+    path.write_text(
+        json.dumps(
+            {
+                "products": [
+                    {"name": "beans", "price": "0.5"},
+                    {"name": "onions", "price": "0.29", "pricing_unit": "kg"},
+                ],
+                "offers": [{"type": "three_for_two", "product": "beans"}],
+            }
+        )
+    )
+    product_catalogue, offers = load_catalogue(path)
+    assert product_catalogue == {
+        "beans": Product("beans", Price("0.5")),
+        "onions": ProductByKg("onions", Price("0.29")),
+    }
+    assert len(offers) == 1 and isinstance(offers[0], ThreeForTwo)
+    assert offers[0].eligible_product is product_catalogue["beans"]
+
+
+def test_saved_catalogue_prices_carts_the_same(tmp_path):
+    save_catalogue(tmp_path / "catalogue.json", PRODUCT_CATALOGUE, OFFERS)
+    product_catalogue, offers = load_catalogue(tmp_path / "catalogue.json")
+    assert product_catalogue == PRODUCT_CATALOGUE
+    assert [offer.short_description for offer in offers] == [offer.short_description for offer in OFFERS]
+    carts = [ShoppingCart(), ShoppingCart(product_catalogue, offers)]
+    for cart in carts:
+        for product_name in ["beans", "beans", "beans", "coke", "coke", "arbor ale", "butcombe", "kaleidoscope"]:
+            cart.add_product(product_name)
+    assert carts[0].applied_offers == carts[1].applied_offers
+    assert carts[0].total == carts[1].total
+
+
+@pytest.mark.parametrize(
+    "data, message",
+    [
+        ([], "expected an object with a list of products"),
+        ({"products": [{"name": "beans"}]}, "'price'"),
+        ({"products": [{"name": "beans", "price": "cheap"}]}, "must be a valid number"),
+        ({"products": [{"name": "beans", "price": "NaN"}]}, "must be a finite number"),
+        ({"products": [{"name": "beans", "price": "-Infinity"}]}, "must be a finite number"),
+        ({"products": [{"name": "beans", "price": "1", "pricing_unit": "litre"}]}, "'litre' is not a valid"),
+        ({"products": [{"name": "beans", "price": "1"}] * 2}, "beans is listed more than once"),
+        ({"products": [], "offers": [{"type": "bogof", "product": "beans"}]}, "'bogof'"),
+        ({"products": [], "offers": [{"type": "three_for_two", "product": "beans"}]}, "unknown product beans"),
+    ],
+)
+def test_rejects_invalid_catalogues(data, message):
+    with pytest.raises(InvalidCatalogueException, match=message):
+        parse_catalogue(data)
+
+
+def test_rejects_prices_with_more_than_two_decimal_places():
+    with pytest.raises(InvalidCatalogueException, match="must not have more than 2 decimal places"):
+        parse_catalogue({"products": [{"name": "beans", "price": "0.505"}]})
+
+
+def test_rejects_invalid_json(tmp_path):
+    (tmp_path / "catalogue.json").write_text("{")
+    with pytest.raises(InvalidCatalogueException):
+        load_catalogue(tmp_path / "catalogue.json")
+
+
+def test_catalogue_is_a_product_catalogue_and_offers_pair():
+    assert parse_catalogue({"products": []}) == Catalogue({}, ())
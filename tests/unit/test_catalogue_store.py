@@ -0,0 +1,106 @@
+import pytest
+from supermarket_pricing.catalogue import OFFERS, PRODUCT_CATALOGUE
+from supermarket_pricing.catalogue_loader import parse_catalogue
+from supermarket_pricing.catalogue_store import CatalogueStore
+from supermarket_pricing.exceptions import (
+    InvalidProductException,
+    ProductQuantityException,
+)
+from supermarket_pricing.mapped_catalogue import write_catalogue_image
+from supermarket_pricing.offer_index import OfferIndex
+from supermarket_pricing.offers import ThreeForTwo
+from supermarket_pricing.product import Price, Product, ProductByKg
+from supermarket_pricing.shopping_cart import AppliedOffer
+
+
+def with_new_prices(**prices):
+    product_catalogue = dict(PRODUCT_CATALOGUE)
+    for product_name, price in prices.items():
+        product_type = ProductByKg if product_catalogue[product_name].is_by_kg else Product
+        product_catalogue[product_name] = product_type(product_name, Price(price))
+    return product_catalogue
+
+
+def fill_cart(cart):
+    cart.add_product("beans", "3")
+    cart.add_product("onions", "1.5")
+    cart.add_product("beans")
+    return cart
+
+
+def test_carts_keep_their_snapshot_until_repriced():
+    store = CatalogueStore()
+    cart = fill_cart(store.new_cart())
+    assert cart.sub_total == Price("2.43")
+    product_catalogue = with_new_prices(beans="0.6")
+    snapshot = store.publish(product_catalogue, (ThreeForTwo(product_catalogue["beans"]),))
+    assert snapshot.version == 2
+    assert not store.is_current(cart)
+    assert cart.sub_total == Price("2.43")
+    assert fill_cart(store.new_cart()).sub_total == Price("2.83")
+    assert store.reprice(cart) is snapshot
+    assert store.is_current(cart)
+    assert cart.sub_total == Price("2.83")
+    assert cart.applied_offers == [AppliedOffer("beans 3 for 2", Price("0.6"))]
+
+
+@pytest.mark.parametrize("compact_lines", [False, True])
+def test_reprices_only_changed_lines(compact_lines):
+    store = CatalogueStore()
+    cart = fill_cart(store.new_cart(compact_lines=compact_lines))
+    cart.savings
+    store.publish(with_new_prices(onions="0.35"), OFFERS)
+    store.reprice(cart)
+    assert list(cart.products_in_cart)[1].price == Price("0.52")
+    assert list(cart.products_in_cart)[1].price_per_kg == Price("0.35")
+    assert cart.sub_total == Price("2.52")
+    assert cart.applied_offers == [AppliedOffer("beans 3 for 2", Price("0.5"))]
+    assert cart.total == Price("2.02")
+
+
+def test_repriced_cart_drops_offers_which_are_withdrawn():
+    store = CatalogueStore()
+    cart = fill_cart(store.new_cart())
+    assert cart.savings == Price("0.5")
+    store.publish(PRODUCT_CATALOGUE, ())
+    store.reprice(cart)
+    assert cart.applied_offers == []
+    assert cart.total == Price("2.43")
+
+
+def test_cart_is_unchanged_if_it_can_not_be_repriced():
+    store = CatalogueStore()
+    cart = fill_cart(store.new_cart())
+    product_catalogue = with_new_prices(beans="0.6")
+    del product_catalogue["onions"]
+    store.publish(product_catalogue, OFFERS)
+    with pytest.raises(InvalidProductException):
+        store.reprice(cart)
+    store.publish({**PRODUCT_CATALOGUE, "onions": Product("onions", Price("0.29"))}, OFFERS)
+    with pytest.raises(ProductQuantityException):
+        store.reprice(cart)
+    assert cart.product_catalogue is PRODUCT_CATALOGUE
+    assert cart.sub_total == Price("2.43")
+
+
+def test_publishes_catalogue_images(tmp_path):
+    product_catalogue, offers = parse_catalogue(
+        {
+            "products": [{"name": "beans", "price": "0.45"}, {"name": "onions", "price": "0.29", "pricing_unit": "kg"}],
+            "offers": [{"type": "two_for_price", "product": "beans", "price": "0.8"}],
+        }
+    )
+    write_catalogue_image(tmp_path / "catalogue.img", product_catalogue, offers)
+    store = CatalogueStore()
+    cart = fill_cart(store.new_cart())
+    store.publish_image(tmp_path / "catalogue.img")
+    store.reprice(cart)
+    assert cart.sub_total == Price("2.23")
+    assert cart.applied_offers == [AppliedOffer("beans 2 for £0.80", Price("0.2"))]
+
+
+def test_snapshot_holds_the_index_its_carts_share():
+    store = CatalogueStore()
+    snapshot = store.publish(with_new_prices(beans="0.6"), OFFERS[1:])
+    assert store.new_cart().offer_index is snapshot.offer_index
+    assert OfferIndex.for_offers(snapshot.offers) is snapshot.offer_index
@@ -0,0 +1,112 @@
+import io
+import json
+
+import pytest
+from supermarket_pricing.catalogue import OFFERS, PRODUCT_CATALOGUE
+from supermarket_pricing.catalogue_loader import save_catalogue
+from supermarket_pricing.cli import (
+    ScanRow,
+    group_baskets,
+    main,
+    price_scan_log,
+    read_csv_scans,
+    read_jsonl_scans,
+)
+from supermarket_pricing.mapped_catalogue import write_catalogue_image
+
+SCAN_LOG = """basket_id,product,quantity
+1,beans,3
+1,coke,2
+2,onions,1.2777
+
+3,caviar,1
+4,arbor ale,1
+4,butcombe,2
+"""
+
+TOTALS = """basket_id,sub_total,savings,total
+1,2.90,0.90,2.00
+2,0.37,0.00,0.37
+4,6.40,0.40,6.00
+"""
+
+
+def test_groups_consecutive_scans_into_baskets():
+    scans = read_csv_scans(io.StringIO(SCAN_LOG))
+    assert next(scans) == ScanRow("1", "beans", "3")
+    assert list(group_baskets(scans)) == [
+        ("1", [("coke", "2")]),
+        ("2", [("onions", "1.2777")]),
+        ("3", [("caviar", "1")]),
+        ("4", [("arbor ale", "1"), ("butcombe", "2")]),
+    ]
+
+
+def test_reads_jsonl_scans():
+    scan_log = '{"basket_id": 7, "product": "beans", "quantity": 3}\n\n{"basket_id": 7, "product": "onions", "quantity": "0.5"}\n'
+    assert list(read_jsonl_scans(io.StringIO(scan_log))) == [
+        ScanRow("7", "beans", "3"),
+        ScanRow("7", "onions", "0.5"),
+    ]
+
+
+def test_writes_totals_and_reports_baskets_which_can_not_be_priced():
+    output, errors = io.StringIO(), io.StringIO()
+    assert (
+        price_scan_log(group_baskets(read_csv_scans(io.StringIO(SCAN_LOG))), output, errors, baskets_per_write=2) == 1
+    )
+    assert output.getvalue() == TOTALS
+    assert errors.getvalue() == "Basket 3: Unexpected Item in Bagging Area\n"
+
+
+def test_writes_receipts():
+    output = io.StringIO()
+    price_scan_log([("9", [("beans", "3")])], output, io.StringIO(), receipts=True)
+    assert output.getvalue().startswith("Basket 9\n| Beans x 3            |  £1.50 |\n")
+    assert output.getvalue().endswith("| **Total to Pay**     |  £1.00 |\n\n")
+
+
+def test_main_prices_files_with_each_catalogue(tmp_path, capsys):
+    (tmp_path / "scans.csv").write_text(SCAN_LOG)
+    save_catalogue(tmp_path / "catalogue.json", PRODUCT_CATALOGUE, OFFERS)
+    write_catalogue_image(tmp_path / "catalogue.img", PRODUCT_CATALOGUE, OFFERS)
+    for catalogue_options in [
+        [],
+        ["--catalogue", str(tmp_path / "catalogue.json")],
+        ["--catalogue-image", str(tmp_path / "catalogue.img")],
+    ]:
+        output = tmp_path / "totals.csv"
+        assert main([str(tmp_path / "scans.csv"), "--output", str(output)] + catalogue_options) == 1
+        assert output.read_text() == TOTALS
+
+
+def test_main_reads_jsonl_by_extension(tmp_path, capsys):
+    scans = [{"basket_id": "a", "product": "beans", "quantity": 3}]
+    (tmp_path / "scans.jsonl").write_text("".join(json.dumps(scan) + "\n" for scan in scans))
+    assert main([str(tmp_path / "scans.jsonl")]) == 0
+    assert capsys.readouterr().out == "basket_id,sub_total,savings,total\na,1.50,0.50,1.00\n"
+
+
+def test_main_rejects_invalid_scan_logs_and_catalogues(tmp_path, capsys):
+    (tmp_path / "scans.csv").write_text("1,beans\n")
+    assert main([str(tmp_path / "scans.csv")]) == 2
+    assert "expected basket_id,product,quantity" in capsys.readouterr().err
+    assert main([str(tmp_path / "scans.csv"), "--catalogue", str(tmp_path / "missing.json")]) == 2
+    assert "Can not load catalogue" in capsys.readouterr().err
+
+
+def test_writes_baskets_priced_before_an_invalid_scan():
+    output = io.StringIO()
+    with pytest.raises(ValueError, match="Line 3"):
+        price_scan_log(
+            group_baskets(read_csv_scans(io.StringIO("1,beans,2\n2,coke,1\n3,beans\n"))), output, io.StringIO()
+        )
+    # Basket 2 is not priced, as the invalid scan could have been one of its rows
+    assert output.getvalue() == "basket_id,sub_total,savings,total\n1,1.00,0.00,1.00\n"
+
+
+def test_main_rejects_catalogues_with_invalid_prices(tmp_path, capsys):
+    (tmp_path / "scans.csv").write_text(SCAN_LOG)
+    (tmp_path / "catalogue.json").write_text(json.dumps({"products": [{"name": "beans", "price": "0.333"}]}))
+    assert main([str(tmp_path / "scans.csv"), "--catalogue", str(tmp_path / "catalogue.json")]) == 2
+    assert "Can not load catalogue" in capsys.readouterr().err
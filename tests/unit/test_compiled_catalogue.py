@@ -0,0 +1,55 @@
+import pytest
+from supermarket_pricing.catalogue import PRODUCT_CATALOGUE
+from supermarket_pricing.compiled_catalogue import CompiledCatalogue, CompiledProduct
+from supermarket_pricing.exceptions import InvalidProductPriceException
+from supermarket_pricing.product import Price, PricingUnits
+from supermarket_pricing.shopping_cart import ShoppingCart
+
+
+def test_compiles_products_with_ids_and_resolved_pricing_unit():
+    catalogue = CompiledCatalogue.from_rows([("beans", "0.5", "unit"), ("onions", "0.29", "kg")])
+    assert len(catalogue) == 2
+    assert list(catalogue) == ["beans", "onions"]
+    assert catalogue["beans"] == CompiledProduct(0, "beans", Price("0.50"), PricingUnits.UNIT, False)
+    assert catalogue.get("onions") == CompiledProduct(1, "onions", Price("0.29"), PricingUnits.KG, True)
+    assert catalogue.get("tomacco") is None
+    assert catalogue.products[1] is catalogue["onions"]
+
+
+def test_compiled_catalogue_is_immutable():
+    catalogue = CompiledCatalogue.from_products(PRODUCT_CATALOGUE.values())
+    with pytest.raises(TypeError):
+        catalogue["beans"] = catalogue["coke"]  # type: ignore[index]
+    with pytest.raises(AttributeError):
+        catalogue["beans"].price = Price("0.1")  # type: ignore[misc]
+
+
+def test_products_with_equal_prices_share_one_price():
+    catalogue = CompiledCatalogue.from_rows([("a", "1.5", "unit"), ("b", "1.5", "unit")])
+    assert catalogue["a"].price is catalogue["b"].price
+
+
+@pytest.mark.parametrize(
+    "price, error",
+    [
+        ("0.333", "Invalid product price 0.333: must not have more than 2 decimal places"),
+        ("free", "Invalid product price: must be a valid number"),
+        ("NaN", "Invalid product price NaN: must be a finite number"),
+        ("Infinity", "Invalid product price Infinity: must be a finite number"),
+        ("sNaN", "Invalid product price sNaN: must be a finite number"),
+    ],
+)
+def test_raises_for_invalid_price(price, error):
+    with pytest.raises(InvalidProductPriceException) as e:
+        CompiledCatalogue.from_rows([("foo", price, "unit")])
+    assert error in e.value.args[0]
+
+
+def test_shopping_cart_with_compiled_catalogue():
+    cart = ShoppingCart(CompiledCatalogue.from_products(PRODUCT_CATALOGUE.values()))
+    cart.add_product("beans", "3")
+    cart.add_product("onions", "1.2777")
+    cart.add_product("coke", "2")
+    assert cart.sub_total == Price("3.27")
+    assert cart.savings == Price("0.9")
+    assert cart.total == Price("2.37")
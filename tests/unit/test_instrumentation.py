@@ -0,0 +1,61 @@
+import pytest
+from supermarket_pricing.instrumentation import Instrumentation
+from supermarket_pricing.offers import Offer
+from supermarket_pricing.product import Price
+from supermarket_pricing.shopping_cart import ShoppingCart
+
+
+def price_cart() -> Price:
+    cart = ShoppingCart()
+    cart.add_product("beans", "3")
+    cart.add_product("onions", "0.5")
+    cart.add_product("coke")
+    return cart.total
+
+
+def test_records_calls_of_each_stage():
+    with Instrumentation() as instrumentation:
+        assert price_cart() == Price("1.84")
+    calls = {key: timing.calls for key, timing in instrumentation.timings.items()}
+    assert calls == {
+        ("add_product", ""): 3,
+        ("parse_quantity", ""): 3,
+        ("round_down_price", ""): 3,
+        ("offer", "beans 3 for 2"): 1,
+        ("offer", "coke 2 for £1.00"): 1,
+    }
+    assert all(timing.seconds > 0 for timing in instrumentation.timings.values())
+
+
+def test_restores_original_methods_when_disabled():
+    add_product = ShoppingCart.__dict__["add_product"]
+    round_down_price = ShoppingCart.__dict__["_ShoppingCart__round_down_price"]
+    check_and_apply = Offer.__dict__["check_and_apply"]
+    with Instrumentation() as instrumentation:
+        assert ShoppingCart.__dict__["add_product"] is not add_product
+    price_cart()
+    assert ShoppingCart.__dict__["add_product"] is add_product
+    assert ShoppingCart.__dict__["_ShoppingCart__round_down_price"] is round_down_price
+    assert Offer.__dict__["check_and_apply"] is check_and_apply
+    assert instrumentation.timings == {}
+
+
+def test_only_one_instrumentation_enabled_at_a_time():
+    with Instrumentation():
+        with pytest.raises(RuntimeError):
+            Instrumentation().enable()
+
+
+def test_exports_summary_table_and_prometheus_text():
+    with Instrumentation() as instrumentation:
+        price_cart()
+    summary_rows = instrumentation.summary_table().splitlines()
+    assert summary_rows[0] == "| stage            | offer                    |    calls |   total ms |    mean µs |"
+    assert len(summary_rows) == 6
+    prometheus_lines = instrumentation.prometheus_text().splitlines()
+    assert "# TYPE supermarket_pricing_calls_total counter" in prometheus_lines
+    assert 'supermarket_pricing_calls_total{stage="offer",offer="beans 3 for 2"} 1' in prometheus_lines
+    assert 'supermarket_pricing_calls_total{stage="add_product"} 3' in prometheus_lines
+    assert any(
+        line.startswith('supermarket_pricing_seconds_total{stage="parse_quantity"} ') for line in prometheus_lines
+    )
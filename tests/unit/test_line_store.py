@@ -0,0 +1,62 @@
+from decimal import Decimal
+
+from supermarket_pricing.catalogue import PRODUCT_CATALOGUE
+from supermarket_pricing.line_store import AddedProduct, CompactLineStore, LineIndex
+from supermarket_pricing.product import Price, Weight
+from supermarket_pricing.receipt_printer import receipt_rows
+from supermarket_pricing.shopping_cart import ShoppingCart
+
+
+def test_lines_read_back_as_added_products():
+    line_store = CompactLineStore()
+    line_store.add(PRODUCT_CATALOGUE["beans"], Decimal("3"), Price("1.5"))
+    line_store.add(PRODUCT_CATALOGUE["onions"], Weight("1.2777"), Price("0.37"))
+    assert len(line_store) == 2
+    assert list(line_store) == [
+        AddedProduct("beans", Decimal("3"), Price("1.5"), 0),
+        AddedProduct("onions", Weight("1.2777"), Price("0.37"), Price("0.29")),
+    ]
+    assert line_store[-1].name == "onions"
+    assert line_store[:1] == [line_store[0]]
+
+
+def test_compact_cart_prints_same_receipt():
+    carts = [ShoppingCart(), ShoppingCart(compact_lines=True)]
+    for cart in carts:
+        cart.add_product("beans", "3")
+        cart.add_product("oranges", "0.2")
+        cart.add_product("onions", "1.2777")
+        cart.add_product("butcombe")
+        cart.add_product("coke", "2")
+    assert isinstance(carts[1].products_in_cart, CompactLineStore)
+    assert list(receipt_rows(carts[1])) == list(receipt_rows(carts[0]))
+    assert carts[1].total == carts[0].total
+
+
+def test_lines_can_be_replaced_and_deleted():
+    line_store = CompactLineStore()
+    line_store.add(PRODUCT_CATALOGUE["beans"], Decimal("3"), Price("1.5"))
+    line_store.add(PRODUCT_CATALOGUE["onions"], Weight("1.2777"), Price("0.37"))
+    line_store.add(PRODUCT_CATALOGUE["beans"], Decimal("1"), Price("0.5"))
+    line_store.replace(0, Decimal("2"), Price("1"))
+    del line_store[1]
+    assert list(line_store) == [
+        AddedProduct("beans", Decimal("2"), Price("1"), 0),
+        AddedProduct("beans", Decimal("1"), Price("0.5"), 0),
+    ]
+
+
+def test_line_index_finds_latest_line_of_each_product_as_lines_are_removed():
+    line_index = LineIndex()
+    for product_name in ["beans", "coke", "beans", "onions", "beans"]:
+        line_index.add(product_name)
+    assert line_index.last_line_number("beans") == 4
+    line_index.remove(1, "coke")
+    assert line_index.last_line_number("beans") == 3
+    assert line_index.last_line_number("onions") == 2
+    line_index.remove(3, "beans")
+    line_index.remove(0, "beans")
+    assert line_index.last_line_number("beans") == 0
+    line_index.add("beans")
+    assert line_index.last_line_number("beans") == 2
+    assert line_index.last_line_number("onions") == 1
@@ -0,0 +1,51 @@
+import pytest
+from supermarket_pricing.catalogue import OFFERS, PRODUCT_CATALOGUE
+from supermarket_pricing.compiled_catalogue import CompiledProduct
+from supermarket_pricing.exceptions import InvalidCatalogueException
+from supermarket_pricing.mapped_catalogue import MappedCatalogue, write_catalogue_image
+from supermarket_pricing.product import Price, PricingUnits, Product
+from supermarket_pricing.shopping_cart import ShoppingCart
+
+
+@pytest.fixture
+def image_path(tmp_path):
+    path = tmp_path / "catalogue.img"
+    write_catalogue_image(path, PRODUCT_CATALOGUE, OFFERS)
+    return path
+
+
+def test_looks_up_products_in_name_order(image_path):
+    with MappedCatalogue(image_path) as catalogue:
+        assert len(catalogue) == len(PRODUCT_CATALOGUE)
+        assert list(catalogue) == sorted(PRODUCT_CATALOGUE)
+        assert catalogue["beans"] == CompiledProduct(1, "beans", Price("0.5"), PricingUnits.UNIT, False)
+        assert catalogue.get("oranges") == CompiledProduct(6, "oranges", Price("1.99"), PricingUnits.KG, True)
+        assert catalogue.get("tomacco") is None
+        assert "coke" in catalogue and "aardvark" not in catalogue and "zebra" not in catalogue
+        assert catalogue["beans"] is catalogue["beans"]
+
+
+def test_prices_carts_the_same_as_the_dictionary_catalogue(image_path):
+    with MappedCatalogue(image_path) as catalogue:
+        carts = [ShoppingCart(), ShoppingCart(catalogue, catalogue.offers)]
+        for cart in carts:
+            for product_name, quantity in [("beans", "3"), ("onions", "1.5"), ("arbor ale", "2"), ("butcombe", "1")]:
+                cart.add_product(product_name, quantity)
+        assert carts[0].applied_offers == carts[1].applied_offers
+        assert carts[0].total == carts[1].total
+
+
+def test_names_are_searched_in_utf8_order(tmp_path):
+    product_catalogue = {name: Product(name, Price("1")) for name in ["é", "z", "Z", "ab"]}
+    write_catalogue_image(tmp_path / "catalogue.img", product_catalogue, ())
+    with MappedCatalogue(tmp_path / "catalogue.img") as catalogue:
+        assert all(catalogue[name].name == name for name in product_catalogue)
+        assert catalogue.offers == ()
+
+
+def test_rejects_files_which_are_not_images(tmp_path):
+    (tmp_path / "empty.img").write_bytes(b"")
+    (tmp_path / "catalogue.json").write_text('{"products": [], "offers": [], "padding": "' + "x" * 50 + '"}')
+    for path in [tmp_path / "empty.img", tmp_path / "catalogue.json"]:
+        with pytest.raises(InvalidCatalogueException):
+            MappedCatalogue(path)
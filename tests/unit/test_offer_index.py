@@ -0,0 +1,81 @@
+import gc
+import weakref
+from typing import Dict, Type, Union
+
+import pytest
+from supermarket_pricing.offer_index import OfferIndex
+from supermarket_pricing.offers import ThreeForTwo, ThreeFromSetForPrice, TwoForPrice
+from supermarket_pricing.product import Price, Product
+
+
+@pytest.fixture
+def test_product_catalogue() -> Dict[str, Union[Product, Type[Product]]]:
+    return {
+        "a": Product("a", Price("1")),
+        "b": Product("b", Price("1")),
+        "c": Product("c", Price("1.1")),
+        "d": Product("d", Price("1.2")),
+    }
+
+
+@pytest.fixture
+def test_offers(test_product_catalogue):
+    return (
+        ThreeForTwo(test_product_catalogue["a"]),
+        TwoForPrice(test_product_catalogue["b"], Price("1.5")),
+        ThreeFromSetForPrice(
+            (test_product_catalogue["a"], test_product_catalogue["c"], test_product_catalogue["d"]),
+            Price("3.0"),
+            "letters",
+        ),
+    )
+
+
+def test_offers_declare_eligible_product_names(test_offers):
+    assert [offer.eligible_product_names for offer in test_offers] == [
+        frozenset({"a"}),
+        frozenset({"b"}),
+        frozenset({"a", "c", "d"}),
+    ]
+
+
+def test_offer_positions_for_product(test_offers):
+    offer_index = OfferIndex(test_offers)
+    assert offer_index.offer_positions("a") == (0, 2)
+    assert offer_index.offer_positions("d") == (2,)
+    assert offer_index.offer_positions("e") == ()
+
+
+def test_candidate_offers_in_catalogue_order(test_offers):
+    offer_index = OfferIndex(test_offers)
+    assert offer_index.candidate_offers(["d", "b", "a"]) == list(test_offers)
+    assert offer_index.candidate_offers(["c"]) == [test_offers[2]]
+    assert offer_index.candidate_offers(["e"]) == []
+
+
+def test_index_shared_for_same_offers_catalogue(test_offers):
+    assert OfferIndex.for_offers(test_offers) is OfferIndex.for_offers(test_offers)
+    assert OfferIndex.for_offers(test_offers) is not OfferIndex.for_offers(test_offers[:2])
+
+
+def test_cache_does_not_keep_replaced_offers_alive(test_product_catalogue):
+    offer = ThreeForTwo(test_product_catalogue["a"])
+    offer_reference = weakref.ref(offer)
+    OfferIndex.for_offers((offer,))
+    del offer
+    gc.collect()
+    assert offer_reference() is None
+
+
+def test_offers_without_declared_products_are_candidates_for_every_product(test_offers):
+    offer_index = OfferIndex((*test_offers, UndeclaredOffer()))
+    assert offer_index.offer_positions("a") == (0, 2, 3)
+    assert offer_index.offer_positions("e") == (3,)
+    assert offer_index.candidate_positions(["b"]) == [1, 3]
+
+
+class UndeclaredOffer(TwoForPrice):
+    eligible_products = ()
+
+    def __init__(self):
+        pass
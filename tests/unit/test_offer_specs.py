@@ -0,0 +1,105 @@
+from decimal import Decimal
+from itertools import product
+
+import pytest
+from supermarket_pricing.catalogue import OFFERS, PRODUCT_CATALOGUE
+from supermarket_pricing.catalogue_loader import offer_from_dict, offer_to_dict
+from supermarket_pricing.offer_specs import (
+    BuyXGetYFree,
+    MixAndMatch,
+    NForM,
+    NForPrice,
+    compile_offer,
+    offer_spec,
+)
+from supermarket_pricing.offers import ThreeFromSetForPrice, TwoForPrice
+from supermarket_pricing.product import Price, Product
+from supermarket_pricing.shopping_cart import ShoppingCart
+
+ALES = ("arbor ale", "kaleidoscope", "butcombe")
+
+
+@pytest.mark.parametrize(
+    "offer",
+    [
+        *OFFERS,
+        TwoForPrice(PRODUCT_CATALOGUE["beans"], Price("1.5")),  # Costs more than buying two
+        ThreeFromSetForPrice(
+            (Product("a", Price("1.5")), Product("b", Price("1.50")), Product("c", Price("0.99"))), Price("2"), "abc"
+        ),
+    ],
+)
+def test_hand_written_offers_compile_to_identical_results(offer):
+    compiled_offer = compile_offer(offer_spec(offer))
+    assert compiled_offer.short_description == offer.short_description
+    assert compiled_offer.group_size == offer.group_size
+    assert compiled_offer.group_price == offer.group_price
+    assert compiled_offer.eligible_product_names == offer.eligible_product_names
+    product_names = sorted(offer.eligible_product_names)
+    for quantities in product(range(8), repeat=len(product_names)):
+        product_quantities = {name: Decimal(quantity) for name, quantity in zip(product_names, quantities)}
+        assert compiled_offer.evaluate(product_quantities) == offer.evaluate(product_quantities)
+        assert compiled_offer.check_and_apply(product_quantities) == offer.check_and_apply(product_quantities)
+
+
+def test_cart_with_compiled_offers_matches_hand_written_offers():
+    compiled_offers = tuple(compile_offer(offer_spec(offer)) for offer in OFFERS)
+    carts = [ShoppingCart(), ShoppingCart(offers_catalogue=compiled_offers)]
+    for cart in carts:
+        for product_name, quantity in [("beans", "4"), ("coke", "3"), ("arbor ale", "2"), ("butcombe", "2")]:
+            cart.add_product(product_name, quantity)
+    assert carts[0].applied_offers == carts[1].applied_offers
+    assert carts[0].total == carts[1].total
+
+
+def test_buy_x_get_y_free():
+    offer = compile_offer(BuyXGetYFree(PRODUCT_CATALOGUE["butcombe"], 2, 1))
+    assert offer.short_description == "butcombe buy 2 get 1 free"
+    assert offer.group_size == 3
+    assert offer.group_price == Price("4.2")
+    assert not offer.is_eligible({"butcombe": Decimal(2)})
+    assert offer.check_and_apply({"butcombe": Decimal(7)}) == Price("4.2")
+
+
+def test_n_for_m_and_n_for_price_with_larger_groups():
+    beans = PRODUCT_CATALOGUE["beans"]
+    assert compile_offer(NForM(beans, 5, 3)).check_and_apply({"beans": Decimal(11)}) == Price("2")
+    assert compile_offer(NForM(beans, 5, 3)).group_price == Price("1.5")
+    assert compile_offer(NForPrice(beans, 4, Price("1.2"))).check_and_apply({"beans": Decimal(9)}) == Price("1.6")
+
+
+def test_mix_and_match_discounts_cheapest_products():
+    offer = compile_offer(MixAndMatch(tuple(PRODUCT_CATALOGUE[name] for name in ALES), 2, Price("4"), "ales"))
+    assert offer.short_description == "ales 2 for £4.00"
+    product_quantities = {"arbor ale": Decimal(1), "kaleidoscope": Decimal(2), "butcombe": Decimal(2)}
+    assert offer.check_and_apply(product_quantities) == Price("0.9")  # £8.90 of the 4 cheapest ales for £8
+
+
+@pytest.mark.parametrize(
+    "make_spec",
+    [
+        lambda beans: NForM(beans, 3, 3),
+        lambda beans: NForM(beans, 0, 0),
+        lambda beans: NForPrice(beans, 2, Price("0.999")),
+        lambda beans: BuyXGetYFree(beans, 2, 0),
+        lambda beans: BuyXGetYFree(beans, True, 1),
+        lambda beans: MixAndMatch((), 3, Price("1"), "nothing"),
+    ],
+)
+def test_invalid_specs_raise(make_spec):
+    with pytest.raises(ValueError):
+        make_spec(PRODUCT_CATALOGUE["beans"])
+
+
+@pytest.mark.parametrize(
+    "offer_data",
+    [
+        {"type": "n_for_m", "product": "beans", "buy": 3, "pay_for": 2},
+        {"type": "n_for_price", "product": "coke", "buy": 2, "price": "1"},
+        {"type": "buy_x_get_y_free", "product": "butcombe", "buy": 2, "free": 1},
+        {"type": "mix_and_match", "products": ["arbor ale", "butcombe"], "buy": 2, "price": "4", "category": "ales"},
+    ],
+)
+def test_offer_specs_load_and_save_as_json(offer_data):
+    offer = offer_from_dict(offer_data, PRODUCT_CATALOGUE)
+    assert offer_to_dict(offer) == offer_data
@@ -1,7 +1,17 @@
-from typing import Dict, Type, Union
+import random
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from typing import Dict, List, Type, Union
 
 import pytest
-from supermarket_pricing.offers import ThreeForTwo, ThreeFromSetForPrice, TwoForPrice
+from supermarket_pricing.catalogue import OFFERS
+from supermarket_pricing.offers import (
+    OfferResult,
+    ThreeForTwo,
+    ThreeFromSetForPrice,
+    TwoForPrice,
+)
 from supermarket_pricing.product import Price, Product
 
 
@@ -79,3 +89,52 @@ def test_multiple_three_from_set_offer(test_product_catalogue):
     # Before Discount = 3.6 + 3.3 + 1.0 = 7.9
     # After Discount = 6.0 + 1.2 = 7.2
     assert discount_amount == Price("0.7")  # Only discounts 6 cheapest out of the 7
+
+
+def test_three_from_set_offer_with_large_quantities(test_product_catalogue):
+    offer = ThreeFromSetForPrice(
+        (test_product_catalogue["b"], test_product_catalogue["c"], test_product_catalogue["d"]), Price("3.0"), "letters"
+    )
+    cart_count = {
+        "b": Decimal("1000000"),  # Price 1.0
+        "c": Decimal("1000000"),  # Price 1.1
+        "d": Decimal("2"),  # Price 1.2
+    }
+    discount_amount = offer.check_and_apply(cart_count)
+    # 666,667 offers discount the 2,000,001 cheapest: every b and c, and one d
+    # Before Discount = 1,000,000 + 1,100,000 + 1.2 = 2,100,001.2
+    # After Discount = 666,667 * 3.0 = 2,000,001.0
+    assert discount_amount == Price("100000.2")
+
+
+def test_evaluate_does_not_modify_offer(test_product_catalogue):
+    offer = ThreeFromSetForPrice(
+        (test_product_catalogue["b"], test_product_catalogue["c"], test_product_catalogue["d"]), Price("3.0"), "letters"
+    )
+    offer_state = dict(vars(offer))
+    assert offer.evaluate({"b": 1, "c": 3, "d": 3}) == OfferResult(True, Price("0.7"))
+    assert offer.evaluate({"b": 2}) == OfferResult(False, Price("0"))
+    assert vars(offer) == offer_state
+
+
+def test_shared_offers_catalogue_evaluated_concurrently():
+    def apply_offers(cart_count: Dict[str, Decimal]) -> List[Price]:
+        return [offer.check_and_apply(cart_count) for offer in OFFERS]
+
+    rng = random.Random(3)
+    cart_counts = [
+        {
+            product_name: Decimal(rng.randint(0, 12))
+            for product_name in ("beans", "arbor ale", "kaleidoscope", "butcombe")
+        }
+        for _ in range(20000)
+    ]
+    expected_discount_amounts = [apply_offers(cart_count) for cart_count in cart_counts]
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)  # Switch threads as often as possible to expose any state shared between carts
+    try:
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            discount_amounts = list(executor.map(apply_offers, cart_counts))
+    finally:
+        sys.setswitchinterval(switch_interval)
+    assert discount_amounts == expected_discount_amounts
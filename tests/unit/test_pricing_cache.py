@@ -0,0 +1,73 @@
+from supermarket_pricing.batch import price_baskets
+from supermarket_pricing.catalogue import OFFERS, PRODUCT_CATALOGUE
+from supermarket_pricing.offers import TwoForPrice
+from supermarket_pricing.pricing_cache import CachedOffers, CacheStats, PricingCache
+from supermarket_pricing.product import Price
+from supermarket_pricing.shopping_cart import AppliedOffer, ShoppingCart
+
+
+def fill_cart(cart, lines):
+    for product_name, quantity in lines:
+        cart.add_product(product_name, quantity)
+    return cart
+
+
+def test_evicts_least_recently_used():
+    pricing_cache = PricingCache(max_entries=2)
+    cached_offers = CachedOffers((), (), Price(0))
+    pricing_cache.put("a", cached_offers)
+    pricing_cache.put("b", cached_offers)
+    assert pricing_cache.get("a") is cached_offers
+    pricing_cache.put("c", cached_offers)
+    assert pricing_cache.get("b") is None
+    assert pricing_cache.get("a") is cached_offers
+    assert pricing_cache.get("c") is cached_offers
+    assert pricing_cache.stats() == CacheStats(hits=3, misses=1, entries=2, max_entries=2)
+    pricing_cache.clear()
+    assert pricing_cache.stats() == CacheStats(hits=0, misses=0, entries=0, max_entries=2)
+
+
+def test_carts_with_same_products_share_results():
+    pricing_cache = PricingCache()
+    first_cart = fill_cart(ShoppingCart(pricing_cache=pricing_cache), [("beans", "3"), ("coke", "2"), ("onions", "1")])
+    assert first_cart.applied_offers == [
+        AppliedOffer("beans 3 for 2", Price("0.5")),
+        AppliedOffer("coke 2 for £1.00", Price("0.4")),
+    ]
+    # Added in a different order and split over more lines, so only the offer results are the same
+    second_cart = fill_cart(
+        ShoppingCart(pricing_cache=pricing_cache),
+        [("onions", "1"), ("coke", "1"), ("beans", "3"), ("coke", "1")],
+    )
+    assert second_cart.applied_offers == first_cart.applied_offers
+    assert second_cart.total == first_cart.total == Price("2.29")
+    assert pricing_cache.stats() == CacheStats(hits=1, misses=1, entries=1, max_entries=4096)
+    second_cart.add_product("beans", "3")
+    assert second_cart.savings == Price("1.4")
+    assert pricing_cache.stats().misses == 2
+
+
+def test_different_offers_catalogue_does_not_share_results():
+    pricing_cache = PricingCache()
+    lines = [("butcombe", "2")]
+    assert fill_cart(ShoppingCart(pricing_cache=pricing_cache), lines).savings == Price("0")
+    offers = OFFERS + (TwoForPrice(PRODUCT_CATALOGUE["butcombe"], Price("3")),)
+    assert fill_cart(ShoppingCart(offers_catalogue=offers, pricing_cache=pricing_cache), lines).savings == Price("1.2")
+    assert fill_cart(ShoppingCart(pricing_cache=pricing_cache), lines).savings == Price("0")
+    assert pricing_cache.stats().hits == 1
+
+
+def test_cached_applied_offers_are_not_shared_with_carts():
+    pricing_cache = PricingCache()
+    fill_cart(ShoppingCart(pricing_cache=pricing_cache), [("beans", "3")]).applied_offers.clear()
+    assert fill_cart(ShoppingCart(pricing_cache=pricing_cache), [("beans", "3")]).applied_offers == [
+        AppliedOffer("beans 3 for 2", Price("0.5"))
+    ]
+
+
+def test_price_baskets_with_cache_matches_without():
+    baskets = [{"beans": "3", "coke": 2}, {"onions": "0.5"}, {"coke": 2, "beans": "3"}, {"beans": "3", "coke": 2}]
+    pricing_cache = PricingCache()
+    assert list(price_baskets(baskets, pricing_cache=pricing_cache)) == list(price_baskets(baskets))
+    # Baskets without any offer products never look up the cache
+    assert pricing_cache.stats() == CacheStats(hits=2, misses=1, entries=1, max_entries=4096)
@@ -1,6 +1,8 @@
+from decimal import Decimal
+
 import pytest
 from supermarket_pricing.exceptions import InvalidProductPriceException
-from supermarket_pricing.product import Price, Product, Weight
+from supermarket_pricing.product import Price, Product, Weight, from_pence, to_pence
 
 
 @pytest.mark.parametrize(
@@ -35,7 +37,42 @@ def test_weight_class_prints_to_three_decimal_places(capsys, price, price_string
     assert captured.out == price_string + "\n"
 
 
+@pytest.mark.parametrize(
+    "result, expected",
+    [
+        (Price("1.5") + Price("0.25"), Price("1.75")),
+        (Price("1.5") + 1, Price("2.5")),
+        (1 + Price("1.5"), Price("2.5")),
+        (sum([Price("0.5"), Price("0.7")]), Price("1.2")),
+        (Price("1.5") - Price("0.25"), Price("1.25")),
+        (Price("0.5") * 3, Price("1.5")),
+    ],
+)
+def test_price_arithmetic_results_in_a_price(result, expected):
+    assert type(result) is Price
+    assert result == expected
+
+
+def test_price_arithmetic_with_unsupported_type_raises_type_error():
+    with pytest.raises(TypeError):
+        Price("1.5") + 1.5
+
+
 def test_raises_product_with_invalid_price():
     with pytest.raises(InvalidProductPriceException) as e:
         Product("foo", Price("0.333"))
     assert "Invalid product price 0.333: must not have more than 2 decimal places" in e.value.args[0]
+
+
+@pytest.mark.parametrize(
+    "price, pence", [(Price("2.2"), 220), (Price("0.01"), 1), (Decimal("1.500"), 150), (Price("0"), 0)]
+)
+def test_prices_convert_to_and_from_pence(price, pence):
+    assert to_pence(price) == pence
+    assert from_pence(pence) == price
+    assert type(from_pence(pence)) is Price
+
+
+def test_to_pence_rejects_fractions_of_a_penny():
+    with pytest.raises(ValueError, match="must be a whole number of pence"):
+        to_pence(Price("0.505"))
@@ -1,9 +1,14 @@
+import io
 from decimal import Decimal
 from typing import List
 
 from supermarket_pricing.product import Price, Weight
-from supermarket_pricing.receipt_printer import print_receipt
-from supermarket_pricing.shopping_cart import AddedProduct, AppliedOffer
+from supermarket_pricing.receipt_printer import (
+    print_receipt,
+    print_receipts,
+    receipt_rows,
+)
+from supermarket_pricing.shopping_cart import AddedProduct, AppliedOffer, ShoppingCart
 
 
 class StubCart:
@@ -109,3 +114,55 @@ def test_prints_receipt_for_mix_of_items_with_offers(capsys):
 | **Total to Pay**     |  £9.02 |
 """
     assert captured.out == expected_output
+
+
+def test_yields_receipt_rows_lazily():
+    cart = StubCart(
+        products_in_cart=[AddedProduct("ham", Decimal("1"), Price("4.5"), Decimal("0"))], total=Price("4.50")
+    )
+    rows = receipt_rows(cart)
+    assert next(rows) == "| Ham                  |  £4.50 |\n"
+    assert list(rows) == ["| **Total to Pay**     |  £4.50 |\n"]
+
+
+def test_prints_receipt_to_text_stream(capsys):
+    cart = StubCart(
+        products_in_cart=[AddedProduct("ham", Decimal("1"), Price("4.5"), Decimal("0"))], total=Price("4.50")
+    )
+    output = io.StringIO()
+    print_receipt(cart, output)
+    assert capsys.readouterr().out == ""
+    assert output.getvalue() == "| Ham                  |  £4.50 |\n| **Total to Pay**     |  £4.50 |\n"
+
+
+def test_prints_many_receipts_to_one_stream():
+    carts = (
+        StubCart(
+            products_in_cart=[AddedProduct("ham", Decimal(quantity), Price("4.5") * quantity, Decimal("0"))],
+            total=Price("4.5") * quantity,
+        )
+        for quantity in range(1, 6)
+    )
+    output = io.StringIO()
+    print_receipts(carts, output, receipts_per_write=2)
+    receipts = output.getvalue().split("\n\n")
+    assert len(receipts) == 5
+    assert receipts[0] == "| Ham                  |  £4.50 |\n| **Total to Pay**     |  £4.50 |"
+    assert receipts[4] == "| Ham x 5              | £22.50 |\n| **Total to Pay**     | £22.50 |\n"
+
+
+def test_prints_receipts_of_a_reused_cart():
+    cart = ShoppingCart()
+
+    def refilled_carts():
+        for product_name in ("beans", "coke"):
+            cart.clear()
+            cart.add_product(product_name)
+            yield cart
+
+    output = io.StringIO()
+    print_receipts(refilled_carts(), output)
+    assert output.getvalue() == (
+        "| Beans                |  £0.50 |\n| **Total to Pay**     |  £0.50 |\n"
+        "\n| Coke                 |  £0.70 |\n| **Total to Pay**     |  £0.70 |\n"
+    )
@@ -0,0 +1,63 @@
+from decimal import Decimal
+
+import pytest
+from supermarket_pricing.catalogue import PRODUCT_CATALOGUE
+from supermarket_pricing.offers import ThreeForTwo, TwoForPrice
+from supermarket_pricing.product import Price, Product
+from supermarket_pricing.savings_tables import SavingsTables, TableStats
+from supermarket_pricing.shopping_cart import ShoppingCart
+
+
+@pytest.mark.parametrize(
+    "make_offer",
+    [
+        lambda product, savings_tables: ThreeForTwo(product, savings_tables),
+        lambda product, savings_tables: TwoForPrice(product, Price("0.8"), savings_tables),
+    ],
+)
+@pytest.mark.parametrize("quantity", ["0", "1", "2", "3", "7", "8", "8.5", "9", "10", "25"])
+def test_offers_with_tables_give_same_results(make_offer, quantity):
+    product = PRODUCT_CATALOGUE["beans"]
+    offer = make_offer(product, SavingsTables(max_quantity=8))
+    product_quantities = {"beans": Decimal(quantity)}
+    assert offer.evaluate(product_quantities) == make_offer(product, None).evaluate(product_quantities)
+
+
+def test_tables_are_built_lazily_and_shared_between_equal_offers():
+    savings_tables = SavingsTables(max_quantity=16)
+    beans_offers = [ThreeForTwo(PRODUCT_CATALOGUE["beans"], savings_tables) for _ in range(2)]
+    assert len(savings_tables) == 0
+    for offer in beans_offers:
+        assert offer.check_and_apply({"beans": Decimal(6)}) == Price("1")
+    assert offer.check_and_apply({"beans": Decimal(100)}) == Price("16.5")  # Above max_quantity
+    ThreeForTwo(Product("cheap beans", Price("0.3")), savings_tables).check_and_apply({"cheap beans": Decimal(3)})
+    assert savings_tables.stats() == TableStats(2, 34, 65_536, 2)
+
+
+def test_oldest_tables_evicted_beyond_max_entries():
+    savings_tables = SavingsTables(max_quantity=9, max_entries=25)
+    for price in ("0.1", "0.2", "0.3"):
+        ThreeForTwo(Product("beans", Price(price)), savings_tables).check_and_apply({"beans": Decimal(3)})
+    assert savings_tables.stats() == TableStats(2, 20, 25, 3)
+    savings_tables.clear()
+    assert len(savings_tables) == 0
+
+
+def test_cart_with_savings_tables():
+    savings_tables = SavingsTables()
+    offers = (
+        ThreeForTwo(PRODUCT_CATALOGUE["beans"], savings_tables),
+        TwoForPrice(PRODUCT_CATALOGUE["coke"], Price("1"), savings_tables),
+    )
+    cart = ShoppingCart(offers_catalogue=offers)
+    cart.add_product("beans", "4")
+    cart.add_product("coke", "3")
+    assert cart.savings == Price("0.9")
+    assert cart.total == Price("3.2")
+
+
+def test_invalid_bounds_raise():
+    with pytest.raises(ValueError):
+        SavingsTables(max_quantity=-1)
+    with pytest.raises(ValueError):
+        SavingsTables(max_quantity=10, max_entries=10)
@@ -0,0 +1,65 @@
+import asyncio
+
+from supermarket_pricing.batch import PricedBasket, price_baskets
+from supermarket_pricing.exceptions import InvalidProductException
+from supermarket_pricing.product import Price
+from supermarket_pricing.service import PricingService
+
+
+def test_coalesces_concurrent_requests_into_one_batch():
+    baskets = [{"beans": "3", "coke": 2}, {"onions": "0.5"}, [("arbor ale", 1), ("butcombe", 2)], {"coke": "1"}]
+
+    async def price_concurrently():
+        async with PricingService(batch_window=0.05) as service:
+            priced_baskets = await asyncio.gather(*(service.price_basket(basket) for basket in baskets))
+            return priced_baskets, service.batches_priced
+
+    priced_baskets, batches_priced = asyncio.run(price_concurrently())
+    assert priced_baskets == list(price_baskets(baskets))
+    assert batches_priced == 1
+
+
+def test_sends_full_batches_straight_away():
+    async def price_concurrently():
+        async with PricingService(batch_window=60, max_batch_size=2) as service:
+            await asyncio.wait_for(
+                asyncio.gather(*(service.price_basket({"beans": str(quantity)}) for quantity in range(1, 5))), 5
+            )
+            return service.batches_priced
+
+    assert asyncio.run(price_concurrently()) == 2
+
+
+def test_errors_are_raised_only_for_their_own_request():
+    async def price_concurrently():
+        async with PricingService() as service:
+            return await asyncio.gather(
+                service.price_basket({"beans": "3"}), service.price_basket({"caviar": "1"}), return_exceptions=True
+            )
+
+    priced_basket, error = asyncio.run(price_concurrently())
+    assert priced_basket == PricedBasket(Price("1.5"), Price("0.5"), Price("1"), priced_basket.applied_offers)
+    assert isinstance(error, InvalidProductException)
+
+
+def test_close_prices_pending_requests():
+    async def close_with_pending_request():
+        service = PricingService(batch_window=60)
+        request = asyncio.create_task(service.price_basket({"coke": "2"}))
+        await asyncio.sleep(0)
+        await service.close()
+        return await request
+
+    assert asyncio.run(close_with_pending_request()).savings == Price("0.4")
+
+
+def test_requests_wait_for_batch_in_flight_and_join_next_batch():
+    async def price_while_batch_in_flight():
+        async with PricingService(batch_window=0) as service:
+            first_request = asyncio.create_task(service.price_basket({"beans": "1"}))
+            await asyncio.sleep(0.001)  # The first request is sent on its own
+            later_requests = [asyncio.create_task(service.price_basket({"coke": str(quantity)})) for quantity in (1, 2)]
+            await asyncio.gather(first_request, *later_requests)
+            return [request.result().savings for request in later_requests], service.batches_priced
+
+    assert asyncio.run(price_while_batch_in_flight()) == ([Price("0"), Price("0.4")], 2)
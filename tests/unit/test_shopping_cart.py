@@ -1,12 +1,27 @@
 from decimal import Decimal
+from typing import Dict
 
 import pytest
+from supermarket_pricing.catalogue import OFFERS, PRODUCT_CATALOGUE
 from supermarket_pricing.exceptions import (
+    InvalidLinesException,
     InvalidProductException,
+    LineNotFoundException,
     ProductQuantityException,
 )
+from supermarket_pricing.offers import Offer, ThreeForTwo, TwoForPrice
 from supermarket_pricing.product import Price
-from supermarket_pricing.shopping_cart import ShoppingCart
+from supermarket_pricing.shopping_cart import AppliedOffer, ShoppingCart
+
+
+class CountingThreeForTwo(ThreeForTwo):
+    def __init__(self, *args) -> None:
+        super().__init__(*args)
+        self.checks = 0
+
+    def check_and_apply(self, product_quantities: Dict[str, Decimal]) -> Price:
+        self.checks += 1
+        return super().check_and_apply(product_quantities)
 
 
 def test_get_total_for_one_item():
@@ -59,6 +74,58 @@ def test_get_total_for_with_offers():
     assert cart.total == Price("4.3")
 
 
+def test_applied_offers_are_in_offers_catalogue_order():
+    offers = (TwoForPrice(PRODUCT_CATALOGUE["coke"], Price("1")), ThreeForTwo(PRODUCT_CATALOGUE["beans"]))
+    cart = ShoppingCart(offers_catalogue=offers)
+    cart.add_product("beans", "3")
+    assert cart.applied_offers == [AppliedOffer("beans 3 for 2", Price("0.5"))]
+    cart.add_product("coke", "2")
+    assert cart.applied_offers == [
+        AppliedOffer("coke 2 for £1.00", Price("0.4")),
+        AppliedOffer("beans 3 for 2", Price("0.5")),
+    ]
+    assert cart.savings == Price("0.9")
+
+
+def test_offers_only_rechecked_after_eligible_product_added():
+    beans_offer = CountingThreeForTwo(PRODUCT_CATALOGUE["beans"])
+    coke_offer = CountingThreeForTwo(PRODUCT_CATALOGUE["coke"])
+    cart = ShoppingCart(offers_catalogue=(beans_offer, coke_offer))
+    cart.add_product("beans", "3")
+    assert cart.total == Price("1")
+    assert cart.savings == Price("0.5")
+    assert len(cart.applied_offers) == 1
+    assert (beans_offer.checks, coke_offer.checks) == (1, 0)
+    cart.add_product("coke")
+    cart.add_product("onions", "0.5")
+    assert cart.total == Price("1.84")
+    assert (beans_offer.checks, coke_offer.checks) == (1, 1)
+
+
+class BeansTenPercentOff(Offer):
+    """
+    A custom offer which does not declare its eligible_products
+    """
+
+    def __init__(self):
+        self.short_description = "beans 10% off"
+
+    def is_eligible(self, product_quantities):
+        return "beans" in product_quantities
+
+    def offer_amount(self, product_quantities):
+        return Price(PRODUCT_CATALOGUE["beans"].price * product_quantities["beans"] / 10)
+
+
+@pytest.mark.parametrize("optimal_offers", [False, True])
+def test_offers_without_declared_products_are_checked_for_every_product(optimal_offers):
+    cart = ShoppingCart(offers_catalogue=(*OFFERS, BeansTenPercentOff()), optimal_offers=optimal_offers)
+    cart.add_product("coke")
+    cart.add_product("beans", "2")
+    assert cart.applied_offers == [AppliedOffer("beans 10% off", Price("0.1"))]
+    assert cart.total == Price("1.6")
+
+
 def test_raises_for_invalid_item():
     cart = ShoppingCart()
     with pytest.raises(InvalidProductException) as e:
@@ -82,6 +149,183 @@ def test_raises_for_invalid_item_quantity(input_value, error):
     assert f"Product quantity for coke must be {error}" in e.value.args[0]
 
 
+def test_compact_lines_reject_quantities_finer_than_a_milligram():
+    cart = ShoppingCart(compact_lines=True)
+    cart.add_product("onions", "1.277777")
+    with pytest.raises(ProductQuantityException) as e:
+        cart.add_product("onions", "1.2777777")
+    assert "Product quantity for onions must be in whole milligrams" in e.value.args[0]
+    cart.remove_product("onions", "1.277777")
+    assert cart.product_quantities == {}
+    assert len(cart.products_in_cart) == 0
+
+
+@pytest.mark.parametrize("product_name, input_quantity", [("beans", "100000000000000000000"), ("onions", "1E+13")])
+def test_compact_lines_reject_quantities_too_large_to_store(product_name, input_quantity):
+    cart = ShoppingCart(compact_lines=True)
+    cart.add_product("beans", "2")
+    with pytest.raises(ProductQuantityException) as e:
+        cart.add_product(product_name, input_quantity)
+    assert f"Product quantity for {product_name} is too large" in e.value.args[0]
+    with pytest.raises(InvalidLinesException):
+        cart.add_products([("coke", "1"), (product_name, input_quantity)])
+    assert cart.product_quantities == {"beans": Decimal("2")}
+    assert cart.sub_total == Price("1.00")
+    assert list(cart.products_in_cart) == list(rebuilt_cart(cart, compact_lines=False).products_in_cart)
+
+
+def test_lists_keep_quantities_finer_than_a_milligram():
+    cart = ShoppingCart()
+    cart.add_product("onions", "1.2777777")
+    cart.remove_product("onions", "1.2777777")
+    assert cart.product_quantities == {}
+
+
+@pytest.mark.parametrize("compact_lines", [False, True])
+def test_add_products_matches_adding_one_at_a_time(compact_lines):
+    lines = [("beans", "2"), ("onions", "0.777"), ("beans", "1"), ("coke", "2"), ("onions", "0.777"), ("beans", "2")]
+    one_at_a_time = ShoppingCart(compact_lines=compact_lines)
+    for product_name, quantity in lines:
+        one_at_a_time.add_product(product_name, quantity)
+    cart = ShoppingCart(compact_lines=compact_lines)
+    cart.add_product("coke")
+    cart.clear()
+    cart.add_products(lines)
+    assert list(cart.products_in_cart) == list(one_at_a_time.products_in_cart)
+    assert (
+        cart.product_quantities
+        == one_at_a_time.product_quantities
+        == {
+            "beans": Decimal("5"),
+            "onions": Decimal("1.554"),
+            "coke": Decimal("2"),
+        }
+    )
+    assert (cart.sub_total, cart.savings, cart.total) == (
+        one_at_a_time.sub_total,
+        one_at_a_time.savings,
+        one_at_a_time.total,
+    )
+    assert cart.applied_offers == one_at_a_time.applied_offers
+
+
+def test_add_products_from_mapping_adds_to_existing_lines():
+    cart = ShoppingCart()
+    cart.add_product("beans")
+    cart.add_products({"beans": "2", "coke": "1"})
+    assert cart.product_quantities == {"beans": Decimal("3"), "coke": Decimal("1")}
+    assert cart.total == Price("1.7")
+
+
+def test_add_products_raises_for_every_invalid_line_and_adds_none():
+    cart = ShoppingCart()
+    cart.add_product("coke")
+    with pytest.raises(InvalidLinesException) as error:
+        cart.add_products([("beans", "1"), ("tomacco", "1"), ("coke", "1.5"), ("onions", "-1"), ("beans", "x")])
+    assert [(line_error.line_number, line_error.product_name) for line_error in error.value.line_errors] == [
+        (2, "tomacco"),
+        (3, "coke"),
+        (4, "onions"),
+        (5, "beans"),
+    ]
+    assert isinstance(error.value.line_errors[0].error, InvalidProductException)
+    assert isinstance(error.value.line_errors[1].error, ProductQuantityException)
+    assert "line 3 (coke): Product quantity for coke must be specified in integers" in str(error.value)
+    assert cart.product_quantities == {"coke": Decimal("1")}
+    assert len(cart.products_in_cart) == 1
+    assert cart.total == Price("0.7")
+
+
+def rebuilt_cart(cart, compact_lines):
+    rebuilt = ShoppingCart(compact_lines=compact_lines)
+    for line in cart.products_in_cart:
+        rebuilt.add_product(line.name, str(line.quantity))
+    return rebuilt
+
+
+@pytest.mark.parametrize("compact_lines", [False, True])
+def test_void_line_matches_cart_without_the_line(compact_lines):
+    cart = ShoppingCart(compact_lines=compact_lines)
+    for product_name, quantity in [("beans", "3"), ("coke", "2"), ("onions", "0.777"), ("beans", "1")]:
+        cart.add_product(product_name, quantity)
+    assert cart.savings == Price("0.9")
+    assert cart.void_line(0) == ("beans", Decimal("3"), Price("1.5"), 0)
+    assert cart.void_line() == ("beans", Decimal("1"), Price("0.5"), 0)
+    assert [line.name for line in cart.products_in_cart] == ["coke", "onions"]
+    assert cart.product_quantities == {"coke": Decimal("2"), "onions": Decimal("0.777")}
+    rebuilt = rebuilt_cart(cart, compact_lines)
+    assert (cart.sub_total, cart.savings, cart.total) == (rebuilt.sub_total, rebuilt.savings, rebuilt.total)
+    assert cart.applied_offers == rebuilt.applied_offers == [AppliedOffer("coke 2 for £1.00", Price("0.4"))]
+    with pytest.raises(LineNotFoundException):
+        cart.void_line(2)
+
+
+@pytest.mark.parametrize("compact_lines", [False, True])
+def test_remove_product_takes_quantity_off_latest_lines(compact_lines):
+    cart = ShoppingCart(compact_lines=compact_lines)
+    for product_name, quantity in [("beans", "2"), ("onions", "1.5"), ("beans", "1"), ("coke", "1"), ("beans", "2")]:
+        cart.add_product(product_name, quantity)
+    assert cart.savings == Price("0.5")
+    cart.remove_product("beans", "3")
+    cart.remove_product("onions", "0.75")
+    assert [(line.name, line.quantity, line.price) for line in cart.products_in_cart] == [
+        ("beans", Decimal("2"), Price("1")),
+        ("onions", Decimal("0.75"), Price("0.21")),
+        ("coke", Decimal("1"), Price("0.7")),
+    ]
+    assert cart.product_quantities == {"beans": Decimal("2"), "onions": Decimal("0.75"), "coke": Decimal("1")}
+    rebuilt = rebuilt_cart(cart, compact_lines)
+    assert (cart.sub_total, cart.savings, cart.total) == (rebuilt.sub_total, rebuilt.savings, rebuilt.total)
+    assert cart.applied_offers == []
+
+
+@pytest.mark.parametrize("compact_lines", [False, True])
+def test_remove_product_after_voiding_and_adding_lines(compact_lines):
+    cart = ShoppingCart(compact_lines=compact_lines)
+    cart.add_products([("beans", "1"), ("coke", "1"), ("beans", "2"), ("coke", "1")])
+    cart.void_line(1)
+    cart.add_product("beans", "1")
+    cart.void_line(0)
+    cart.remove_product("beans", "2")
+    cart.remove_product("coke")
+    assert [(line.name, line.quantity) for line in cart.products_in_cart] == [("beans", Decimal("1"))]
+    cart.add_products([("coke", "2"), ("beans", "1")])
+    cart.remove_product("beans", "2")
+    assert [(line.name, line.quantity) for line in cart.products_in_cart] == [("coke", Decimal("2"))]
+    rebuilt = rebuilt_cart(cart, compact_lines)
+    assert (cart.sub_total, cart.savings, cart.total) == (rebuilt.sub_total, rebuilt.savings, rebuilt.total)
+
+
+def test_remove_product_only_rechecks_its_offers():
+    beans_offer = CountingThreeForTwo(PRODUCT_CATALOGUE["beans"])
+    coke_offer = CountingThreeForTwo(PRODUCT_CATALOGUE["coke"])
+    cart = ShoppingCart(offers_catalogue=(beans_offer, coke_offer))
+    cart.add_product("beans", "3")
+    cart.add_product("coke", "3")
+    assert cart.savings == Price("1.2")
+    cart.remove_product("beans")
+    assert cart.savings == Price("0.7")
+    assert (beans_offer.checks, coke_offer.checks) == (2, 1)
+
+
+@pytest.mark.parametrize(
+    "product_name, input_quantity, error",
+    [
+        ("tomacco", "1", InvalidProductException),
+        ("beans", "1.5", ProductQuantityException),
+        ("beans", "3", ProductQuantityException),
+        ("coke", "1", ProductQuantityException),
+    ],
+)
+def test_remove_product_raises_and_leaves_cart_unchanged(product_name, input_quantity, error):
+    cart = ShoppingCart()
+    cart.add_product("beans", "2")
+    with pytest.raises(error):
+        cart.remove_product(product_name, input_quantity)
+    assert cart.product_quantities == {"beans": Decimal("2")}
+    assert cart.total == Price("1")
+
+
 @pytest.mark.parametrize(
     "input_price, expected_price",
     [
@@ -0,0 +1,55 @@
+import random
+
+import pytest
+from supermarket_pricing.batch import price_baskets
+from supermarket_pricing.catalogue import PRODUCT_CATALOGUE
+from supermarket_pricing.exceptions import ProductQuantityException
+from supermarket_pricing.offers import ThreeForTwo
+from supermarket_pricing.product import Price, ProductByKg, from_pence
+from supermarket_pricing.vectorized import VectorizedPricer
+
+
+def test_matches_shopping_cart_pricing():
+    rng = random.Random(7)
+    baskets = []
+    for _ in range(500):
+        basket = [(product_name, str(rng.randint(1, 9))) for product_name in rng.sample(list(PRODUCT_CATALOGUE), k=4)]
+        basket = [
+            (product_name, f"{rng.randint(1, 2000) / 1000}" if product_name in ("onions", "oranges") else quantity)
+            for product_name, quantity in basket
+        ]
+        baskets.append(basket)
+    vectorized_pricer = VectorizedPricer()
+    priced_baskets = vectorized_pricer.price_baskets(baskets)
+    for basket_id, expected in enumerate(price_baskets(baskets)):
+        assert from_pence(priced_baskets.sub_totals[basket_id]) == expected.sub_total
+        assert from_pence(priced_baskets.savings[basket_id]) == expected.savings
+        assert from_pence(priced_baskets.totals[basket_id]) == expected.total
+        assert vectorized_pricer.applied_offers(priced_baskets, basket_id) == list(expected.applied_offers)
+
+
+@pytest.mark.parametrize(
+    "quantity, price",
+    [
+        ("0.001", Price("0.01")),  # Rounded up to the minimum of 1p
+        ("0.55", Price("0.15")),  # 0.1595 rounded down
+        ("1.2777", Price("0.37")),
+        ("1000", Price("290")),
+    ],
+)
+def test_prices_by_weight_rounded_down_to_the_penny(quantity, price):
+    priced_baskets = VectorizedPricer().price_baskets([{"onions": quantity}])
+    assert from_pence(priced_baskets.totals[0]) == price
+
+
+def test_raises_for_weight_more_precise_than_milligrams():
+    with pytest.raises(ProductQuantityException) as e:
+        VectorizedPricer().price_baskets([{"onions": "0.0000001"}])
+    assert "Product quantity for onions must be in whole milligrams" in e.value.args[0]
+
+
+def test_raises_for_offer_on_product_by_kg():
+    onions = ProductByKg("onions", Price("0.29"))
+    with pytest.raises(ValueError) as e:
+        VectorizedPricer({"onions": onions}, (ThreeForTwo(onions),))
+    assert "Offers on products priced by kg, such as onions, are not supported" in e.value.args[0]